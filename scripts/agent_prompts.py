@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Agent Prompts - One registry of translation agent system prompts
+
+The agents/*.md files define the three translation agents and name the
+skills/*.md modules each one uses. PromptRegistry compiles every agent
+once per process into a single system prompt:
+
+    agents/en-fr-translator.md          (frontmatter: skills, skills_path)
+        + skills/en-fr-translator-skills/subjunctive_mastery.md
+        + skills/en-fr-translator-skills/partitive_article_usage.md
+        + ...
+
+agent_runner.py and run_experiment.py both build their Messages API
+requests from it, so every Claude call uses the same prompt per hop.
+
+The compiled prompts run to thousands of tokens and never change between
+requests, so build_request() marks the system block for prompt caching
+(cache_control: ephemeral). After the first request of a hop, the API
+bills the prompt as a cache read at a tenth of the input price.
+TokenUsageTracker collects each response's usage so the saving is visible
+per hop.
+
+Usage:
+    from agent_prompts import build_request, get_registry, get_usage_tracker
+
+    request = build_request("claude-sonnet-4-20250514", "Hello", "en-fr")
+    message = client.messages.create(**request)
+    get_usage_tracker().record("en-fr", message.usage)
+    get_usage_tracker().print_report()
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LANGUAGES = {"en": "English", "fr": "French", "he": "Hebrew"}
+
+# Pipeline order of the agents
+AGENT_IDS = ("en-fr", "fr-he", "he-en")
+
+# Closes every compiled prompt, after the skills, so the output contract is
+# the last instruction the model reads. The spelling-error line is what the
+# error-rate experiment depends on.
+OUTPUT_CONTRACT = """## Output Contract
+
+Handle spelling errors in the input by understanding the intended meaning.
+Return ONLY the {target} translation with no explanations."""
+
+# Cache reads are billed at 10% of the base input price, cache writes at 125%
+CACHE_READ_PRICE = 0.1
+CACHE_WRITE_PRICE = 1.25
+
+
+@dataclass(frozen=True)
+class AgentConfig:
+    """Configuration for a translation agent."""
+    name: str
+    description: str
+    source_lang: str
+    target_lang: str
+    system_prompt: str
+    agent_id: str = ""
+    skills: Tuple[str, ...] = ()
+
+
+def parse_frontmatter(text: str) -> Tuple[Dict, str]:
+    """
+    Split a markdown file into its frontmatter and body.
+
+    Supports the subset of YAML used by agents/*.md: "key: value" pairs and
+    lists of "  - item" lines.
+
+    Args:
+        text: File contents
+
+    Returns:
+        (metadata, body)
+    """
+    if not text.startswith("---"):
+        return {}, text.strip()
+
+    header, _, body = text[3:].partition("\n---")
+    metadata: Dict = {}
+    key = None
+    for line in header.strip().splitlines():
+        stripped = line.strip()
+        if stripped.startswith("- ") and key is not None:
+            metadata.setdefault(key, []).append(stripped[2:].strip())
+        elif ":" in stripped:
+            key, _, value = stripped.partition(":")
+            key = key.strip()
+            if value.strip():
+                metadata[key] = value.strip()
+    return metadata, body.strip()
+
+
+class PromptRegistry:
+    """System prompts for the translation agents, compiled from agents/ and skills/."""
+
+    def __init__(self, root: str = REPO_ROOT):
+        """
+        Compile every agent definition.
+
+        Args:
+            root: Directory containing agents/ and skills/
+        """
+        self.root = root
+        self.agents: Dict[str, AgentConfig] = {agent_id: self._compile(agent_id) for agent_id in AGENT_IDS}
+
+    def _compile(self, agent_id: str) -> AgentConfig:
+        """Agent body, each of its skills and OUTPUT_CONTRACT, as one system prompt."""
+        source, target = (LANGUAGES[code] for code in agent_id.split("-"))
+        path = os.path.join(self.root, "agents", f"{agent_id}-translator.md")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Agent definition not found: {path}")
+
+        with open(path, encoding="utf-8") as f:
+            metadata, body = parse_frontmatter(f.read())
+
+        skills = tuple(metadata.get("skills", []))
+        skills_path = os.path.join(self.root, metadata.get("skills_path", f"skills/{agent_id}-translator-skills"))
+        sections = [body]
+        for skill in skills:
+            with open(os.path.join(skills_path, f"{skill}.md"), encoding="utf-8") as f:
+                sections.append(parse_frontmatter(f.read())[1])
+        sections.append(OUTPUT_CONTRACT.format(target=target))
+
+        return AgentConfig(
+            name=f"{source} to {target} Translator",
+            description=metadata.get("description", ""),
+            source_lang=source,
+            target_lang=target,
+            system_prompt="\n\n---\n\n".join(sections),
+            agent_id=agent_id,
+            skills=skills
+        )
+
+    def get(self, agent_id: str) -> AgentConfig:
+        """Compiled agent, raising ValueError for unknown ids."""
+        if agent_id not in self.agents:
+            raise ValueError(f"Unknown agent: {agent_id}. Valid: {list(self.agents.keys())}")
+        return self.agents[agent_id]
+
+    def for_direction(self, source_lang: str, target_lang: str) -> Optional[AgentConfig]:
+        """Agent translating source_lang to target_lang, or None."""
+        for agent in self.agents.values():
+            if (agent.source_lang, agent.target_lang) == (source_lang, target_lang):
+                return agent
+        return None
+
+    def system_blocks(self, agent_id: str) -> List[Dict]:
+        """System prompt as a content block marked for prompt caching."""
+        return [{"type": "text", "text": self.get(agent_id).system_prompt,
+                 "cache_control": {"type": "ephemeral"}}]
+
+    def build_request(self, model: str, text: str, agent_id: str, max_tokens: int = 1024) -> Dict:
+        """
+        Build the messages API arguments for one translation.
+
+        Args:
+            model: Claude model to use
+            text: Text to translate
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+            max_tokens: Output token limit
+
+        Returns:
+            Keyword arguments for messages.create()
+        """
+        agent = self.get(agent_id)
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": self.system_blocks(agent_id),
+            "messages": [
+                {"role": "user", "content": f"Translate this {agent.source_lang} text to {agent.target_lang}:\n\n{text}"}
+            ]
+        }
+
+
+@dataclass
+class HopUsage:
+    """Token usage of one hop's Claude requests."""
+    requests: int = 0
+    input_tokens: int = 0              # Uncached prompt tokens
+    cache_write_tokens: int = 0
+    cache_read_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.input_tokens + self.cache_write_tokens + self.cache_read_tokens
+
+    @property
+    def cache_read_fraction(self) -> float:
+        return self.cache_read_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    @property
+    def saved_tokens(self) -> float:
+        """Input-token equivalents saved versus sending the whole prompt uncached."""
+        return (self.cache_read_tokens * (1 - CACHE_READ_PRICE)
+                - self.cache_write_tokens * (CACHE_WRITE_PRICE - 1))
+
+
+class TokenUsageTracker:
+    """Per-hop token usage, including prompt cache writes and reads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hops: Dict[str, HopUsage] = {}
+
+    def record(self, hop: str, usage):
+        """
+        Add one response's usage.
+
+        Args:
+            hop: Agent identifier
+            usage: anthropic Usage object from a response
+        """
+        with self._lock:
+            stats = self.hops.setdefault(hop, HopUsage())
+            stats.requests += 1
+            stats.input_tokens += usage.input_tokens or 0
+            stats.cache_write_tokens += getattr(usage, "cache_creation_input_tokens", None) or 0
+            stats.cache_read_tokens += getattr(usage, "cache_read_input_tokens", None) or 0
+            stats.output_tokens += usage.output_tokens or 0
+
+    def reset(self):
+        with self._lock:
+            self.hops = {}
+
+    def print_report(self, file=None):
+        """Print per-hop prompt cache usage and savings (to file, default stdout)."""
+        with self._lock:
+            hops = dict(self.hops)
+        if not hops:
+            return
+        print("\nClaude token usage per hop:", file=file)
+        print(f"  {'Hop':<8} {'Requests':>8} {'Input':>9} {'Cache write':>12} {'Cache read':>11} "
+              f"{'Read %':>7} {'Output':>8} {'Saved':>9}", file=file)
+        for hop, stats in hops.items():
+            print(f"  {hop:<8} {stats.requests:>8} {stats.input_tokens:>9} {stats.cache_write_tokens:>12} "
+                  f"{stats.cache_read_tokens:>11} {stats.cache_read_fraction:>7.0%} {stats.output_tokens:>8} "
+                  f"{stats.saved_tokens:>9.0f}", file=file)
+        print("  Saved = input-token equivalents saved by prompt caching", file=file)
+
+
+_registry: Optional[PromptRegistry] = None
+_usage_tracker = TokenUsageTracker()
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> PromptRegistry:
+    """The process-wide registry, compiled on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PromptRegistry()
+        return _registry
+
+
+def build_request(model: str, text: str, agent_id: str, max_tokens: int = 1024) -> Dict:
+    """Messages API arguments for one translation, from the process-wide registry."""
+    return get_registry().build_request(model, text, agent_id, max_tokens)
+
+
+def get_usage_tracker() -> TokenUsageTracker:
+    """The process-wide token usage tracker."""
+    return _usage_tracker
@@ -11,13 +11,17 @@ Usage:
     python agent_runner.py --agent he-en --text "הטקסט שלך כאן"
     python agent_runner.py --agent roundtrip --text "Your text here"
     python agent_runner.py --pipeline --text "Your text here"  # Full pipeline
+    python agent_runner.py --pipeline --stream --text "Your text here"  # Print tokens as they arrive
+    python agent_runner.py --pipeline --input-file texts.txt --concurrency 16 > results.jsonl
 """
 
 import os
 import sys
+import json
+import time
+import asyncio
 import argparse
-from typing import Optional, Dict, Tuple
-from dataclasses import dataclass
+from typing import Callable, Optional, Dict, List, Tuple, TextIO
 
 try:
     import anthropic
@@ -26,105 +30,17 @@ except ImportError:
     print("Install with: pip install anthropic")
     sys.exit(1)
 
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-@dataclass
-class AgentConfig:
-    """Configuration for a translation agent."""
-    name: str
-    description: str
-    source_lang: str
-    target_lang: str
-    system_prompt: str
+from stream_timing import StreamTiming, print_chunk, print_stream_timings, stream_pipeline
+from claude_client import get_async_client, get_client
+from agent_prompts import build_request, get_registry, get_usage_tracker
+from rate_limiter import DEFAULT_RPM, DEFAULT_TPM, configure_scheduler, get_scheduler
 
 
-# Agent configurations based on the .claude/commands and agents/ definitions
-AGENTS = {
-    "en-fr": AgentConfig(
-        name="English to French Translator",
-        description="Agent 1: Translates English to French",
-        source_lang="English",
-        target_lang="French",
-        system_prompt="""You are an expert English to French translator. Follow these guidelines:
-
-1. **Subjunctive Mood**: Use subjunctive for doubt, emotion, desire, necessity
-   - "I want him to come" → "Je veux qu'il vienne"
-
-2. **Partitive Articles**: Use du/de la/de l'/des appropriately
-   - "I eat bread" → "Je mange du pain"
-
-3. **Subject Pronouns**: Always include (je, tu, il, elle, etc.)
-
-4. **Word Order**: BANGS adjectives before nouns, others after
-   - "a red car" → "une voiture rouge"
-
-5. **Natural Phrasing**: Avoid literal translations
-   - "I miss you" → "Tu me manques"
-   - "I am cold" → "J'ai froid"
-   - "I am 20 years old" → "J'ai 20 ans"
-
-Handle spelling errors in input by understanding intended meaning.
-Return ONLY the French translation with no explanations."""
-    ),
-
-    "fr-he": AgentConfig(
-        name="French to Hebrew Translator",
-        description="Agent 2: Translates French to Hebrew",
-        source_lang="French",
-        target_lang="Hebrew",
-        system_prompt="""You are an expert French to Hebrew translator. Follow these guidelines:
-
-1. **Gender Independence**: French gender does NOT transfer to Hebrew
-   - Look up Hebrew gender independently for each noun
-   - "la plage" (feminine French) → "החוף" (masculine Hebrew)
-
-2. **Binyan Selection**: Choose correct Hebrew verb pattern:
-   - Pa'al for simple actions (לכתוב)
-   - Nif'al for passive/reflexive (להיכתב)
-   - Pi'el for intensive (לכתֵּב)
-   - Hif'il for causative (להכתיב)
-   - Hitpa'el for reflexive (להתכתב)
-
-3. **Article Conversion**:
-   - French le/la/les → Hebrew ה prefix
-   - French un/une → No Hebrew equivalent
-
-4. **Tense Mapping**:
-   - passé composé → Hebrew past
-   - futur → Hebrew future
-   - subjonctif → Hebrew future (usually)
-
-Return ONLY the Hebrew translation with no explanations."""
-    ),
-
-    "he-en": AgentConfig(
-        name="Hebrew to English Translator",
-        description="Agent 3: Translates Hebrew to English",
-        source_lang="Hebrew",
-        target_lang="English",
-        system_prompt="""You are an expert Hebrew to English translator. Follow these guidelines:
-
-1. **Nikud Resolution**: Resolve vowel ambiguities using context
-   - כתב could be "wrote", "writing", "writes" - use context
-
-2. **Binyan Mapping**: Map Hebrew verb patterns to English verbs appropriately
-
-3. **Word Order Transformation**: Convert VSO to SVO
-   - "הלך הילד לבית" → "The child went home" (not "Went the child home")
-
-4. **Gender-to-Pronoun Mapping**:
-   - Feminine -ת ending → use "she"
-   - Masculine form → use "he"
-
-5. **Prefix Expansion**:
-   - ב → "in"
-   - ל → "to"
-   - מ → "from"
-   - ה → "the"
-
-Make the output sound like natural, native English.
-Return ONLY the English translation with no explanations."""
-    ),
-}
+# Agent prompts compiled from agents/*.md and skills/*.md at startup
+AGENTS = get_registry().agents
 
 
 class TranslationAgent:
@@ -142,8 +58,10 @@ class TranslationAgent:
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not set")
 
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        # Process-wide keep-alive client shared with other agents and workers
+        self.client = get_client(self.api_key)
         self.model = model
+        self.stream_timings: List[StreamTiming] = []
 
     def translate(self, text: str, agent_id: str) -> str:
         """
@@ -156,22 +74,64 @@ class TranslationAgent:
         Returns:
             Translated text
         """
-        if agent_id not in AGENTS:
-            raise ValueError(f"Unknown agent: {agent_id}. Valid: {list(AGENTS.keys())}")
+        # Paced to the RPM/TPM budget; 429s and overloads are retried with backoff
+        message = get_scheduler().create(self.client, build_request(self.model, text, agent_id), agent_id)
+        get_usage_tracker().record(agent_id, message.usage)
 
-        agent = AGENTS[agent_id]
+        return message.content[0].text.strip()
+
+    def translate_stream(self, text: str, agent_id: str,
+                         on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Translate text with the streaming API, passing text deltas to on_text.
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=1024,
-            system=agent.system_prompt,
-            messages=[
-                {"role": "user", "content": f"Translate this {agent.source_lang} text to {agent.target_lang}:\n\n{text}"}
-            ]
-        )
+        The hop's latency is appended to stream_timings.
+
+        Args:
+            text: Text to translate
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+            on_text: Called with each text delta as it arrives
+
+        Returns:
+            Translated text
+        """
+        request = build_request(self.model, text, agent_id)
+
+        start = time.perf_counter()
+        first_token = None
+        # Opening the stream is paced and retried like translate(); latency includes that wait
+        with get_scheduler().stream(self.client, request, agent_id) as stream:
+            for chunk in stream.text_stream:
+                if chunk and first_token is None:
+                    first_token = time.perf_counter() - start
+                if chunk and on_text is not None:
+                    on_text(chunk)
+            message = stream.get_final_message()
+        elapsed = time.perf_counter() - start
+        get_usage_tracker().record(agent_id, message.usage)
+
+        self.stream_timings.append(StreamTiming(
+            agent_id=agent_id,
+            backend="claude",
+            time_to_first_token=first_token if first_token is not None else elapsed,
+            total_seconds=elapsed,
+            output_tokens=message.usage.output_tokens
+        ))
 
         return message.content[0].text.strip()
 
+    def run_pipeline_stream(self, text: str) -> Tuple[str, str, str]:
+        """
+        Run EN → FR → HE → EN, printing each hop's text as it streams in.
+
+        Args:
+            text: English text to translate
+
+        Returns:
+            Tuple of (french, hebrew, final_english)
+        """
+        return stream_pipeline(self.translate_stream, text)
+
     def run_pipeline(self, text: str, verbose: bool = True) -> Tuple[str, str, str]:
         """
         Run the full translation pipeline: EN → FR → HE → EN
@@ -214,6 +174,142 @@ class TranslationAgent:
         return french, hebrew, final_english
 
 
+class AsyncTranslationAgent:
+    """Translate many texts concurrently with the async Claude client."""
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                 concurrency: int = 8):
+        """
+        Initialize the async agent.
+
+        Args:
+            api_key: Anthropic API key (uses env var if not provided)
+            model: Claude model to use
+            concurrency: Most API requests in flight at once
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        if not self.api_key:
+            raise ValueError("ANTHROPIC_API_KEY not set")
+
+        self.model = model
+        self.concurrency = concurrency
+        self.client = get_async_client(self.api_key)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def translate(self, text: str, agent_id: str) -> str:
+        """
+        Translate text with one agent, waiting for a free concurrency slot.
+
+        Args:
+            text: Text to translate
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+
+        Returns:
+            Translated text
+        """
+        request = build_request(self.model, text, agent_id)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore:
+            # Same RPM/TPM budgets and 429 backoff as the blocking agent
+            message = await get_scheduler().acreate(self.client, request, agent_id)
+        get_usage_tracker().record(agent_id, message.usage)
+
+        return message.content[0].text.strip()
+
+    async def _run_one(self, index: int, text: str, agent_id: Optional[str]) -> Dict:
+        """Translate one input (one hop, or the full pipeline) into a result record."""
+        record = {"index": index, "input": text}
+        hops = [agent_id] if agent_id else ["en-fr", "fr-he", "he-en"]
+        hop_latencies = {}
+
+        start = time.perf_counter()
+        try:
+            current = text
+            for hop in hops:
+                hop_start = time.perf_counter()
+                current = await self.translate(current, hop)
+                hop_latencies[hop] = round(time.perf_counter() - hop_start, 4)
+                if not agent_id:
+                    record[{"en-fr": "french", "fr-he": "hebrew", "he-en": "final_english"}[hop]] = current
+            if agent_id:
+                record["output"] = current
+            record["error"] = None
+        except (anthropic.APIError, ValueError) as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+
+        record["latency_seconds"] = round(time.perf_counter() - start, 4)
+        record["hop_latency_seconds"] = hop_latencies
+        return record
+
+    async def run_bulk(self, texts: List[str], agent_id: Optional[str] = None,
+                       output: Optional[TextIO] = None) -> Dict:
+        """
+        Translate every text, writing one JSON line per result as it finishes.
+
+        Lines come out in completion order; each carries its input index.
+        A failed request is written with its error and does not stop the run.
+
+        Args:
+            texts: Texts to translate
+            agent_id: Single agent to run, or None for the full pipeline
+            output: Stream for the JSONL records (default: stdout)
+
+        Returns:
+            Summary with requests, errors, wall_seconds, texts_per_second
+            and latency percentiles
+        """
+        output = output or sys.stdout
+        start = time.perf_counter()
+
+        latencies = []
+        errors = 0
+        tasks = [asyncio.create_task(self._run_one(i, text, agent_id)) for i, text in enumerate(texts)]
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            latencies.append(record["latency_seconds"])
+            errors += record["error"] is not None
+
+        wall_seconds = time.perf_counter() - start
+        latencies.sort()
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            "requests": len(texts),
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "wall_seconds": wall_seconds,
+            "texts_per_second": len(texts) / wall_seconds if wall_seconds else 0.0,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+
+def run_bulk_file(input_file: str, agent_id: Optional[str] = None, concurrency: int = 8,
+                  api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                  output: Optional[TextIO] = None) -> Dict:
+    """
+    Translate a file with one text per line (blank lines skipped).
+
+    Returns:
+        The run_bulk() summary
+    """
+    with open(input_file, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    agent = AsyncTranslationAgent(api_key=api_key, model=model, concurrency=concurrency)
+    return asyncio.run(agent.run_bulk(texts, agent_id=agent_id, output=output))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Run translation agents via Claude API"
@@ -222,24 +318,70 @@ def main():
                        help='Agent to use for translation')
     parser.add_argument('--pipeline', action='store_true',
                        help='Run full translation pipeline (EN → FR → HE → EN)')
-    parser.add_argument('--text', type=str, required=True,
+    parser.add_argument('--text', type=str,
                        help='Text to translate')
+    parser.add_argument('--input-file', type=str,
+                       help='Bulk mode: translate each line of this file, writing JSONL results')
+    parser.add_argument('--concurrency', type=int, default=8,
+                       help='Bulk mode: most API requests in flight at once (default: 8)')
+    parser.add_argument('--output', type=str,
+                       help='Bulk mode: JSONL output file (default: stdout)')
     parser.add_argument('--api-key', type=str,
                        help='Anthropic API key (or use ANTHROPIC_API_KEY env var)')
     parser.add_argument('--model', type=str, default='claude-sonnet-4-20250514',
                        help='Claude model to use')
     parser.add_argument('--quiet', action='store_true',
                        help='Suppress verbose output')
+    parser.add_argument('--stream', action='store_true',
+                       help='Print tokens as they arrive and report time-to-first-token per hop')
+    parser.add_argument('--rpm', type=float, default=None,
+                       help='Requests-per-minute budget to pace to (default: unlimited)')
+    parser.add_argument('--tpm', type=float, default=None,
+                       help='Input tokens-per-minute budget to pace to (default: unlimited)')
 
     args = parser.parse_args()
 
     if not args.agent and not args.pipeline:
         parser.error("Either --agent or --pipeline must be specified")
+    if not args.text and not args.input_file:
+        parser.error("Either --text or --input-file must be specified")
+
+    if args.rpm or args.tpm:
+        configure_scheduler(rpm=args.rpm or DEFAULT_RPM, tpm=args.tpm or DEFAULT_TPM)
+
+    if args.input_file:
+        try:
+            output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+            try:
+                summary = run_bulk_file(args.input_file, agent_id=None if args.pipeline else args.agent,
+                                        concurrency=args.concurrency, api_key=args.api_key,
+                                        model=args.model, output=output)
+            finally:
+                if args.output:
+                    output.close()
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not args.quiet:
+            print(f"\n{summary['requests']} texts ({summary['errors']} errors) in {summary['wall_seconds']:.2f}s, "
+                  f"{summary['texts_per_second']:.2f} texts/s at concurrency {summary['concurrency']}; "
+                  f"latency p50 {summary['latency_p50']:.2f}s, p95 {summary['latency_p95']:.2f}s",
+                  file=sys.stderr)
+            get_usage_tracker().print_report(file=sys.stderr)
+            get_scheduler().print_report(file=sys.stderr)
+        return
 
     try:
         agent = TranslationAgent(api_key=args.api_key, model=args.model)
 
-        if args.pipeline:
+        if args.stream:
+            if args.pipeline:
+                agent.run_pipeline_stream(args.text)
+            else:
+                agent.translate_stream(args.text, args.agent, on_text=print_chunk)
+                print()
+            print_stream_timings(agent.stream_timings)
+        elif args.pipeline:
             french, hebrew, final = agent.run_pipeline(args.text, verbose=not args.quiet)
             if args.quiet:
                 print(final)
@@ -247,6 +389,10 @@ def main():
             result = agent.translate(args.text, args.agent)
             print(result)
 
+        if not args.quiet:
+            get_usage_tracker().print_report()
+            get_scheduler().print_report()
+
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
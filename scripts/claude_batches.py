@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Claude Message Batches - Submit a whole hop as one asynchronous batch
+
+An error-rate sweep has no latency requirement, yet translating it through
+messages.create() pays interactive per-request latency and competes for
+the per-minute rate limits. The Message Batches API takes every request of
+a hop at once, processes them asynchronously at a lower price, and returns
+all results together:
+
+    submit:  messages.batches.create(requests=[{custom_id, params}, ...])
+    poll:    messages.batches.retrieve(id) until processing_status == "ended"
+    collect: messages.batches.results(id) -> one result per custom_id
+
+Requests the batch could not complete (errored, expired, canceled) are
+re-sent through the interactive API so every hop still returns one output
+per input.
+
+Usage:
+    from claude_batches import BatchTranslator
+
+    batches = BatchTranslator(poll_interval=30)
+    outputs = batches.run([{"model": ..., "max_tokens": 1024, "messages": [...]}, ...])
+    batches.print_stats()
+"""
+
+import json
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+from dataclasses import dataclass
+
+
+@dataclass
+class BatchStats:
+    """Work done through the Message Batches API."""
+    batches: int = 0
+    requests: int = 0
+    succeeded: int = 0
+    fallbacks: int = 0             # Re-sent interactively after the batch failed them
+    polls: int = 0
+    wait_seconds: float = 0.0      # Submission to last batch ended
+
+
+class BatchTranslator:
+    """Run lists of Messages API requests as message batches."""
+
+    # API limits on requests and serialized bytes per batch
+    MAX_BATCH_REQUESTS = 100_000
+    MAX_BATCH_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, api_key: Optional[str] = None, poll_interval: float = 30.0,
+                 timeout: Optional[float] = None, verbose: bool = False):
+        """
+        Initialize the translator.
+
+        Args:
+            api_key: Anthropic API key (uses env var if not provided)
+            poll_interval: Seconds between status checks
+            timeout: Seconds to wait for a batch before giving up (default:
+                     no limit; the API expires batches after 24 hours)
+            verbose: Print progress while polling
+        """
+        if poll_interval < 0:
+            raise ValueError("poll_interval must not be negative")
+
+        self.api_key = api_key
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.verbose = verbose
+        self.stats = BatchStats()
+
+    def _client(self):
+        from claude_client import get_client
+        return get_client(self.api_key)
+
+    def run(self, requests: List[Dict], on_message: Optional[Callable] = None) -> List[str]:
+        """
+        Run requests as one batch (or several, above MAX_BATCH_REQUESTS or MAX_BATCH_BYTES).
+
+        Args:
+            requests: messages.create() keyword arguments, one dict per request
+            on_message: Called with each response Message (e.g. to record usage)
+
+        Returns:
+            Text of each response, in request order
+        """
+        from rate_limiter import get_scheduler
+
+        if not requests:
+            return []
+
+        client = self._client()
+        start = time.perf_counter()
+
+        batch_ids = []
+        for chunk in self._chunks(requests):
+            batch = client.messages.batches.create(requests=chunk)
+            batch_ids.append(batch.id)
+            if self.verbose:
+                print(f"  Submitted batch {batch.id} ({len(chunk)} requests)")
+
+        self.stats.batches += len(batch_ids)
+        self.stats.requests += len(requests)
+
+        for batch_id in batch_ids:
+            self._wait(client, batch_id, start)
+        self.stats.wait_seconds += time.perf_counter() - start
+
+        outputs: List[Optional[str]] = [None] * len(requests)
+        for batch_id in batch_ids:
+            for entry in client.messages.batches.results(batch_id):
+                if entry.result.type == "succeeded":
+                    message = entry.result.message
+                    outputs[int(entry.custom_id.rsplit("-", 1)[1])] = message.content[0].text.strip()
+                    if on_message is not None:
+                        on_message(message)
+
+        for i, output in enumerate(outputs):
+            if output is None:
+                message = get_scheduler().create(client, requests[i], hop="batch-retry")
+                outputs[i] = message.content[0].text.strip()
+                self.stats.fallbacks += 1
+                if on_message is not None:
+                    on_message(message)
+            else:
+                self.stats.succeeded += 1
+
+        return outputs
+
+    def _chunks(self, requests: List[Dict]) -> Iterator[List[Dict]]:
+        """
+        Batch entries for requests, split to stay within both API limits.
+
+        Every request carries the full system prompt, so the byte limit can
+        bind long before the request count does. A single request over the
+        byte limit is sent alone (and rejected by the API).
+        """
+        # Room for the {"requests": [...]} envelope
+        envelope = len(json.dumps({"requests": []}))
+        chunk, size = [], envelope
+        for i, params in enumerate(requests):
+            entry = {"custom_id": f"req-{i}", "params": params}
+            entry_size = len(json.dumps(entry).encode("utf-8")) + 2  # ", " separator
+            if chunk and (len(chunk) >= self.MAX_BATCH_REQUESTS or size + entry_size > self.MAX_BATCH_BYTES):
+                yield chunk
+                chunk, size = [], envelope
+            chunk.append(entry)
+            size += entry_size
+        if chunk:
+            yield chunk
+
+    def _wait(self, client, batch_id: str, start: float):
+        """Poll a batch until it has ended."""
+        while True:
+            batch = client.messages.batches.retrieve(batch_id)
+            self.stats.polls += 1
+            if batch.processing_status == "ended":
+                return
+            if self.timeout is not None and time.perf_counter() - start > self.timeout:
+                client.messages.batches.cancel(batch_id)
+                raise TimeoutError(f"Message batch {batch_id} did not finish within {self.timeout}s")
+            if self.verbose:
+                counts = batch.request_counts
+                total = counts.processing + counts.succeeded + counts.errored + counts.canceled + counts.expired
+                print(f"  Batch {batch_id}: {batch.processing_status} ({total - counts.processing}/{total} done)")
+            time.sleep(self.poll_interval)
+
+    def print_stats(self):
+        """Print batch counters."""
+        stats = self.stats
+        print(f"\nMessage batches: {stats.batches} batches, {stats.requests} requests "
+              f"({stats.succeeded} succeeded, {stats.fallbacks} re-sent interactively), "
+              f"{stats.polls} polls, {stats.wait_seconds:.1f}s waiting")
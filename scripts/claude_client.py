@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Claude Client Pool - One keep-alive HTTP connection pool per process
+
+Creating an anthropic.Anthropic client per request opens a new TCP + TLS
+connection every time. translate_with_claude, agent_runner.TranslationAgent
+and any worker in the same process should instead call get_client(), which
+returns clients that share one httpx connection pool:
+
+    - Keep-alive: idle connections are reused for keepalive_expiry seconds
+    - Connection limit: at most max_connections sockets to the API
+    - Metrics: requests sent vs. TCP connections opened, so reuse is visible
+
+Settings come from configure() or the environment:
+    ROUNDTRIP_CLAUDE_MAX_CONNECTIONS  (default: 16)
+    ROUNDTRIP_CLAUDE_KEEPALIVE        (seconds, default: 30)
+
+Usage:
+    from claude_client import get_client, get_pool
+
+    client = get_client(api_key)
+    client.messages.create(...)
+    get_pool().print_stats()
+
+asyncio code (agent_runner.AsyncTranslationAgent) calls get_async_client(),
+which shares the same limits and counters over an async connection pool.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+from dataclasses import dataclass
+
+import anthropic
+import httpx
+
+
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get("ROUNDTRIP_CLAUDE_MAX_CONNECTIONS", "16"))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.environ.get("ROUNDTRIP_CLAUDE_KEEPALIVE", "30"))
+
+
+@dataclass
+class ConnectionStats:
+    """HTTP requests sent and TCP connections opened by a pool."""
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests served on an already open connection."""
+        return max(self.requests - self.connections, 0)
+
+    @property
+    def reuse_rate(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+
+class ClaudeClientPool:
+    """Anthropic clients sharing one keep-alive connection pool."""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY):
+        """
+        Initialize the pool.
+
+        Args:
+            max_connections: Most open connections to the API at once
+            keepalive_expiry: Seconds an idle connection is kept for reuse
+        """
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connection_stats = ConnectionStats()
+        self._lock = threading.Lock()
+        self._clients: Dict[str, anthropic.Anthropic] = {}
+        self._async_clients: Dict[str, anthropic.AsyncAnthropic] = {}
+        self._http_client = anthropic.DefaultHttpxClient(
+            limits=self._limits(),
+            event_hooks={"request": [self._on_request]}
+        )
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    def _on_request(self, request: httpx.Request):
+        """Count the request and watch its connection setup."""
+        with self._lock:
+            self.connection_stats.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: Dict):
+        """httpcore trace callback: a completed TCP connect is a new connection."""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connection_stats.connections += 1
+
+    async def _on_async_request(self, request: httpx.Request):
+        """Async event hook: as _on_request, for the async connection pool."""
+        with self._lock:
+            self.connection_stats.requests += 1
+        request.extensions["trace"] = self._async_trace
+
+    async def _async_trace(self, event_name: str, info: Dict):
+        self._trace(event_name, info)
+
+    def client(self, api_key: Optional[str] = None) -> anthropic.Anthropic:
+        """
+        Client for api_key, created on first use and shared afterwards.
+
+        Args:
+            api_key: Anthropic API key (uses env var if not provided)
+
+        Returns:
+            anthropic.Anthropic using the shared connection pool
+        """
+        api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not set")
+
+        with self._lock:
+            if api_key not in self._clients:
+                self._clients[api_key] = anthropic.Anthropic(api_key=api_key, http_client=self._http_client)
+            return self._clients[api_key]
+
+    def async_client(self, api_key: Optional[str] = None) -> anthropic.AsyncAnthropic:
+        """
+        Async client for api_key, created on first use and shared afterwards.
+
+        Async clients share their own connection pool (created on first use,
+        with the same limits) and count toward the same connection_stats.
+        Keep-alive connections belong to the event loop that opened them, so
+        use one pool per asyncio.run() (reset_pool() between runs).
+
+        Args:
+            api_key: Anthropic API key (uses env var if not provided)
+
+        Returns:
+            anthropic.AsyncAnthropic using the shared async connection pool
+        """
+        api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not set")
+
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_http_client = anthropic.DefaultAsyncHttpxClient(
+                    limits=self._limits(),
+                    event_hooks={"request": [self._on_async_request]}
+                )
+            if api_key not in self._async_clients:
+                self._async_clients[api_key] = anthropic.AsyncAnthropic(
+                    api_key=api_key, http_client=self._async_http_client)
+            return self._async_clients[api_key]
+
+    def stats(self) -> Dict:
+        """Connection reuse counters."""
+        with self._lock:
+            stats = self.connection_stats
+            return {
+                "requests": stats.requests,
+                "connections": stats.connections,
+                "reused": stats.reused,
+                "reuse_rate": stats.reuse_rate,
+                "max_connections": self.max_connections,
+            }
+
+    def print_stats(self):
+        """Print connection reuse counters."""
+        stats = self.stats()
+        print(f"\nClaude connections: {stats['requests']} requests over {stats['connections']} connections "
+              f"({stats['reuse_rate']:.0%} reused, limit {stats['max_connections']})")
+
+    def close(self):
+        """Close every pooled connection (async connections close with their event loop)."""
+        self._http_client.close()
+        self._async_http_client = None
+        self._async_clients.clear()
+
+
+_pool: Optional[ClaudeClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ClaudeClientPool:
+    """The process-wide pool, created with default settings on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ClaudeClientPool()
+        return _pool
+
+
+def get_client(api_key: Optional[str] = None) -> anthropic.Anthropic:
+    """Shared client for api_key from the process-wide pool."""
+    return get_pool().client(api_key)
+
+
+def get_async_client(api_key: Optional[str] = None) -> anthropic.AsyncAnthropic:
+    """Shared async client for api_key from the process-wide pool."""
+    return get_pool().async_client(api_key)
+
+
+def configure(max_connections: int = DEFAULT_MAX_CONNECTIONS,
+              keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY) -> ClaudeClientPool:
+    """
+    Replace the process-wide pool with one using these settings.
+
+    Clients handed out by the previous pool stop working, so call this
+    before translating.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ClaudeClientPool(max_connections=max_connections, keepalive_expiry=keepalive_expiry)
+        return _pool
+
+
+def reset_pool():
+    """Close and drop the process-wide pool (the next get_client() starts fresh)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
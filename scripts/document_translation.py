@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Document Translation - Round-trip whole articles through the local agents
+
+The MarianMT agents truncate every input at 512 tokens, so a long document
+passed to run_pipeline() silently loses its tail, and a single very long
+sequence is the slowest shape for attention. DocumentTranslator instead:
+
+    1. Splits the document into lines/paragraphs, keeping the separators
+    2. Splits each paragraph into sentences (and over-long sentences into
+       word chunks that fit the token budget)
+    3. Runs all segments through run_pipeline_batch(), so each hop sees
+       length-bucketed batches of short sequences
+    4. Reassembles the French, Hebrew and final English documents with the
+       original paragraph structure
+
+Usage:
+    python document_translation.py --input-file article.txt
+    python document_translation.py --input-file article.txt --output-file roundtrip.txt
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from typing import List, Optional, Tuple
+from dataclasses import dataclass, field
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+# Sentence end: terminal punctuation, optionally followed by one closing quote
+# or bracket, then whitespace
+_SENTENCE_END = re.compile(r'(?<=[.!?…׃])\s+|(?<=[.!?…׃]["\'”’»)\]])\s+')
+
+# Line breaks (with surrounding blank space) separate paragraphs and list items
+_PARAGRAPH_BREAK = re.compile(r'(\s*\n\s*)')
+
+
+def split_paragraphs(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Split text into paragraphs and the separators between them.
+
+    Args:
+        text: Document text
+
+    Returns:
+        (paragraphs, separators) where separators[i] follows paragraphs[i];
+        joining them back gives the original text minus outer whitespace
+    """
+    parts = _PARAGRAPH_BREAK.split(text.strip())
+    return parts[0::2], parts[1::2]
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    """
+    Split a paragraph into sentences at terminal punctuation.
+
+    Args:
+        paragraph: Single paragraph of text
+
+    Returns:
+        Non-empty sentences in order
+    """
+    return [s.strip() for s in _SENTENCE_END.split(paragraph) if s.strip()]
+
+
+@dataclass
+class DocumentResult:
+    """Round-trip output for one document."""
+    original: str
+    french: str
+    hebrew: str
+    final_english: str
+    paragraphs: int
+    segments: int
+    words: int
+    seconds: float
+    segment_lengths: List[int] = field(default_factory=list)  # Source tokens per segment
+
+    @property
+    def words_per_second(self) -> float:
+        return self.words / self.seconds if self.seconds else 0.0
+
+    @property
+    def segments_per_second(self) -> float:
+        return self.segments / self.seconds if self.seconds else 0.0
+
+
+class DocumentTranslator:
+    """Translate whole documents through EN -> FR -> HE -> EN by sentence."""
+
+    # Longest segment sent to a hop, in source tokens. Well under the 512-token
+    # model limit so French and Hebrew expansions are not truncated downstream.
+    DEFAULT_MAX_SEGMENT_TOKENS = 256
+
+    def __init__(self, pipeline, max_segment_tokens: int = DEFAULT_MAX_SEGMENT_TOKENS,
+                 max_batch_tokens: Optional[int] = None):
+        """
+        Initialize the translator.
+
+        Args:
+            pipeline: LocalTranslationPipeline providing the agents
+            max_segment_tokens: Sentences longer than this are split into word chunks
+            max_batch_tokens: Padded-token budget per generate() call
+                              (default: the pipeline's DEFAULT_MAX_BATCH_TOKENS)
+        """
+        if max_segment_tokens < 1:
+            raise ValueError("max_segment_tokens must be at least 1")
+        if max_segment_tokens > pipeline.MAX_INPUT_LENGTH:
+            raise ValueError(f"max_segment_tokens must not exceed the model limit "
+                             f"({pipeline.MAX_INPUT_LENGTH})")
+
+        self.pipeline = pipeline
+        self.max_segment_tokens = max_segment_tokens
+        self.max_batch_tokens = max_batch_tokens or pipeline.DEFAULT_MAX_BATCH_TOKENS
+
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """Source-side token count of each text (en-fr tokenizer)."""
+        if not texts:
+            return []
+        tokenizer = self.pipeline.load_agent("en-fr").tokenizer
+        return [len(ids) for ids in tokenizer(list(texts))["input_ids"]]
+
+    def _fit(self, sentence: str) -> List[str]:
+        """Split a sentence into word chunks of at most max_segment_tokens."""
+        if self._token_lengths([sentence])[0] <= self.max_segment_tokens:
+            return [sentence]
+
+        words = sentence.split()
+        if len(words) == 1:
+            # A single enormous "word" cannot be split on whitespace; the
+            # tokenizer truncates it as before
+            return [sentence]
+
+        middle = len(words) // 2
+        return self._fit(" ".join(words[:middle])) + self._fit(" ".join(words[middle:]))
+
+    def segment(self, text: str) -> Tuple[List[List[str]], List[str]]:
+        """
+        Segment a document for translation.
+
+        Args:
+            text: Document text
+
+        Returns:
+            (segments per paragraph, separators between paragraphs)
+        """
+        paragraphs, separators = split_paragraphs(text)
+        segmented = []
+        for paragraph in paragraphs:
+            segments = []
+            for sentence in split_sentences(paragraph):
+                segments.extend(self._fit(sentence))
+            segmented.append(segments)
+        return segmented, separators
+
+    @staticmethod
+    def _reassemble(paragraph_sizes: List[int], separators: List[str], outputs: List[str]) -> str:
+        """Join translated segments back into paragraphs with the original separators."""
+        pieces = []
+        position = 0
+        for i, size in enumerate(paragraph_sizes):
+            pieces.append(" ".join(outputs[position:position + size]))
+            position += size
+            if i < len(separators):
+                pieces.append(separators[i])
+        return "".join(pieces)
+
+    def translate_document(self, text: str) -> DocumentResult:
+        """
+        Round-trip one document.
+
+        Args:
+            text: English document
+
+        Returns:
+            DocumentResult with the three reassembled documents and timings
+        """
+        start = time.perf_counter()
+        segmented, separators = self.segment(text)
+        segments = [segment for paragraph in segmented for segment in paragraph]
+
+        outputs = self.pipeline.run_pipeline_batch(segments, self.max_batch_tokens) if segments else []
+        seconds = time.perf_counter() - start
+
+        sizes = [len(paragraph) for paragraph in segmented]
+        french, hebrew, final_english = (
+            self._reassemble(sizes, separators, [output[hop] for output in outputs]) for hop in range(3)
+        )
+
+        return DocumentResult(
+            original=text,
+            french=french,
+            hebrew=hebrew,
+            final_english=final_english,
+            paragraphs=sum(1 for paragraph in segmented if paragraph),
+            segments=len(segments),
+            words=len(text.split()),
+            seconds=seconds,
+            segment_lengths=self._token_lengths(segments)
+        )
+
+    def translate_documents(self, texts: List[str], verbose: bool = True) -> List[DocumentResult]:
+        """
+        Round-trip several documents, one batched run per document.
+
+        Args:
+            texts: English documents
+            verbose: Print the per-document throughput report
+
+        Returns:
+            One DocumentResult per document, in input order
+        """
+        results = [self.translate_document(text) for text in texts]
+        if verbose:
+            print_document_report(results)
+        return results
+
+
+def print_document_report(results: List[DocumentResult]):
+    """Print per-document throughput."""
+    print("\nDocument throughput:")
+    print(f"  {'Doc':>4} {'Paras':>6} {'Segs':>6} {'Words':>7} {'Max tok':>8} {'Seconds':>9} "
+          f"{'Words/s':>9} {'Segs/s':>8}")
+    for i, result in enumerate(results, 1):
+        longest = max(result.segment_lengths, default=0)
+        print(f"  {i:>4} {result.paragraphs:>6} {result.segments:>6} {result.words:>7} {longest:>8} "
+              f"{result.seconds:>9.2f} {result.words_per_second:>9.1f} {result.segments_per_second:>8.1f}")
+
+
+def main():
+    from local_translation_agents import LocalTranslationPipeline
+
+    parser = argparse.ArgumentParser(
+        description="Round-trip whole documents through the local agents, sentence by sentence"
+    )
+    parser.add_argument('--input-file', type=str, required=True,
+                       help='English document (paragraphs separated by line breaks)')
+    parser.add_argument('--output-file', type=str, default=None,
+                       help='Write the final English document here (default: print it)')
+    parser.add_argument('--max-segment-tokens', type=int,
+                       default=DocumentTranslator.DEFAULT_MAX_SEGMENT_TOKENS,
+                       help=f'Split longer sentences into chunks '
+                            f'(default: {DocumentTranslator.DEFAULT_MAX_SEGMENT_TOKENS})')
+    parser.add_argument('--backend', type=str, choices=list(LocalTranslationPipeline.BACKENDS),
+                       default='transformers',
+                       help='Inference runtime (default: transformers)')
+
+    args = parser.parse_args()
+
+    with open(args.input_file, encoding='utf-8') as f:
+        text = f.read()
+
+    pipeline = LocalTranslationPipeline(verbose=False, backend=args.backend)
+    translator = DocumentTranslator(pipeline, max_segment_tokens=args.max_segment_tokens)
+    result = translator.translate_documents([text])[0]
+
+    if args.output_file:
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            f.write(result.final_english + "\n")
+        print(f"\nFinal English written to {args.output_file}")
+    else:
+        print("\n" + result.final_english)
+
+    pipeline.print_throughput_report()
+
+
+if __name__ == "__main__":
+    main()
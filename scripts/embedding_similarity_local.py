@@ -18,11 +18,12 @@ Usage:
 import sys
 import os
 import math
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 import json
 from datetime import datetime
 
 try:
+    import numpy as np
     from sentence_transformers import SentenceTransformer
 except ImportError:
     print("Error: sentence-transformers package not installed.")
@@ -33,7 +34,9 @@ except ImportError:
 class LocalEmbeddingSimilarityChecker:
     """Check semantic similarity between two sentences using local embeddings."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    DEFAULT_BATCH_SIZE = 64
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", store=None):
         """
         Initialize the embedding checker with a local model.
 
@@ -41,10 +44,13 @@ class LocalEmbeddingSimilarityChecker:
             model_name: The sentence-transformers model to use
                        (default: all-MiniLM-L6-v2 - small and fast)
                        Other options: 'all-mpnet-base-v2' (more accurate, larger)
+            store: Optional embedding_store.EmbeddingStore; score_pairs() then
+                   only embeds texts the store has not seen for this model
         """
         print(f"Loading embedding model: {model_name}")
         self.model = SentenceTransformer(model_name)
         self.model_name = model_name
+        self.store = store
         self.input_sentence = None
         self.output_sentence = None
         self.input_embedding = None
@@ -65,6 +71,57 @@ class LocalEmbeddingSimilarityChecker:
         embeddings = self.model.encode([text], convert_to_numpy=True)
         return embeddings[0].tolist()
 
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get embeddings for many sentences with a single encode call.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            List of embedding vectors, one per text, in input order
+        """
+        if not texts:
+            return []
+        embeddings = self.model.encode(list(texts), convert_to_numpy=True)
+        return [embedding.tolist() for embedding in embeddings]
+
+    def score_pairs(self, originals: Sequence[str], finals: Sequence[str],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> "np.ndarray":
+        """
+        Cosine similarity of many (original, final) sentence pairs.
+
+        Every distinct text is embedded once, in a single batched encode
+        call with unit-length embeddings, so each similarity is a plain dot
+        product and all of them come from one matrix operation. With a
+        store, only texts missing from it are encoded.
+
+        Args:
+            originals: First sentence of each pair
+            finals: Second sentence of each pair
+            batch_size: Sentences per forward pass of the model
+
+        Returns:
+            Float array of similarities, one per pair, in input order
+        """
+        if len(originals) != len(finals):
+            raise ValueError("originals and finals must have the same length")
+        if not len(originals):
+            return np.zeros(0, dtype=np.float32)
+
+        unique = list(dict.fromkeys([*originals, *finals]))
+        row = {text: i for i, text in enumerate(unique)}
+        encode = lambda texts: self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                                 normalize_embeddings=True)
+        if self.store is not None:
+            embeddings = self.store.get_or_embed(self.model_name, unique, encode)
+        else:
+            embeddings = encode(unique)
+
+        left = embeddings[[row[text] for text in originals]]
+        right = embeddings[[row[text] for text in finals]]
+        return np.einsum("ij,ij->i", left, right)
+
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
         Calculate cosine similarity between two vectors.
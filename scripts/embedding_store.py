@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Embedding Store - Persistent, memory-mapped embeddings for similarity scoring
+
+Every sweep embeds the same original TEST_SENTENCES again for every error
+rate, and outputs that repeat across runs are embedded again too. The store
+keeps each embedding once on disk:
+
+    embeddings-<model id>-<generation>.f32
+                                  float32 matrix per model, one row per
+                                  text, memory-mapped for reads
+    index.sqlite                  (model_name, text hash) -> row, plus each
+                                  model's dimension and current generation
+
+Every model has its own matrix, so switching to a model with a different
+embedding size just starts a new file. New embeddings are only ever
+appended. Rows become dead when their model is removed or a crashed writer
+appended them without indexing them; compact() rewrites each model's live
+rows into its next generation's file (optionally keeping only the most
+recently used ones) and switches the index over in one transaction, so a
+crash leaves either the old or the new matrices in use.
+
+Rows hold the normalized embeddings used by
+LocalEmbeddingSimilarityChecker.score_pairs().
+
+Usage (as module):
+    from embedding_store import EmbeddingStore
+
+    store = EmbeddingStore()
+    vectors = store.get_or_embed("all-MiniLM-L6-v2", texts, embed_missing)
+    store.print_stats()
+
+Usage (command line):
+    python embedding_store.py                      # Show store size
+    python embedding_store.py --compact            # Reclaim dead rows
+    python embedding_store.py --compact --max-rows 50000
+    python embedding_store.py --clear              # Delete all embeddings
+"""
+
+import os
+import glob
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "ROUNDTRIP_EMBEDDING_STORE",
+    os.path.join(os.path.expanduser("~"), ".cache", "round-trip-translator", "embeddings")
+)
+
+DTYPE = np.float32
+
+
+def text_hash(text: str) -> str:
+    """Hex SHA-256 of the exact text (embeddings differ for any change)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only matrices of embeddings on disk (one per model), indexed by (model, text hash)."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: Directory holding the matrix and index files
+        """
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # model name -> (matrix file, memory map)
+        self._matrices: Dict[str, Tuple[str, np.memmap]] = {}
+        # Autocommit; writes use explicit BEGIN IMMEDIATE so appends from
+        # several processes are serialized
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite"), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._drop_single_matrix_layout()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " name TEXT NOT NULL UNIQUE,"
+            " dim INTEGER NOT NULL,"
+            " generation INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " row INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_last_used ON rows(last_used)")
+
+    def _drop_single_matrix_layout(self):
+        """Discard a store written with one shared matrix (it is only a cache; rows get re-embedded)."""
+        legacy = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'").fetchone()
+        if legacy is None:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DROP TABLE IF EXISTS rows")
+            self._conn.execute("DROP TABLE IF EXISTS meta")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        for path in glob.glob(os.path.join(self.path, "embeddings-*.f32")):
+            os.remove(path)
+
+    def _model(self, model_name: str) -> Optional[Tuple[int, int, int]]:
+        """(id, dim, generation) of a stored model, or None."""
+        return self._conn.execute("SELECT id, dim, generation FROM models WHERE name = ?",
+                                  (model_name,)).fetchone()
+
+    def dim(self, model_name: str) -> Optional[int]:
+        """Embedding dimension of a model, fixed by its first add() (None if not stored)."""
+        model = self._model(model_name)
+        return model[1] if model else None
+
+    def _matrix_path(self, model_name: str) -> Optional[str]:
+        model = self._model(model_name)
+        if model is None:
+            return None
+        model_id, _, generation = model
+        return os.path.join(self.path, f"embeddings-{model_id}-{generation}.f32")
+
+    @staticmethod
+    def _row_count(path: Optional[str], dim: Optional[int]) -> int:
+        """Whole rows in a matrix file (live or dead)."""
+        if path is None or not dim or not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // (dim * DTYPE().itemsize)
+
+    def _map(self, model_name: str, rows_needed: int) -> np.memmap:
+        """Memory-map a model's matrix, remapping if it has grown or been compacted."""
+        path = self._matrix_path(model_name)
+        mapped = self._matrices.get(model_name)
+        if mapped is None or mapped[0] != path or len(mapped[1]) < rows_needed:
+            dim = self.dim(model_name)
+            mapped = (path, np.memmap(path, dtype=DTYPE, mode="r", shape=(self._row_count(path, dim), dim)))
+            self._matrices[model_name] = mapped
+        return mapped[1]
+
+    def lookup(self, model_name: str, texts: Sequence[str]) -> List[Optional[int]]:
+        """
+        Rows of stored embeddings.
+
+        Returns:
+            Row per text, or None where the text has not been embedded
+        """
+        hashes = [text_hash(text) for text in texts]
+        with self._lock:
+            found: Dict[str, int] = {}
+            for key in set(hashes):
+                row = self._conn.execute("SELECT row FROM rows WHERE model = ? AND text_hash = ?",
+                                         (model_name, key)).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE rows SET last_used = ? WHERE model = ? AND text_hash = ?",
+                                       [(now, model_name, key) for key in found])
+
+            rows = [found.get(key) for key in hashes]
+            hits = sum(row is not None for row in rows)
+            self.hits += hits
+            self.misses += len(rows) - hits
+        return rows
+
+    def vectors(self, model_name: str, rows: Sequence[int]) -> np.ndarray:
+        """A model's embeddings at rows (a copy, safe to keep after compaction)."""
+        rows = list(rows)
+        with self._lock:
+            if not rows:
+                return np.zeros((0, self.dim(model_name) or 0), dtype=DTYPE)
+            return np.array(self._map(model_name, max(rows) + 1)[rows])
+
+    def add(self, model_name: str, texts: Sequence[str], embeddings: np.ndarray) -> List[int]:
+        """
+        Append embeddings for texts.
+
+        Texts that are already stored (e.g. added by another process in the
+        meantime) keep their existing row.
+
+        Args:
+            model_name: Model that produced the embeddings
+            texts: Embedded texts
+            embeddings: Matrix with one row per text
+
+        Returns:
+            Row of each text
+
+        Raises:
+            ValueError: if the shape does not match texts or the model's stored dimension
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=DTYPE)
+        if embeddings.ndim != 2 or len(embeddings) != len(texts):
+            raise ValueError("embeddings must be a matrix with one row per text")
+        hashes = [text_hash(text) for text in texts]
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self.dim(model_name)
+                if dim is None:
+                    dim = embeddings.shape[1]
+                    self._conn.execute("INSERT INTO models (name, dim) VALUES (?, ?)", (model_name, dim))
+                elif embeddings.shape[1] != dim:
+                    raise ValueError(f"{model_name} embeddings are {dim}-dimensional, got {embeddings.shape[1]}")
+
+                rows: Dict[str, int] = {}
+                for key in set(hashes):
+                    row = self._conn.execute("SELECT row FROM rows WHERE model = ? AND text_hash = ?",
+                                             (model_name, key)).fetchone()
+                    if row is not None:
+                        rows[key] = row[0]
+                new = []
+                for i, key in enumerate(hashes):
+                    if key not in rows:
+                        rows[key] = -1  # Claimed by its first occurrence
+                        new.append(i)
+
+                path = self._matrix_path(model_name)
+                start = self._row_count(path, dim)
+                row_bytes = dim * DTYPE().itemsize
+                with open(path, "ab+") as f:
+                    # Drop a partial row left by a crashed writer
+                    f.truncate(start * row_bytes)
+                    f.write(embeddings[new].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                now = time.time()
+                for offset, i in enumerate(new):
+                    rows[hashes[i]] = start + offset
+                self._conn.executemany(
+                    "INSERT INTO rows (model, text_hash, row, last_used) VALUES (?, ?, ?, ?)",
+                    [(model_name, hashes[i], rows[hashes[i]], now) for i in new])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [rows[key] for key in hashes]
+
+    def get_or_embed(self, model_name: str, texts: Sequence[str],
+                     embed: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Stored embeddings of texts, embedding and storing the missing ones.
+
+        Args:
+            model_name: Model the embeddings belong to
+            texts: Texts to look up
+            embed: Called once with the distinct missing texts; returns their matrix
+
+        Returns:
+            Matrix with one row per text, in input order
+        """
+        rows = self.lookup(model_name, texts)
+        missing = list(dict.fromkeys(text for text, row in zip(texts, rows) if row is None))
+        if missing:
+            added = dict(zip(missing, self.add(model_name, missing, embed(missing))))
+            rows = [added[text] if row is None else row for text, row in zip(texts, rows)]
+        return self.vectors(model_name, rows)
+
+    def remove_model(self, model_name: str) -> int:
+        """Forget a model's embeddings (their rows stay until compact()); returns rows dropped."""
+        with self._lock:
+            return self._conn.execute("DELETE FROM rows WHERE model = ?", (model_name,)).rowcount
+
+    def compact(self, max_rows: Optional[int] = None, chunk_rows: int = 4096) -> int:
+        """
+        Rewrite each model's matrix with only live rows.
+
+        Run it between sweeps: other processes holding the store open keep
+        reading the old matrices until they reopen it. Models left without
+        rows are dropped along with their files.
+
+        Args:
+            max_rows: Keep at most this many rows over all models, most recently used first
+            chunk_rows: Rows copied per write
+
+        Returns:
+            Rows reclaimed
+        """
+        if max_rows is not None and max_rows < 0:
+            raise ValueError("max_rows must not be negative")
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                live = self._conn.execute(
+                    "SELECT model, text_hash, row FROM rows ORDER BY last_used DESC").fetchall()
+                if max_rows is not None and len(live) > max_rows:
+                    self._conn.executemany("DELETE FROM rows WHERE model = ? AND text_hash = ?",
+                                           [(model, key) for model, key, _ in live[max_rows:]])
+                    live = live[:max_rows]
+
+                by_model: Dict[str, List[Tuple[str, int]]] = {}
+                for model, key, row in live:
+                    by_model.setdefault(model, []).append((key, row))
+
+                reclaimed = 0
+                for model_name, model_id, dim, generation in self._conn.execute(
+                        "SELECT name, id, dim, generation FROM models").fetchall():
+                    old_path = self._matrix_path(model_name)
+                    total = self._row_count(old_path, dim)
+                    entries = sorted(by_model.get(model_name, []), key=lambda entry: entry[1])
+                    reclaimed += total - len(entries)
+                    if not entries:
+                        self._conn.execute("DELETE FROM models WHERE id = ?", (model_id,))
+                        continue
+
+                    new_path = os.path.join(self.path, f"embeddings-{model_id}-{generation + 1}.f32")
+                    with open(new_path, "wb") as f:
+                        matrix = self._map(model_name, total)
+                        for start in range(0, len(entries), chunk_rows):
+                            chunk = [row for _, row in entries[start:start + chunk_rows]]
+                            f.write(np.ascontiguousarray(matrix[chunk]).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                    self._conn.executemany(
+                        "UPDATE rows SET row = ? WHERE model = ? AND text_hash = ?",
+                        [(new_row, model_name, key) for new_row, (key, _) in enumerate(entries)])
+                    self._conn.execute("UPDATE models SET generation = ? WHERE id = ?",
+                                       (generation + 1, model_id))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._matrices = {}
+            # Older generations, dropped models and files of an interrupted compaction are unused now
+            current = {self._matrix_path(name) for (name,) in self._conn.execute("SELECT name FROM models")}
+            for path in glob.glob(os.path.join(self.path, "embeddings-*.f32")):
+                if path not in current:
+                    os.remove(path)
+
+        return reclaimed
+
+    def clear(self):
+        """Delete every embedding and reclaim the space."""
+        with self._lock:
+            self._conn.execute("DELETE FROM rows")
+        self.compact()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this session and the size of the matrices."""
+        live = len(self)
+        rows = size = 0
+        with self._lock:
+            models = self._conn.execute("SELECT name, dim FROM models").fetchall()
+            for model_name, dim in models:
+                count = self._row_count(self._matrix_path(model_name), dim)
+                rows += count
+                size += count * dim * DTYPE().itemsize
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "models": len(models),
+            "rows": rows,
+            "live_rows": live,
+            "dead_rows": rows - live,
+            "size_mb": size / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def print_stats(self):
+        """Print hit/miss counters and the matrices' size."""
+        stats = self.stats()
+        print(f"\nEmbedding store: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['live_rows']} embeddings "
+              f"({stats['dead_rows']} dead rows, {stats['size_mb']:.1f} MB)")
+
+    def close(self):
+        """Release the memory map and close the index."""
+        with self._lock:
+            self._matrices = {}
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, compact or clear the embedding store")
+    parser.add_argument('--path', type=str, default=DEFAULT_STORE_PATH,
+                       help=f'Store directory (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--compact', action='store_true',
+                       help='Rewrite the matrices without dead rows')
+    parser.add_argument('--max-rows', type=int, default=None,
+                       help='With --compact: keep only the N most recently used embeddings')
+    parser.add_argument('--remove-model', type=str, default=None,
+                       help="Forget one model's embeddings (reclaimed by --compact)")
+    parser.add_argument('--clear', action='store_true',
+                       help='Delete all stored embeddings')
+
+    args = parser.parse_args()
+
+    store = EmbeddingStore(args.path)
+    if args.remove_model:
+        print(f"Removed {store.remove_model(args.remove_model)} embeddings of {args.remove_model}")
+    if args.clear:
+        store.clear()
+        print(f"Cleared {args.path}")
+    elif args.compact:
+        print(f"Reclaimed {store.compact(max_rows=args.max_rows)} rows")
+    stats = store.stats()
+    print(f"{stats['live_rows']} embeddings ({stats['dead_rows']} dead rows, "
+          f"{stats['size_mb']:.1f} MB) in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
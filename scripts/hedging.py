@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Hedged Translation - Race a slow Claude hop against the warm local model
+
+One slow Claude response stalls the whole EN -> FR -> HE -> EN round trip.
+HedgedTranslator gives each hop a deadline:
+
+    t = 0          start the hop on Claude (primary)
+    t = deadline   no answer yet -> start the same hop on the local
+                   MarianMT agent (fallback)
+    first result   wins; the other is left to finish in the background
+
+A primary that fails before the deadline starts the fallback immediately.
+The primary's own latency is still recorded when it finishes late, so the
+report compares the tail-latency distribution without hedging (Claude
+alone) with the latency actually seen (hedged).
+
+Usage:
+    from hedging import HedgedTranslator
+
+    hedger = HedgedTranslator(claude_translate, local_pipeline.translate, deadline=5.0)
+    hop = hedger.translate("Hello", "en-fr")      # hop.output, hop.backend, hop.seconds
+    hedger.close()
+    hedger.print_report()
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Sequence
+from dataclasses import dataclass
+
+
+@dataclass
+class HedgedHop:
+    """Outcome of one hedged hop."""
+    output: Any       # What the winning backend returned
+    backend: str      # Name of the backend whose result won
+    seconds: float    # Latency of the winning result
+    hedged: bool      # Whether the fallback was started
+
+
+def latency_percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """Count, p50, p90, p99 and max of a list of latencies (nearest rank)."""
+    if not values:
+        return {"count": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+    return {"count": len(ordered), "p50": rank(0.50), "p90": rank(0.90), "p99": rank(0.99), "max": ordered[-1]}
+
+
+class HedgedTranslator:
+    """Translate hops on a primary backend, hedging to a fallback after a deadline."""
+
+    def __init__(self, primary: Callable[[str, str], Any], fallback: Callable[[str, str], Any],
+                 deadline: float, primary_name: str = "claude", fallback_name: str = "local",
+                 max_primary_workers: int = 16):
+        """
+        Initialize the translator.
+
+        Args:
+            primary: translate(text, agent_id) on the preferred backend
+            fallback: translate(text, agent_id) on the backup backend (kept warm)
+            deadline: Seconds to wait for the primary before starting the fallback
+            primary_name: Backend label for primary results
+            fallback_name: Backend label for fallback results
+            max_primary_workers: Primary calls that may be in flight, including
+                                 losers still finishing in the background
+        """
+        if deadline < 0:
+            raise ValueError("deadline must not be negative")
+
+        self.primary = primary
+        self.fallback = fallback
+        self.deadline = deadline
+        self.primary_name = primary_name
+        self.fallback_name = fallback_name
+        self._primary_pool = ThreadPoolExecutor(max_primary_workers, thread_name_prefix="hedge-primary")
+        # The local model uses every core already: run one fallback at a time
+        self._fallback_pool = ThreadPoolExecutor(1, thread_name_prefix="hedge-fallback")
+        self._lock = threading.Lock()
+        self.primary_latencies: Dict[str, List[float]] = {}
+        self.hedged_latencies: Dict[str, List[float]] = {}
+        self.hedges: Dict[str, int] = {}
+        self.fallback_wins: Dict[str, int] = {}
+
+    def _record_primary(self, agent_id: str, start: float, future):
+        """Done-callback: the primary's own latency, even if it lost the race."""
+        if future.exception() is None:
+            with self._lock:
+                self.primary_latencies.setdefault(agent_id, []).append(time.perf_counter() - start)
+
+    def translate(self, text: str, agent_id: str) -> HedgedHop:
+        """
+        Translate one hop, hedging if the primary misses the deadline.
+
+        Args:
+            text: Text to translate
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+
+        Returns:
+            HedgedHop with the winning output and its backend
+
+        Raises:
+            The primary's exception if every started backend failed
+        """
+        start = time.perf_counter()
+        primary = self._primary_pool.submit(self.primary, text, agent_id)
+        primary.add_done_callback(lambda future: self._record_primary(agent_id, start, future))
+        backends = {primary: self.primary_name}
+
+        wait([primary], timeout=self.deadline)
+        hedged = not primary.done() or primary.exception() is not None
+        if hedged:
+            backends[self._fallback_pool.submit(self.fallback, text, agent_id)] = self.fallback_name
+
+        pending = set(backends)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the primary when both finished together
+            for future in sorted(done, key=lambda f: f is not primary):
+                if future.exception() is None:
+                    elapsed = time.perf_counter() - start
+                    with self._lock:
+                        self.hedged_latencies.setdefault(agent_id, []).append(elapsed)
+                        self.hedges[agent_id] = self.hedges.get(agent_id, 0) + hedged
+                        if future is not primary:
+                            self.fallback_wins[agent_id] = self.fallback_wins.get(agent_id, 0) + 1
+                    return HedgedHop(future.result(), backends[future], elapsed, hedged)
+
+        raise primary.exception()
+
+    def latency_report(self) -> Dict[str, Dict]:
+        """
+        Tail latency per hop without and with hedging.
+
+        Returns:
+            agent_id -> {"before": percentiles of primary latencies,
+                         "after": percentiles of hedged latencies,
+                         "hedged": hops that started the fallback,
+                         "fallback_wins": hops the fallback answered}
+        """
+        with self._lock:
+            return {
+                agent_id: {
+                    "before": latency_percentiles(self.primary_latencies.get(agent_id, [])),
+                    "after": latency_percentiles(latencies),
+                    "hedged": self.hedges.get(agent_id, 0),
+                    "fallback_wins": self.fallback_wins.get(agent_id, 0),
+                }
+                for agent_id, latencies in self.hedged_latencies.items()
+            }
+
+    def print_report(self):
+        """Print per-hop tail latency before and after hedging."""
+        report = self.latency_report()
+        if not report:
+            return
+        print(f"\nHedging ({self.primary_name} -> {self.fallback_name} after {self.deadline:g}s):")
+        print(f"  {'Hop':<8} {'':<7} {'Count':>6} {'p50 (s)':>8} {'p90 (s)':>8} {'p99 (s)':>8} {'Max (s)':>8}")
+        for agent_id, hop in report.items():
+            for label in ("before", "after"):
+                stats = hop[label]
+                print(f"  {agent_id if label == 'before' else '':<8} {label:<7} {stats['count']:>6} "
+                      f"{stats['p50']:>8.2f} {stats['p90']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}")
+            print(f"  {'':<8} hedged {hop['hedged']}, {self.fallback_name} won {hop['fallback_wins']}")
+
+    def close(self, wait_for_primaries: bool = True):
+        """
+        Shut down the worker threads.
+
+        Args:
+            wait_for_primaries: Wait for losing primary calls to finish so
+                                their latencies appear in the report
+        """
+        self._primary_pool.shutdown(wait=wait_for_primaries)
+        self._fallback_pool.shutdown(wait=wait_for_primaries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -16,21 +16,44 @@ Usage:
     python local_translation_agents.py --text "Your text here"
     python local_translation_agents.py --agent en-fr --text "Hello world"
     python local_translation_agents.py --pipeline --text "Your text here"
+    python local_translation_agents.py --greedy --threads 4 --text "Your text here"
+    python local_translation_agents.py --quantize int8 --text "Your text here"
+    python local_translation_agents.py --compare-quantization   # fp32 vs int8 report
+    python local_translation_agents.py --backend ctranslate2 --text "Your text here"
+    python local_translation_agents.py --benchmark-backends     # per-hop backend comparison
+    python local_translation_agents.py --stream --text "Your text here"
+
+If translation_daemon.py is running, translate/pipeline requests are sent to
+it instead of loading the models in this process (disable with --no-daemon).
+For texts longer than one sentence, see document_translation.py.
 """
 
 import os
 import sys
+import time
+import gc
+import shutil
 import argparse
-from typing import Tuple, Optional
-from dataclasses import dataclass
+import tempfile
+import warnings
+import threading
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple, Optional
+from dataclasses import dataclass, field
 
 try:
+    import torch
     from transformers import MarianMTModel, MarianTokenizer
 except ImportError:
     print("Error: transformers package not installed.")
     print("Install with: python -m pip install transformers sentencepiece")
     sys.exit(1)
 
+from stream_timing import StreamTiming, print_chunk, print_stream_timings, stream_pipeline
+from translation_cache import DedupStats, translate_unique
+
 
 @dataclass
 class TranslationAgent:
@@ -39,13 +62,259 @@ class TranslationAgent:
     model_name: str
     source_lang: str
     target_lang: str
-    model: Optional[MarianMTModel] = None
+    model: Optional[MarianMTModel] = None  # ctranslate2.Translator for the ctranslate2 backend
     tokenizer: Optional[MarianTokenizer] = None
 
 
+@dataclass
+class InferenceConfig:
+    """
+    CPU execution settings for the local agents.
+
+    Decoding settings left as None fall back to the model's own
+    generation config. agent_overrides holds per-agent decoding settings,
+    e.g. {"he-en": {"num_beams": 4, "max_new_tokens": 128}}.
+    """
+    inference_mode: bool = True          # Run generate() under torch.inference_mode()
+    num_threads: Optional[int] = None    # torch intra-op threads
+    num_interop_threads: Optional[int] = None  # torch inter-op threads
+    num_beams: Optional[int] = None      # 1 = greedy decoding
+    max_new_tokens: Optional[int] = None
+    agent_overrides: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def generation_kwargs(self, agent_id: str) -> Dict[str, int]:
+        """
+        Build the generate() keyword arguments for one agent.
+
+        Args:
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+
+        Returns:
+            Keyword arguments for model.generate()
+        """
+        settings = {"num_beams": self.num_beams, "max_new_tokens": self.max_new_tokens}
+        settings.update(self.agent_overrides.get(agent_id, {}))
+        kwargs = {key: value for key, value in settings.items() if value is not None}
+        if kwargs.get("num_beams") == 1:
+            kwargs["do_sample"] = False
+        return kwargs
+
+
+@dataclass
+class HopStats:
+    """Accumulated generation timings for one agent."""
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Generated tokens per second of generate() time."""
+        return self.output_tokens / self.seconds if self.seconds > 0 else 0.0
+
+    def record(self, input_tokens: int, output_tokens: int, seconds: float):
+        """Add one generate() call to the totals."""
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.seconds += seconds
+
+
+def quantize_int8(model):
+    """
+    Apply dynamic int8 quantization to a model's Linear layers.
+
+    Weights are stored as int8 and activations are quantized on the fly,
+    which shrinks the Linear weights ~4x and speeds up CPU matmuls.
+
+    Args:
+        model: A torch model in eval mode
+
+    Returns:
+        The quantized model
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def current_rss_mb() -> float:
+    """
+    Resident set size of this process in MB.
+
+    Reads /proc on Linux and falls back to peak RSS from getrusage
+    elsewhere. Returns 0.0 where neither is available (e.g. Windows).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def estimate_resident_mb(model) -> Optional[float]:
+    """
+    Memory held by a torch model's weights and buffers, in MB.
+
+    Counts every tensor in the state dict, including the packed int8
+    weights of a quantized model. Returns None for models that do not
+    expose their tensors (e.g. a ctranslate2.Translator).
+    """
+    if not hasattr(model, "state_dict"):
+        return None
+
+    def tensor_bytes(value) -> int:
+        if isinstance(value, torch.Tensor):
+            return value.nelement() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+
+    return sum(tensor_bytes(value) for value in model.state_dict().values()) / (1024 * 1024)
+
+
+@dataclass
+class AgentMemory:
+    """Residency bookkeeping for one agent."""
+    resident_mb: float = 0.0
+    loads: int = 0
+    evictions: int = 0
+    last_used: float = 0.0
+
+
+class ModelManager:
+    """
+    Loaded agents kept within a memory budget.
+
+    Agents are held in least-recently-used order. When adding an agent
+    would take the total resident size past budget_mb, the least recently
+    used agents are evicted; the pipeline reloads them on their next use.
+    With no budget, agents are never evicted.
+    """
+
+    def __init__(self, budget_mb: Optional[float] = None):
+        """
+        Initialize the manager.
+
+        Args:
+            budget_mb: Most MB of model memory to keep resident (None = unlimited)
+        """
+        if budget_mb is not None and budget_mb <= 0:
+            raise ValueError("budget_mb must be positive")
+
+        self.budget_mb = budget_mb
+        self.agents: "OrderedDict[str, TranslationAgent]" = OrderedDict()
+        self.memory: Dict[str, AgentMemory] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def load_lock(self, agent_id: str) -> threading.Lock:
+        """Lock held while an agent is loaded, so concurrent callers load it once."""
+        with self._lock:
+            return self._load_locks.setdefault(agent_id, threading.Lock())
+
+    def get(self, agent_id: str) -> Optional[TranslationAgent]:
+        """Return a loaded agent and mark it most recently used, or None."""
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is not None:
+                self.agents.move_to_end(agent_id)
+                self.memory[agent_id].last_used = time.time()
+            return agent
+
+    def add(self, agent_id: str, agent: TranslationAgent, resident_mb: float) -> List[str]:
+        """
+        Register a freshly loaded agent, evicting others to fit the budget.
+
+        An agent larger than the whole budget is still kept (alone).
+
+        Returns:
+            IDs of the evicted agents
+        """
+        with self._lock:
+            # A replaced copy no longer counts against the budget
+            self.agents.pop(agent_id, None)
+            evicted = []
+            if self.budget_mb is not None:
+                while self.agents and self._resident_mb() + resident_mb > self.budget_mb:
+                    victim, _ = self.agents.popitem(last=False)
+                    self.memory[victim].evictions += 1
+                    evicted.append(victim)
+
+            self.agents[agent_id] = agent
+            memory = self.memory.setdefault(agent_id, AgentMemory())
+            memory.resident_mb = resident_mb
+            memory.loads += 1
+            memory.last_used = time.time()
+
+        if evicted:
+            # Drop the evicted weights now rather than at the next GC cycle
+            gc.collect()
+        return evicted
+
+    def evict(self, agent_id: str) -> bool:
+        """Unload one agent; returns False if it was not loaded."""
+        with self._lock:
+            if self.agents.pop(agent_id, None) is None:
+                return False
+            self.memory[agent_id].evictions += 1
+        gc.collect()
+        return True
+
+    def _resident_mb(self) -> float:
+        return sum(self.memory[agent_id].resident_mb for agent_id in self.agents)
+
+    def resident_mb(self) -> float:
+        """Total MB held by the loaded agents."""
+        with self._lock:
+            return self._resident_mb()
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Residency of every agent loaded at least once.
+
+        Returns:
+            Dictionary mapping agent_id to loaded, resident_mb, loads and evictions
+        """
+        with self._lock:
+            return {
+                agent_id: {
+                    "loaded": agent_id in self.agents,
+                    "resident_mb": memory.resident_mb,
+                    "loads": memory.loads,
+                    "evictions": memory.evictions,
+                }
+                for agent_id, memory in self.memory.items()
+            }
+
+    def print_stats(self):
+        """Print per-agent residency."""
+        budget = f"{self.budget_mb:.0f} MB" if self.budget_mb is not None else "unlimited"
+        print(f"\nAgent memory: {self.resident_mb():.1f} MB resident (budget: {budget})")
+        print(f"  {'Agent':<8} {'Loaded':>7} {'MB':>9} {'Loads':>6} {'Evicted':>8}")
+        for agent_id, stats in self.stats().items():
+            print(f"  {agent_id:<8} {'yes' if stats['loaded'] else 'no':>7} {stats['resident_mb']:>9.1f} "
+                  f"{stats['loads']:>6} {stats['evictions']:>8}")
+
+
 class LocalTranslationPipeline:
     """Pipeline of local translation agents."""
 
+    # Padded-token budget per generate() call in translate_batch
+    DEFAULT_MAX_BATCH_TOKENS = 4096
+
+    # Longest source sequence passed to the tokenizer
+    MAX_INPUT_LENGTH = 512
+
     # Model mappings for each translation direction
     # Note: he-en uses afa-en (afroasiatic family includes Hebrew)
     MODELS = {
@@ -54,15 +323,82 @@ class LocalTranslationPipeline:
         "he-en": "Helsinki-NLP/opus-mt-afa-en",  # afa = afroasiatic (includes Hebrew)
     }
 
-    def __init__(self, verbose: bool = True):
+    # Supported weight precisions besides the default fp32
+    QUANTIZE_MODES = ("int8",)
+
+    # Inference runtimes serving the same agent IDs
+    BACKENDS = ("transformers", "ctranslate2")
+
+    # Where converted CTranslate2 models are cached
+    DEFAULT_CT2_CACHE_DIR = os.environ.get(
+        "ROUNDTRIP_CT2_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "round-trip-translator", "ct2")
+    )
+
+    # Short sentence per source language used to warm up each agent
+    WARMUP_TEXTS = {
+        "en": "Hello, how are you today?",
+        "fr": "Bonjour, comment allez-vous aujourd'hui ?",
+        "he": "שלום, מה שלומך היום?",
+    }
+
+    # Beam width used by the ctranslate2 backend when none is configured
+    # (matches the opus-mt generation config)
+    CT2_DEFAULT_BEAM_SIZE = 4
+
+    def __init__(self, verbose: bool = True, inference: Optional[InferenceConfig] = None,
+                 quantize: Optional[str] = None, backend: str = "transformers",
+                 cache_dir: Optional[str] = None, cache=None,
+                 memory_budget_mb: Optional[float] = None):
         """
         Initialize the local translation pipeline.
 
         Args:
             verbose: Print progress messages
+            inference: CPU execution settings (default: InferenceConfig())
+            quantize: "int8" for dynamic int8 quantization of Linear layers,
+                      None to keep fp32 weights
+            backend: "transformers" (PyTorch) or "ctranslate2"
+            cache_dir: Converted model cache for the ctranslate2 backend
+                       (default: DEFAULT_CT2_CACHE_DIR)
+            cache: Optional TranslationCache consulted before each generation
+            memory_budget_mb: Model memory to keep resident; least recently
+                              used agents are evicted past it (default: unlimited)
         """
+        if quantize is not None and quantize not in self.QUANTIZE_MODES:
+            raise ValueError(f"Unknown quantize mode: {quantize}. Valid: {list(self.QUANTIZE_MODES)}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Valid: {list(self.BACKENDS)}")
+
         self.verbose = verbose
-        self.agents = {}
+        self.quantize = quantize
+        self.backend = backend
+        self.cache_dir = cache_dir or self.DEFAULT_CT2_CACHE_DIR
+        self.cache = cache
+        self.inference = inference or InferenceConfig()
+        self.models = ModelManager(memory_budget_mb)
+        self.hop_stats: Dict[str, HopStats] = {}
+        self.stream_timings: List[StreamTiming] = []
+        self.dedup_stats: Dict[str, DedupStats] = {}
+        # agent_id -> {"load_seconds": ..., "warmup_seconds": ...}
+        self.load_timings: Dict[str, Dict[str, float]] = {}
+        self._configure_threads()
+
+    @property
+    def agents(self) -> Dict[str, TranslationAgent]:
+        """Currently loaded agents, least recently used first."""
+        return self.models.agents
+
+    def _configure_threads(self):
+        """Apply the torch thread counts from the inference config."""
+        if self.inference.num_threads:
+            torch.set_num_threads(self.inference.num_threads)
+        if self.inference.num_interop_threads:
+            try:
+                torch.set_num_interop_threads(self.inference.num_interop_threads)
+            except RuntimeError as e:
+                # Only allowed once, before any inter-op parallel work
+                self._log(f"  Could not set inter-op threads: {e}")
 
     def _log(self, message: str):
         """Print message if verbose mode is on."""
@@ -79,12 +415,22 @@ class LocalTranslationPipeline:
         Returns:
             Loaded TranslationAgent
         """
-        if agent_id in self.agents:
-            return self.agents[agent_id]
+        agent = self.models.get(agent_id)
+        if agent is not None:
+            return agent
 
         if agent_id not in self.MODELS:
             raise ValueError(f"Unknown agent: {agent_id}. Valid: {list(self.MODELS.keys())}")
 
+        with self.models.load_lock(agent_id):
+            # Another thread may have loaded it while we waited
+            agent = self.models.get(agent_id)
+            if agent is None:
+                agent = self._load(agent_id)
+        return agent
+
+    def _load(self, agent_id: str) -> TranslationAgent:
+        """Load an agent's tokenizer and model and register it with the model manager."""
         model_name = self.MODELS[agent_id]
         source, target = agent_id.split("-")
 
@@ -94,8 +440,17 @@ class LocalTranslationPipeline:
         self._log(f"  Model: {model_name}")
         self._log(f"  (First run downloads ~300MB, please wait...)")
 
-        tokenizer = MarianTokenizer.from_pretrained(model_name)
-        model = MarianMTModel.from_pretrained(model_name)
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        if self.backend == "ctranslate2":
+            tokenizer, model = self._load_ct2(model_name)
+        else:
+            tokenizer = MarianTokenizer.from_pretrained(model_name)
+            model = MarianMTModel.from_pretrained(model_name)
+            model.eval()
+            if self.quantize == "int8":
+                self._log(f"  Applying dynamic int8 quantization...")
+                model = quantize_int8(model)
 
         agent = TranslationAgent(
             name=f"{lang_names[source]} to {lang_names[target]}",
@@ -106,11 +461,112 @@ class LocalTranslationPipeline:
             tokenizer=tokenizer
         )
 
-        self.agents[agent_id] = agent
+        load_seconds = time.perf_counter() - start
+
+        # Tensor bytes where the model exposes them; RSS growth otherwise
+        # (approximate when several agents load in parallel)
+        resident_mb = estimate_resident_mb(model)
+        if resident_mb is None:
+            resident_mb = max(current_rss_mb() - rss_before, 0.0)
+
+        for evicted in self.models.add(agent_id, agent, resident_mb):
+            self._log(f"  Evicted {evicted} agent to stay within {self.models.budget_mb:.0f} MB")
+        self.load_timings.setdefault(agent_id, {})["load_seconds"] = load_seconds
         self._log(f"  Agent loaded successfully!")
 
         return agent
 
+    def preload(self, agents: Optional[List[str]] = None, parallel: bool = True,
+                warmup: bool = True) -> Dict[str, Dict[str, float]]:
+        """
+        Load agents ahead of time so the first translation is not delayed.
+
+        Args:
+            agents: Agent identifiers to load (default: all of MODELS)
+            parallel: Load tokenizers and models concurrently, one thread per agent
+                      (ignored under a memory budget, where agents load one
+                      at a time so eviction order stays predictable)
+            warmup: Run a short generation on each agent after loading
+
+        Returns:
+            Dictionary mapping agent_id to load_seconds and warmup_seconds
+        """
+        agent_ids = list(dict.fromkeys(agents or self.MODELS))
+        for agent_id in agent_ids:
+            if agent_id not in self.MODELS:
+                raise ValueError(f"Unknown agent: {agent_id}. Valid: {list(self.MODELS.keys())}")
+
+        def prepare(agent_id: str):
+            self.load_agent(agent_id)
+            if warmup:
+                start = time.perf_counter()
+                source = agent_id.split("-")[0]
+                self._generate(agent_id, [self.WARMUP_TEXTS[source]], record_stats=False)
+                self.load_timings[agent_id]["warmup_seconds"] = time.perf_counter() - start
+
+        if parallel and len(agent_ids) > 1 and self.models.budget_mb is None:
+            with ThreadPoolExecutor(max_workers=len(agent_ids)) as pool:
+                # list() re-raises the first loading error, if any
+                list(pool.map(prepare, agent_ids))
+        else:
+            for agent_id in agent_ids:
+                prepare(agent_id)
+
+        return {agent_id: dict(self.load_timings.get(agent_id, {})) for agent_id in agent_ids}
+
+    def ct2_model_dir(self, model_name: str) -> str:
+        """Cache directory holding the converted CTranslate2 model."""
+        return os.path.join(self.cache_dir, model_name.replace("/", "--"))
+
+    def _load_ct2(self, model_name: str):
+        """
+        Load a CTranslate2 translator, converting the Marian model on first use.
+
+        The converted model and its tokenizer files are kept together in the
+        cache directory, so later runs load from disk with no network access.
+
+        Args:
+            model_name: Hugging Face model name from MODELS
+
+        Returns:
+            Tuple of (tokenizer, ctranslate2.Translator)
+        """
+        try:
+            import ctranslate2
+        except ImportError:
+            raise ImportError("ctranslate2 backend requires: python -m pip install ctranslate2")
+
+        model_dir = self.ct2_model_dir(model_name)
+        model_bin = os.path.join(model_dir, "model.bin")
+        if not os.path.exists(model_bin):
+            self._log(f"  Converting to CTranslate2 format: {model_dir}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Private to this conversion, so concurrent converters do not share it
+            partial_dir = tempfile.mkdtemp(prefix=os.path.basename(model_dir) + ".partial-", dir=self.cache_dir)
+            try:
+                ctranslate2.converters.TransformersConverter(model_name).convert(partial_dir, force=True)
+                MarianTokenizer.from_pretrained(model_name).save_pretrained(partial_dir)
+                if os.path.isdir(model_dir) and not os.path.exists(model_bin):
+                    # Left incomplete by an interrupted run
+                    shutil.rmtree(model_dir, ignore_errors=True)
+                try:
+                    os.replace(partial_dir, model_dir)
+                except OSError:
+                    # Another process finished converting first; use its copy
+                    if not os.path.exists(model_bin):
+                        raise
+            finally:
+                shutil.rmtree(partial_dir, ignore_errors=True)
+
+        tokenizer = MarianTokenizer.from_pretrained(model_dir)
+        model = ctranslate2.Translator(
+            model_dir,
+            device="cpu",
+            compute_type="int8" if self.quantize == "int8" else "default",
+            intra_threads=self.inference.num_threads or 0
+        )
+        return tokenizer, model
+
     def translate(self, text: str, agent_id: str) -> str:
         """
         Translate text using specified agent.
@@ -122,18 +578,300 @@ class LocalTranslationPipeline:
         Returns:
             Translated text
         """
+        if self.cache is not None:
+            return self.translate_batch([text], agent_id)[0]
+        return self._translate_uncached([text], agent_id, self.DEFAULT_MAX_BATCH_TOKENS)[0]
+
+    def translate_batch(self, texts: List[str], agent_id: str,
+                        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS) -> List[str]:
+        """
+        Translate many texts with padded, length-bucketed batches.
+
+        Repeated texts are translated once (counted in dedup_stats). Inputs
+        are sorted by token length so each batch pads to a similar size, and
+        a batch grows only while batch_size * longest_length stays within
+        max_batch_tokens. Outputs are returned in the input order.
+
+        Args:
+            texts: Texts to translate
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+            max_batch_tokens: Padded-token budget for a single generate() call
+
+        Returns:
+            Translated texts, one per input, in the original order
+        """
+        if not texts:
+            return []
+
+        stats = self.dedup_stats.setdefault(agent_id, DedupStats())
+        return translate_unique(texts, lambda unique: self._translate_cached(unique, agent_id, max_batch_tokens),
+                                stats)
+
+    def _translate_cached(self, texts: List[str], agent_id: str, max_batch_tokens: int) -> List[str]:
+        """Batch translation through the translation cache, if any."""
+        if self.cache is None:
+            return self._translate_uncached(texts, agent_id, max_batch_tokens)
+
+        # Only texts missing from the cache reach the model
+        cache_args = (self.backend, self.MODELS[agent_id], self._cache_params(agent_id))
+        results = self.cache.get_many(*cache_args, texts)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            translated = self._translate_uncached([texts[i] for i in missing], agent_id, max_batch_tokens)
+            self.cache.put_many(*cache_args, [texts[i] for i in missing], translated)
+            for index, output in zip(missing, translated):
+                results[index] = output
+
+        return results
+
+    def _cache_params(self, agent_id: str) -> Dict:
+        """Settings that change an agent's output, for the translation cache key."""
+        return {"quantize": self.quantize, **self.inference.generation_kwargs(agent_id)}
+
+    def _translate_uncached(self, texts: List[str], agent_id: str, max_batch_tokens: int) -> List[str]:
+        """Length-bucketed batch translation, bypassing the cache."""
+        agent = self.load_agent(agent_id)
+
+        # One untruncated pass gives both the truncation warning and the bucketing lengths
+        encoded = agent.tokenizer(list(texts))
+        self._warn_truncated(agent_id, [len(ids) for ids in encoded["input_ids"]])
+        lengths = [min(len(ids), self.MAX_INPUT_LENGTH) for ids in encoded["input_ids"]]
+
+        results: List[Optional[str]] = [None] * len(texts)
+        for batch in self._length_buckets(lengths, max_batch_tokens):
+            decoded = self._generate(agent_id, [texts[i] for i in batch])
+            for index, output in zip(batch, decoded):
+                results[index] = output
+
+        return results
+
+    def _warn_truncated(self, agent_id: str, lengths: List[int]) -> None:
+        """Warn when any input is longer than MAX_INPUT_LENGTH tokens and will lose its tail."""
+        truncated = sum(length > self.MAX_INPUT_LENGTH for length in lengths)
+        if truncated:
+            warnings.warn(f"{agent_id}: {truncated} input(s) truncated to {self.MAX_INPUT_LENGTH} tokens; "
+                          f"use document_translation.py to translate long texts by sentence")
+
+    def _generate(self, agent_id: str, texts: List[str], record_stats: bool = True) -> List[str]:
+        """
+        Translate one padded batch and record its timings.
+
+        Args:
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+            texts: Texts forming a single batch
+            record_stats: Add this call to hop_stats (off for warmup runs)
+
+        Returns:
+            Translated texts in input order
+        """
         agent = self.load_agent(agent_id)
 
+        if self.backend == "ctranslate2":
+            return self._generate_ct2(agent_id, agent, texts, record_stats)
+
         # Tokenize
-        inputs = agent.tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        inputs = agent.tokenizer(texts, return_tensors="pt", padding=True, truncation=True,
+                                 max_length=self.MAX_INPUT_LENGTH)
+
+        # Generate translation (no autograd bookkeeping in inference mode)
+        no_grad = torch.inference_mode() if self.inference.inference_mode else contextlib.nullcontext()
+        start = time.perf_counter()
+        with no_grad:
+            translated = agent.model.generate(**inputs, **self.inference.generation_kwargs(agent_id))
+        elapsed = time.perf_counter() - start
 
-        # Generate translation
-        translated = agent.model.generate(**inputs)
+        if record_stats:
+            self.hop_stats.setdefault(agent_id, HopStats()).record(
+                input_tokens=int(inputs["attention_mask"].sum()),
+                output_tokens=int((translated != agent.tokenizer.pad_token_id).sum()),
+                seconds=elapsed
+            )
 
         # Decode
-        result = agent.tokenizer.decode(translated[0], skip_special_tokens=True)
+        return agent.tokenizer.batch_decode(translated, skip_special_tokens=True)
+
+    def _generate_ct2(self, agent_id: str, agent: TranslationAgent, texts: List[str],
+                      record_stats: bool = True) -> List[str]:
+        """Translate one batch with a CTranslate2 translator and record its timings."""
+        encoded = agent.tokenizer(texts, truncation=True, max_length=self.MAX_INPUT_LENGTH)
+        source = [agent.tokenizer.convert_ids_to_tokens(ids) for ids in encoded["input_ids"]]
+
+        settings = self.inference.generation_kwargs(agent_id)
+        options = {"beam_size": settings.get("num_beams", self.CT2_DEFAULT_BEAM_SIZE)}
+        if "max_new_tokens" in settings:
+            options["max_decoding_length"] = settings["max_new_tokens"]
+
+        start = time.perf_counter()
+        results = agent.model.translate_batch(source, **options)
+        elapsed = time.perf_counter() - start
+
+        targets = [result.hypotheses[0] for result in results]
+        if record_stats:
+            self.hop_stats.setdefault(agent_id, HopStats()).record(
+                input_tokens=sum(len(tokens) for tokens in source),
+                output_tokens=sum(len(tokens) for tokens in targets),
+                seconds=elapsed
+            )
+
+        return [
+            agent.tokenizer.decode(agent.tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True)
+            for tokens in targets
+        ]
+
+    def translate_stream(self, text: str, agent_id: str,
+                         on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Translate text, passing decoded text to on_text as tokens are generated.
+
+        Streaming needs a single hypothesis, so decoding is greedy whatever
+        the configured beam width. The hop's latency is appended to
+        stream_timings.
+
+        Args:
+            text: Text to translate
+            agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+            on_text: Called with each newly decoded chunk of text
+
+        Returns:
+            Translated text
+        """
+        if self.backend != "transformers":
+            raise ValueError("Streaming is only supported by the transformers backend")
+
+        from transformers import TextIteratorStreamer
+
+        agent = self.load_agent(agent_id)
+        inputs = agent.tokenizer([text], return_tensors="pt")
+        length = inputs["input_ids"].shape[1]
+        if length > self.MAX_INPUT_LENGTH:
+            # Re-encode so the tokenizer keeps the end-of-sentence token
+            self._warn_truncated(agent_id, [length])
+            inputs = agent.tokenizer([text], return_tensors="pt", truncation=True,
+                                     max_length=self.MAX_INPUT_LENGTH)
+        kwargs = self.inference.generation_kwargs(agent_id)
+        kwargs.update(num_beams=1, do_sample=False)
+        streamer = TextIteratorStreamer(agent.tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+        outcome = {}
+
+        def generate():
+            no_grad = torch.inference_mode() if self.inference.inference_mode else contextlib.nullcontext()
+            try:
+                with no_grad:
+                    outcome["ids"] = agent.model.generate(**inputs, streamer=streamer, **kwargs)
+            except Exception as e:
+                outcome["error"] = e
+                streamer.end()
+
+        start = time.perf_counter()
+        first_token = None
+        thread = threading.Thread(target=generate, name=f"stream-{agent_id}", daemon=True)
+        thread.start()
+        for chunk in streamer:
+            if chunk and first_token is None:
+                first_token = time.perf_counter() - start
+            if chunk and on_text is not None:
+                on_text(chunk)
+        thread.join()
+        elapsed = time.perf_counter() - start
+
+        if "error" in outcome:
+            raise outcome["error"]
+
+        output_tokens = int((outcome["ids"] != agent.tokenizer.pad_token_id).sum())
+        self.hop_stats.setdefault(agent_id, HopStats()).record(
+            input_tokens=int(inputs["attention_mask"].sum()),
+            output_tokens=output_tokens,
+            seconds=elapsed
+        )
+        self.stream_timings.append(StreamTiming(
+            agent_id=agent_id,
+            backend=self.backend,
+            time_to_first_token=first_token if first_token is not None else elapsed,
+            total_seconds=elapsed,
+            output_tokens=output_tokens
+        ))
+
+        return agent.tokenizer.batch_decode(outcome["ids"], skip_special_tokens=True)[0]
+
+    def run_pipeline_stream(self, text: str) -> Tuple[str, str, str]:
+        """
+        Run EN -> FR -> HE -> EN, printing each hop's text as it is generated.
+
+        Args:
+            text: English text to translate
+
+        Returns:
+            Tuple of (french, hebrew, final_english)
+        """
+        return stream_pipeline(self.translate_stream, text)
+
+    def engine_settings(self) -> Dict:
+        """Settings that change this pipeline's output or resources (compared by the daemon CLI path)."""
+        return {
+            "backend": self.backend,
+            "quantize": self.quantize,
+            "num_threads": self.inference.num_threads,
+            "num_interop_threads": self.inference.num_interop_threads,
+            "num_beams": self.inference.num_beams,
+            "max_new_tokens": self.inference.max_new_tokens,
+            "memory_budget_mb": self.models.budget_mb,
+            "cache": self.cache is not None,
+        }
+
+    def throughput_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize generation throughput per hop.
+
+        Returns:
+            Dictionary mapping agent_id to calls, token counts, seconds
+            and tokens_per_second
+        """
+        return {
+            agent_id: {
+                "calls": stats.calls,
+                "input_tokens": stats.input_tokens,
+                "output_tokens": stats.output_tokens,
+                "seconds": stats.seconds,
+                "tokens_per_second": stats.tokens_per_second,
+            }
+            for agent_id, stats in self.hop_stats.items()
+        }
+
+    def print_throughput_report(self):
+        """Print tokens/sec per hop."""
+        print("\nThroughput per hop:")
+        print(f"  {'Agent':<8} {'Calls':>6} {'In tok':>8} {'Out tok':>8} {'Seconds':>9} {'Tok/s':>9}")
+        for agent_id, stats in self.throughput_report().items():
+            print(f"  {agent_id:<8} {stats['calls']:>6} {stats['input_tokens']:>8} "
+                  f"{stats['output_tokens']:>8} {stats['seconds']:>9.3f} {stats['tokens_per_second']:>9.1f}")
+
+    @staticmethod
+    def _length_buckets(lengths: List[int], max_batch_tokens: int) -> List[List[int]]:
+        """
+        Group input indices into batches of similar token length.
+
+        Args:
+            lengths: Token length of each input
+            max_batch_tokens: Padded-token budget per batch
+
+        Returns:
+            List of batches, each a list of input indices sorted by length
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        for index in order:
+            # Sorted ascending, so the newest item sets the padded length
+            if current and (len(current) + 1) * lengths[index] > max_batch_tokens:
+                batches.append(current)
+                current = []
+            current.append(index)
+        if current:
+            batches.append(current)
 
-        return result
+        return batches
 
     def run_pipeline(self, text: str) -> Tuple[str, str, str]:
         """
@@ -169,6 +907,224 @@ class LocalTranslationPipeline:
 
         return french, hebrew, final_english
 
+    def run_pipeline_batch(self, texts: List[str],
+                           max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS) -> List[Tuple[str, str, str]]:
+        """
+        Run the full pipeline over many texts, batching each hop.
+
+        Every text goes through EN -> FR before any text starts FR -> HE,
+        so each model sees the whole set as padded batches.
+
+        Args:
+            texts: English texts to translate
+            max_batch_tokens: Padded-token budget for a single generate() call
+
+        Returns:
+            List of (french, hebrew, final_english) tuples in input order
+        """
+        self._log(f"\nLocal batch pipeline: {len(texts)} texts")
+
+        self._log("--- Step 1: English -> French ---")
+        french = self.translate_batch(texts, "en-fr", max_batch_tokens)
+
+        self._log("--- Step 2: French -> Hebrew ---")
+        hebrew = self.translate_batch(french, "fr-he", max_batch_tokens)
+
+        self._log("--- Step 3: Hebrew -> English ---")
+        final_english = self.translate_batch(hebrew, "he-en", max_batch_tokens)
+
+        return list(zip(french, hebrew, final_english))
+
+
+def _benchmark_precision(quantize: Optional[str], sentences: List[str]) -> Dict:
+    """
+    Load all agents at one precision and time a batched pipeline run.
+
+    Runs in a fresh process (see compare_quantization) so the RSS figures
+    belong to this precision alone.
+    """
+    rss_before = current_rss_mb()
+    pipeline = LocalTranslationPipeline(verbose=False, quantize=quantize)
+
+    start = time.perf_counter()
+    for agent_id in pipeline.MODELS:
+        pipeline.load_agent(agent_id)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = pipeline.run_pipeline_batch(sentences)
+    translate_seconds = time.perf_counter() - start
+
+    return {
+        "quantize": quantize or "fp32",
+        "load_seconds": load_seconds,
+        "translate_seconds": translate_seconds,
+        "rss_mb": current_rss_mb() - rss_before,
+        "final_english": [final for _, _, final in outputs],
+    }
+
+
+def compare_quantization(sentences: List[str], verbose: bool = True) -> Dict:
+    """
+    Run the same sentences through fp32 and int8 agents and compare them.
+
+    Each precision runs in its own spawned process so resident memory is
+    measured independently. Round-trip quality is the cosine similarity
+    between each original sentence and its final English output.
+
+    Args:
+        sentences: English sentences to translate
+        verbose: Print the comparison report
+
+    Returns:
+        Dictionary with per-precision results, speedup, rss_saving_mb
+        and similarity_delta (int8 minus fp32 mean similarity)
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from embedding_similarity_local import LocalEmbeddingSimilarityChecker
+
+    runs = {}
+    for quantize in (None, "int8"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs[quantize or "fp32"] = pool.submit(_benchmark_precision, quantize, sentences).result()
+
+    checker = LocalEmbeddingSimilarityChecker()
+    for run in runs.values():
+        similarities = checker.score_pairs(list(sentences), run["final_english"]).tolist()
+        run["similarities"] = similarities
+        run["mean_similarity"] = sum(similarities) / len(similarities)
+
+    fp32, int8 = runs["fp32"], runs["int8"]
+    report = {
+        "sentences": len(sentences),
+        "fp32": fp32,
+        "int8": int8,
+        "speedup": fp32["translate_seconds"] / int8["translate_seconds"] if int8["translate_seconds"] else 0.0,
+        "rss_saving_mb": fp32["rss_mb"] - int8["rss_mb"],
+        "similarity_delta": int8["mean_similarity"] - fp32["mean_similarity"],
+    }
+
+    if verbose:
+        print("\n" + "=" * 60)
+        print(f"QUANTIZATION COMPARISON ({len(sentences)} sentences)")
+        print("=" * 60)
+        print(f"  {'':<20} {'fp32':>12} {'int8':>12}")
+        print(f"  {'Load time (s)':<20} {fp32['load_seconds']:>12.2f} {int8['load_seconds']:>12.2f}")
+        print(f"  {'Translate time (s)':<20} {fp32['translate_seconds']:>12.2f} {int8['translate_seconds']:>12.2f}")
+        print(f"  {'RSS (MB)':<20} {fp32['rss_mb']:>12.1f} {int8['rss_mb']:>12.1f}")
+        print(f"  {'Mean similarity':<20} {fp32['mean_similarity']:>12.4f} {int8['mean_similarity']:>12.4f}")
+        print()
+        print(f"  Speedup:          {report['speedup']:.2f}x")
+        print(f"  RSS saving:       {report['rss_saving_mb']:.1f} MB")
+        print(f"  Similarity delta: {report['similarity_delta']:+.4f}")
+        print("=" * 60)
+
+    return report
+
+
+def benchmark_backends(sentences: List[str], backends: Tuple[str, ...] = LocalTranslationPipeline.BACKENDS,
+                       inference: Optional[InferenceConfig] = None,
+                       verbose: bool = True) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Time each hop of a batched pipeline run on every backend.
+
+    Models are loaded (and converted, for ctranslate2) before timing starts.
+
+    Args:
+        sentences: English sentences to translate
+        backends: Backends to compare
+        inference: Shared CPU execution settings
+        verbose: Print the per-hop comparison table
+
+    Returns:
+        Dictionary mapping backend to its throughput_report()
+    """
+    reports = {}
+    for backend in backends:
+        pipeline = LocalTranslationPipeline(verbose=False, inference=inference, backend=backend)
+        for agent_id in pipeline.MODELS:
+            pipeline.load_agent(agent_id)
+        pipeline.run_pipeline_batch(sentences)
+        reports[backend] = pipeline.throughput_report()
+
+    if verbose:
+        baseline = backends[0]
+        print("\n" + "=" * 60)
+        print(f"BACKEND BENCHMARK ({len(sentences)} sentences)")
+        print("=" * 60)
+        header = "".join(f" {b + ' (s)':>18}" for b in backends)
+        print(f"  {'Hop':<8}{header} {'Speedup':>9}")
+        for agent_id in LocalTranslationPipeline.MODELS:
+            times = [reports[b][agent_id]["seconds"] for b in backends]
+            speedup = times[0] / times[-1] if times[-1] else 0.0
+            row = "".join(f" {t:>18.3f}" for t in times)
+            print(f"  {agent_id:<8}{row} {speedup:>8.2f}x")
+        print(f"\n  Speedup = {baseline} time / {backends[-1]} time")
+        print("=" * 60)
+
+    return reports
+
+
+def requested_engine_settings(args) -> Dict:
+    """Engine settings given on the command line (flags left at their default are omitted)."""
+    requested = {
+        "backend": args.backend,
+        "quantize": args.quantize,
+        "num_threads": args.threads,
+        "num_interop_threads": args.interop_threads,
+        "num_beams": 1 if args.greedy else args.num_beams,
+        "max_new_tokens": args.max_new_tokens,
+        "memory_budget_mb": args.memory_budget,
+        "cache": False if args.no_cache else None,
+    }
+    return {key: value for key, value in requested.items() if value is not None}
+
+
+def run_with_daemon(args) -> bool:
+    """
+    Serve a translate/pipeline CLI request from a running translation daemon.
+
+    The daemon is only used when every engine flag given here (--backend,
+    --quantize, --num-beams, --no-cache, ...) matches how it was started;
+    otherwise a notice is printed and the request runs in-process.
+
+    Returns:
+        True if the daemon handled the request, False otherwise
+    """
+    from translation_daemon import DaemonClient, DaemonError, DEFAULT_SOCKET_PATH
+
+    client = DaemonClient(args.socket or DEFAULT_SOCKET_PATH)
+    if not client.is_available():
+        return False
+
+    requested = requested_engine_settings(args)
+    try:
+        settings = client.engine_settings()
+    except DaemonError:
+        # A daemon from before the "config" op: its settings are unknown
+        settings = {}
+    mismatched = [key for key, value in requested.items() if settings.get(key) != value]
+    if mismatched:
+        details = ", ".join(f"{key}={settings.get(key, 'unknown')} (requested {requested[key]})"
+                            for key in mismatched)
+        print(f"Translation daemon at {client.socket_path} runs with {details}; "
+              f"loading models in-process", file=sys.stderr)
+        return False
+
+    if not args.quiet:
+        print(f"Using translation daemon at {client.socket_path}")
+
+    if args.pipeline:
+        french, hebrew, final = client.run_pipeline(args.text)
+        print(f"French: {french}")
+        print(f"Hebrew: {hebrew}")
+        print(f"English: {final}")
+    else:
+        print(client.translate(args.text, args.agent))
+
+    return True
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -178,20 +1134,96 @@ def main():
                        help='Single agent to use')
     parser.add_argument('--pipeline', action='store_true',
                        help='Run full pipeline (EN -> FR -> HE -> EN)')
-    parser.add_argument('--text', type=str, required=True,
+    parser.add_argument('--text', type=str,
                        help='Text to translate')
     parser.add_argument('--quiet', action='store_true',
                        help='Suppress verbose output')
+    parser.add_argument('--stream', action='store_true',
+                       help='Print tokens as they are generated (greedy decoding) '
+                            'and report time-to-first-token per hop')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='torch intra-op thread count')
+    parser.add_argument('--interop-threads', type=int, default=None,
+                       help='torch inter-op thread count')
+    parser.add_argument('--num-beams', type=int, default=None,
+                       help='Beam width (default: model generation config)')
+    parser.add_argument('--greedy', action='store_true',
+                       help='Greedy decoding (same as --num-beams 1)')
+    parser.add_argument('--max-new-tokens', type=int, default=None,
+                       help='Cap on generated tokens per hop')
+    parser.add_argument('--quantize', type=str, choices=list(LocalTranslationPipeline.QUANTIZE_MODES),
+                       help='Dynamic quantization of Linear layers (default: fp32)')
+    parser.add_argument('--compare-quantization', action='store_true',
+                       help='Compare fp32 and int8 speed, memory and similarity '
+                            '(uses --text or the default test sentences)')
+    parser.add_argument('--backend', type=str, choices=list(LocalTranslationPipeline.BACKENDS),
+                       default=None,
+                       help='Inference runtime (default: transformers)')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                       help='Converted model cache for the ctranslate2 backend')
+    parser.add_argument('--benchmark-backends', action='store_true',
+                       help='Compare per-hop time of every backend '
+                            '(uses --text or the default test sentences)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the persistent translation cache')
+    parser.add_argument('--memory-budget', type=float, default=None,
+                       help='MB of model memory to keep loaded; least recently used agents '
+                            'are evicted past it (default: unlimited)')
+    parser.add_argument('--no-daemon', action='store_true',
+                       help='Always load models in-process, even if a daemon is running')
+    parser.add_argument('--socket', type=str, default=None,
+                       help='Translation daemon socket path')
 
     args = parser.parse_args()
 
+    if args.compare_quantization or args.benchmark_backends:
+        if args.text:
+            sentences = [args.text]
+        else:
+            from run_experiment import TEST_SENTENCES
+            sentences = TEST_SENTENCES
+        if args.compare_quantization:
+            compare_quantization(sentences)
+        else:
+            benchmark_backends(sentences)
+        return
+
+    if not args.text:
+        parser.error("--text is required")
+
     if not args.agent and not args.pipeline:
         # Default to pipeline
         args.pipeline = True
 
-    pipeline = LocalTranslationPipeline(verbose=not args.quiet)
+    if not args.no_daemon and not args.stream and run_with_daemon(args):
+        return
 
-    if args.pipeline:
+    inference = InferenceConfig(
+        num_threads=args.threads,
+        num_interop_threads=args.interop_threads,
+        num_beams=1 if args.greedy else args.num_beams,
+        max_new_tokens=args.max_new_tokens
+    )
+    cache = None
+    if not args.no_cache:
+        from translation_cache import TranslationCache
+        cache = TranslationCache()
+
+    pipeline = LocalTranslationPipeline(verbose=not args.quiet, inference=inference,
+                                        quantize=args.quantize, backend=args.backend or "transformers",
+                                        cache_dir=args.cache_dir, cache=cache,
+                                        memory_budget_mb=args.memory_budget)
+
+    if args.stream:
+        # Streamed output is the progress display, so skip the verbose log
+        pipeline.verbose = False
+        if args.pipeline:
+            pipeline.run_pipeline_stream(args.text)
+        else:
+            pipeline.translate_stream(args.text, args.agent, on_text=print_chunk)
+            print()
+        print_stream_timings(pipeline.stream_timings)
+    elif args.pipeline:
         french, hebrew, final = pipeline.run_pipeline(args.text)
         if args.quiet:
             print(f"French: {french}")
@@ -201,6 +1233,12 @@ def main():
         result = pipeline.translate(args.text, args.agent)
         print(result)
 
+    if not args.quiet:
+        pipeline.print_throughput_report()
+        pipeline.models.print_stats()
+        if cache is not None:
+            cache.print_stats()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Pipelined Translation - Overlap the three hops across a stream of sentences
+
+run_pipeline() finishes all three hops for one sentence before starting the
+next, so two of the three models are always idle. PipelinedExecutor gives
+each hop its own worker thread, connected by bounded queues:
+
+    feeder -> [q] -> EN->FR -> [q] -> FR->HE -> [q] -> HE->EN -> [q] -> results
+
+While sentence k is on FR->HE, sentence k+1 is already on EN->FR. Full
+queues block the stage upstream of them (back-pressure), so memory stays
+bounded however long the input stream is. torch releases the GIL inside
+generate(), so the stages run in parallel on separate cores.
+
+Usage:
+    python pipelined_translation.py --input-file sentences.txt
+    python pipelined_translation.py --input-file sentences.txt --queue-size 8 --batch-size 4
+"""
+
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from typing import Dict, Iterable, Iterator, List, Tuple
+from dataclasses import dataclass
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+# Marks the end of the input stream in every queue
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage."""
+    agent_id: str
+    items: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0       # Time spent translating
+    blocked_seconds: float = 0.0    # Time waiting for room downstream (back-pressure)
+
+
+class _StageError:
+    """Carries an exception from a stage thread to the consumer."""
+
+    def __init__(self, agent_id: str, error: BaseException):
+        self.agent_id = agent_id
+        self.error = error
+
+
+class PipelinedExecutor:
+    """Run EN -> FR -> HE -> EN as three overlapping stages."""
+
+    STAGES = ("en-fr", "fr-he", "he-en")
+
+    # Seconds between stop-flag checks while blocked on a queue
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, pipeline, queue_size: int = 4, batch_size: int = 1):
+        """
+        Initialize the executor.
+
+        Args:
+            pipeline: LocalTranslationPipeline providing the agents
+            queue_size: Capacity of each inter-stage queue
+            batch_size: Most items a stage takes per translate_batch() call;
+                        a stage never waits to fill a batch
+        """
+        if queue_size < 1 or batch_size < 1:
+            raise ValueError("queue_size and batch_size must be at least 1")
+
+        self.pipeline = pipeline
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.stage_stats: Dict[str, StageStats] = {}
+        self.wall_seconds = 0.0
+        self._stop = threading.Event()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Block until item fits in q; return False if the run was stopped."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Block until an item arrives; return _DONE if the run was stopped."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, texts: Iterable[str], out_q: queue.Queue):
+        """Push (index, (text,)) items into the first stage."""
+        try:
+            for index, text in enumerate(texts):
+                if not self._put(out_q, (index, (text,))):
+                    return
+        except Exception as e:
+            self._put(out_q, _StageError("input", e))
+            return
+        self._put(out_q, _DONE)
+
+    def _stage(self, agent_id: str, in_q: queue.Queue, out_q: queue.Queue):
+        """Translate items from in_q with one agent and pass them to out_q."""
+        stats = self.stage_stats[agent_id]
+        finished = False
+
+        while not finished:
+            item = self._get(in_q)
+            if item is _DONE or isinstance(item, _StageError):
+                self._put(out_q, item)
+                return
+
+            # Take whatever else is already waiting, up to batch_size
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    extra = in_q.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is _DONE or isinstance(extra, _StageError):
+                    finished = extra
+                    break
+                batch.append(extra)
+
+            start = time.perf_counter()
+            try:
+                outputs = self.pipeline.translate_batch([texts[-1] for _, texts in batch], agent_id)
+            except Exception as e:
+                self._put(out_q, _StageError(agent_id, e))
+                return
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += len(batch)
+            stats.batches += 1
+
+            for (index, texts), output in zip(batch, outputs):
+                start = time.perf_counter()
+                if not self._put(out_q, (index, texts + (output,))):
+                    return
+                stats.blocked_seconds += time.perf_counter() - start
+
+        self._put(out_q, finished)
+
+    def run(self, texts: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+        """
+        Translate a stream of texts, yielding results as they finish.
+
+        Stages are FIFO, so results come out in input order. Stopping
+        iteration early shuts the worker threads down.
+
+        Args:
+            texts: English texts (any iterable, consumed lazily)
+
+        Yields:
+            (french, hebrew, final_english) tuples in input order
+        """
+        # Load agents up front so no stage stalls on a model load
+        self.pipeline.preload(agents=list(self.STAGES), warmup=False)
+
+        self._stop.clear()
+        self.stage_stats = {agent_id: StageStats(agent_id) for agent_id in self.STAGES}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.STAGES) + 1)]
+
+        threads = [threading.Thread(target=self._feed, args=(texts, queues[0]), daemon=True)]
+        for i, agent_id in enumerate(self.STAGES):
+            threads.append(threading.Thread(target=self._stage, args=(agent_id, queues[i], queues[i + 1]),
+                                            name=f"stage-{agent_id}", daemon=True))
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                if isinstance(item, _StageError):
+                    raise RuntimeError(f"Stage {item.agent_id} failed: {item.error}") from item.error
+                _, (_, french, hebrew, final_english) = item
+                yield french, hebrew, final_english
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self.wall_seconds = time.perf_counter() - start
+
+    def run_all(self, texts: Iterable[str]) -> List[Tuple[str, str, str]]:
+        """Translate every text and return the (french, hebrew, final_english) tuples."""
+        return list(self.run(texts))
+
+    def print_stats(self):
+        """Print per-stage utilization for the last run."""
+        print(f"\nPipelined run: {self.wall_seconds:.2f}s wall time")
+        print(f"  {'Stage':<8} {'Items':>6} {'Batches':>8} {'Busy (s)':>9} {'Blocked (s)':>12} {'Util':>6}")
+        for stats in self.stage_stats.values():
+            util = stats.busy_seconds / self.wall_seconds if self.wall_seconds else 0.0
+            print(f"  {stats.agent_id:<8} {stats.items:>6} {stats.batches:>8} {stats.busy_seconds:>9.2f} "
+                  f"{stats.blocked_seconds:>12.2f} {util:>6.0%}")
+
+
+def main():
+    from local_translation_agents import LocalTranslationPipeline
+
+    parser = argparse.ArgumentParser(
+        description="Translate a file of sentences with overlapped pipeline stages"
+    )
+    parser.add_argument('--input-file', type=str, required=True,
+                       help='File with one English sentence per line')
+    parser.add_argument('--queue-size', type=int, default=4,
+                       help='Capacity of each inter-stage queue (default: 4)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Most items per translate_batch() call (default: 1)')
+    parser.add_argument('--backend', type=str, choices=list(LocalTranslationPipeline.BACKENDS),
+                       default='transformers',
+                       help='Inference runtime (default: transformers)')
+
+    args = parser.parse_args()
+
+    pipeline = LocalTranslationPipeline(verbose=False, backend=args.backend)
+    executor = PipelinedExecutor(pipeline, queue_size=args.queue_size, batch_size=args.batch_size)
+
+    with open(args.input_file, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        for french, hebrew, final_english in executor.run(line for line in lines if line):
+            print(final_english, flush=True)
+
+    executor.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Pace Claude requests to RPM/TPM budgets and retry throttling
+
+Without pacing, a sweep fires requests as fast as the previous one returns,
+runs into 429 (rate limited) or 529 (overloaded), and the failed cell's data
+is lost. RateLimitScheduler sits in front of messages.create():
+
+    1. Pacing: two token buckets, requests-per-minute and input
+       tokens-per-minute, refill continuously. A request reserves one
+       request and its estimated input tokens, and waits until both
+       buckets cover it. The token bucket is corrected with the actual
+       usage once the response arrives.
+    2. Retry: 429, 408/409, 5xx/529 and connection errors are retried up to
+       max_retries times. The wait is the server's retry-after when given,
+       otherwise capped exponential backoff, with random jitter either way.
+       A retry-after also pauses every other request through the scheduler.
+    3. Accounting: per hop, time spent queued for budget, time spent
+       backing off after errors, and time inside the API call (model
+       latency) are reported separately.
+
+Budgets come from configure_scheduler() or the environment:
+    ROUNDTRIP_CLAUDE_RPM  (default: unlimited)
+    ROUNDTRIP_CLAUDE_TPM  (default: unlimited)
+
+Usage:
+    from rate_limiter import get_scheduler
+
+    message = get_scheduler().create(client, request, hop="en-fr")
+    message = await get_scheduler().acreate(async_client, request, hop="en-fr")
+    get_scheduler().print_report()
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from dataclasses import dataclass
+
+import anthropic
+
+
+def _env_budget(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+DEFAULT_RPM = _env_budget("ROUNDTRIP_CLAUDE_RPM")
+DEFAULT_TPM = _env_budget("ROUNDTRIP_CLAUDE_TPM")
+
+# Status codes worth retrying: timeout, conflict, rate limit, server errors (incl. 529 overloaded)
+RETRY_STATUS = (408, 409, 429)
+
+
+class TokenBucket:
+    """Continuously refilling budget of units per minute."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Units added per minute
+            burst_seconds: Seconds of budget that may be spent at once
+            clock: Monotonic time source
+        """
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount from the bucket, going into debt if needed.
+
+        Reservations are served in call order: each caller waits for the
+        debt that existed when it reserved.
+
+        Returns:
+            Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = self._clock()
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+            self._updated = now
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float):
+        """Correct an earlier reservation by amount (negative gives units back)."""
+        with self._lock:
+            self.level = min(self.capacity, self.level - amount)
+
+
+def estimate_input_tokens(request: Dict) -> int:
+    """Rough input token count of a request (about four characters per token)."""
+    payload = json.dumps([request.get("system", ""), request.get("messages", [])], ensure_ascii=False)
+    return max(1, len(payload) // 4)
+
+
+def billed_input_tokens(usage) -> int:
+    """Input tokens that count against the TPM budget (cache reads do not)."""
+    return (usage.input_tokens or 0) + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """The server's retry-after hint from an API error, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an API error is throttling or transient."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRY_STATUS or error.status_code >= 500
+    return False
+
+
+@dataclass
+class HopSchedule:
+    """Pacing and retry accounting for one hop."""
+    requests: int = 0
+    attempts: int = 0
+    rate_limited: int = 0          # 429 responses
+    errors: int = 0                # Other retryable failures
+    failed: int = 0                # Requests that ran out of retries
+    queue_seconds: float = 0.0     # Waiting for RPM/TPM budget
+    backoff_seconds: float = 0.0   # Waiting after errors
+    model_seconds: float = 0.0     # Inside successful API calls
+
+    @property
+    def retries(self) -> int:
+        return self.attempts - self.requests
+
+
+class RateLimitScheduler:
+    """Paces Claude requests to RPM/TPM budgets and retries throttled ones."""
+
+    def __init__(self, rpm: Optional[float] = DEFAULT_RPM, tpm: Optional[float] = DEFAULT_TPM,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0,
+                 burst_seconds: float = 1.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rpm: Requests-per-minute budget (None: no request pacing)
+            tpm: Input tokens-per-minute budget (None: no token pacing)
+            max_retries: Retries per request after the first attempt
+            base_delay: First backoff delay in seconds (doubles per retry)
+            max_delay: Longest backoff delay in seconds
+            burst_seconds: Seconds of budget that may be spent at once
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests = TokenBucket(rpm, burst_seconds) if rpm else None
+        self._tokens = TokenBucket(tpm, burst_seconds) if tpm else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.hops: Dict[str, HopSchedule] = {}
+
+    def _stats(self, hop: str) -> HopSchedule:
+        with self._lock:
+            return self.hops.setdefault(hop, HopSchedule())
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve budget for one request; returns seconds to wait (budget and any server-requested pause)."""
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.reserve(1))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.reserve(tokens))
+        with self._lock:
+            wait = max(wait, self._paused_until - time.monotonic())
+        return max(wait, 0.0)
+
+    def _acquire(self, tokens: int) -> float:
+        """Wait for budget (and any server-requested pause); returns seconds waited."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number attempt (1-based).
+
+        Honors retry_after with up to 10% added jitter; otherwise "full
+        jitter" exponential backoff, uniform in [0, min(max_delay, base * 2^(attempt-1))].
+        """
+        if retry_after is not None:
+            return retry_after * (1 + random.uniform(0, 0.1))
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _begin(self, request: Dict, hop: str) -> Tuple[HopSchedule, int]:
+        """Count a new request; returns its hop stats and estimated input tokens."""
+        stats = self._stats(hop)
+        estimate = estimate_input_tokens(request) if self._tokens is not None else 0
+        with self._lock:
+            stats.requests += 1
+        return stats, estimate
+
+    def _start_attempt(self, stats: HopSchedule, queued: float):
+        with self._lock:
+            stats.attempts += 1
+            stats.queue_seconds += queued
+
+    def _retry_delay(self, stats: HopSchedule, error: anthropic.APIError, attempt: int) -> Optional[float]:
+        """
+        Account a failed attempt (attempt is the 1-based retry it would start).
+
+        Returns:
+            Seconds to back off before retrying, or None when the error
+            should be raised
+        """
+        if not is_retryable(error) or attempt > self.max_retries:
+            with self._lock:
+                stats.failed += 1
+            return None
+        retry_after = retry_after_seconds(error)
+        delay = self.backoff_delay(attempt, retry_after)
+        with self._lock:
+            if getattr(error, "status_code", None) == 429:
+                stats.rate_limited += 1
+            else:
+                stats.errors += 1
+            stats.backoff_seconds += delay
+            if retry_after is not None:
+                # Everyone shares the limit: hold back all requests
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        return delay
+
+    def _finish(self, stats: HopSchedule, message, elapsed: float, estimate: int):
+        with self._lock:
+            stats.model_seconds += elapsed
+        usage = getattr(message, "usage", None)
+        if self._tokens is not None and usage is not None:
+            self._tokens.adjust(billed_input_tokens(usage) - estimate)
+
+    def call(self, send: Callable[[], object], request: Dict, hop: str = "claude"):
+        """
+        Send one request under the budgets, retrying throttling and transient errors.
+
+        Args:
+            send: Performs the API call and returns the response Message
+            request: The request (used to estimate its input tokens)
+            hop: Label the time is accounted under
+
+        Returns:
+            The response Message
+        """
+        stats, estimate = self._begin(request, hop)
+
+        attempt = 0
+        while True:
+            queued = self._acquire(estimate)
+            self._start_attempt(stats, queued)
+            start = time.perf_counter()
+            try:
+                message = send()
+            except anthropic.APIError as e:
+                attempt += 1
+                delay = self._retry_delay(stats, e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            self._finish(stats, message, time.perf_counter() - start, estimate)
+            return message
+
+    async def acall(self, send: Callable[[], Awaitable], request: Dict, hop: str = "claude"):
+        """
+        call() for coroutines: waits with asyncio.sleep so the event loop keeps running.
+
+        Args:
+            send: Returns a fresh awaitable performing the API call
+            request: The request (used to estimate its input tokens)
+            hop: Label the time is accounted under
+
+        Returns:
+            The response Message
+        """
+        stats, estimate = self._begin(request, hop)
+
+        attempt = 0
+        while True:
+            queued = self._reserve(estimate)
+            if queued > 0:
+                await asyncio.sleep(queued)
+            self._start_attempt(stats, queued)
+            start = time.perf_counter()
+            try:
+                message = await send()
+            except anthropic.APIError as e:
+                attempt += 1
+                delay = self._retry_delay(stats, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            self._finish(stats, message, time.perf_counter() - start, estimate)
+            return message
+
+    def create(self, client: anthropic.Anthropic, request: Dict, hop: str = "claude"):
+        """
+        messages.create(**request) through the scheduler.
+
+        The SDK's own retries are turned off so every 429 passes through here.
+        """
+        no_retry = client.with_options(max_retries=0)
+        return self.call(lambda: no_retry.messages.create(**request), request, hop)
+
+    async def acreate(self, client: anthropic.AsyncAnthropic, request: Dict, hop: str = "claude"):
+        """await messages.create(**request) through the scheduler (see create())."""
+        no_retry = client.with_options(max_retries=0)
+        return await self.acall(lambda: no_retry.messages.create(**request), request, hop)
+
+    def stream(self, client: anthropic.Anthropic, request: Dict, hop: str = "claude"):
+        """
+        Open messages.stream(**request) through the scheduler.
+
+        Only opening the stream is paced and retried: throttling errors
+        arrive before the first event, and retrying once text has been
+        delivered would repeat it. The caller closes the returned stream
+        (it is a context manager).
+
+        Returns:
+            The open MessageStream
+        """
+        no_retry = client.with_options(max_retries=0)
+        return self.call(lambda: no_retry.messages.stream(**request).__enter__(), request, hop)
+
+    def reset(self):
+        with self._lock:
+            self.hops = {}
+
+    def print_report(self, file=None):
+        """Print per-hop queue wait, backoff and model latency."""
+        with self._lock:
+            hops = dict(self.hops)
+        if not hops:
+            return
+        budgets = ", ".join(f"{name} {value:g}" for name, value in (("RPM", self.rpm), ("TPM", self.tpm)) if value)
+        print(f"\nClaude scheduling ({budgets or 'no RPM/TPM budget'}):", file=file)
+        print(f"  {'Hop':<8} {'Requests':>8} {'Retries':>8} {'429s':>6} {'Failed':>7} "
+              f"{'Queue (s)':>10} {'Backoff (s)':>12} {'Model (s)':>10} {'Model avg':>10}", file=file)
+        for hop, stats in hops.items():
+            average = stats.model_seconds / (stats.requests - stats.failed) if stats.requests > stats.failed else 0.0
+            print(f"  {hop:<8} {stats.requests:>8} {stats.retries:>8} {stats.rate_limited:>6} {stats.failed:>7} "
+                  f"{stats.queue_seconds:>10.2f} {stats.backoff_seconds:>12.2f} {stats.model_seconds:>10.2f} "
+                  f"{average:>10.2f}", file=file)
+
+
+_scheduler: Optional[RateLimitScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """The process-wide scheduler, created with default settings on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RateLimitScheduler()
+        return _scheduler
+
+
+def configure_scheduler(rpm: Optional[float] = DEFAULT_RPM, tpm: Optional[float] = DEFAULT_TPM,
+                        max_retries: int = 6) -> RateLimitScheduler:
+    """Replace the process-wide scheduler with one using these budgets."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = RateLimitScheduler(rpm=rpm, tpm=tpm, max_retries=max_retries)
+        return _scheduler
+
+
+def reset_scheduler():
+    """Drop the process-wide scheduler (the next get_scheduler() starts fresh)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = None
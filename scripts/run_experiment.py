@@ -17,21 +17,59 @@ Usage:
     python run_experiment.py --mock             # Run with mock translations (no API)
     python run_experiment.py --sentences-only   # Just show test sentences
     python run_experiment.py --mock --text "Your custom text here"  # Test custom text
+    python run_experiment.py --local --batched  # Run each hop over the whole grid at once
+    python run_experiment.py --local --backend ctranslate2  # Optimized CPU runtime
+    python run_experiment.py --batch-api        # One Claude message batch per hop
+    python run_experiment.py --pack-size 8      # Eight sentences per Claude request
+    python run_experiment.py --hedge-deadline 5 # Local model answers hops Claude is slow on
 """
 
 import os
 import sys
 import json
+import time
 import argparse
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
 # Add scripts directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from spelling_error_injector import SpellingErrorInjector, ErrorStats
 from embedding_similarity_local import LocalEmbeddingSimilarityChecker
+from translation_cache import DedupStats, translate_unique, print_dedup_report
+from agent_prompts import CACHE_READ_PRICE, CACHE_WRITE_PRICE
+
+
+@dataclass
+class HopMetrics:
+    """Wall time and token counts of one translation hop."""
+    seconds: float = 0.0
+    input_tokens: float = 0            # Uncached prompt tokens (words in mock mode)
+    output_tokens: float = 0
+    cache_write_tokens: float = 0      # Claude only
+    cache_read_tokens: float = 0       # Claude only
+    billed_input_tokens: float = 0     # Claude: input tokens weighted by price (cache writes 1.25x, reads 0.1x)
+    amortized: bool = False            # An equal share of a batched hop, not this cell's own cost
+
+    def record_usage(self, usage):
+        """Add the usage of one Claude response."""
+        if usage is None:
+            return
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        self.input_tokens += usage.input_tokens or 0
+        self.output_tokens += usage.output_tokens or 0
+        self.cache_write_tokens += cache_write
+        self.cache_read_tokens += cache_read
+        self.billed_input_tokens += ((usage.input_tokens or 0) + cache_write * CACHE_WRITE_PRICE
+                                     + cache_read * CACHE_READ_PRICE)
+
+    def share(self, parts: int) -> "HopMetrics":
+        """One of parts equal shares (a batched hop amortized over its grid cells)."""
+        shares = {name: value / parts for name, value in asdict(self).items() if name != "amortized"}
+        return HopMetrics(**shares, amortized=True)
 
 
 @dataclass
@@ -46,6 +84,8 @@ class TranslationResult:
     final_english: str
     similarity_score: float
     vector_distance: float  # 1 - similarity
+    hop_backends: Dict[str, str] = field(default_factory=dict)  # agent_id -> backend that produced it
+    hop_metrics: Dict[str, HopMetrics] = field(default_factory=dict)  # agent_id -> time and tokens
 
 
 @dataclass
@@ -95,8 +135,69 @@ def validate_sentences(sentences: List[str], strict: bool = False) -> List[str]:
 # TRANSLATION FUNCTIONS
 # ============================================================================
 
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+# Output cap for one request: within the model's limit and short enough that
+# the SDK accepts it without streaming
+CLAUDE_MAX_OUTPUT_TOKENS = 16384
+# Most segments packed into one request (--pack-size)
+MAX_PACK_SIZE = 64
+
+# Pipeline hops in order, with their languages
+HOP_DIRECTIONS = {
+    "en-fr": ("English", "French"),
+    "fr-he": ("French", "Hebrew"),
+    "he-en": ("Hebrew", "English"),
+}
+
+
+def claude_request(text: str, source_lang: str, target_lang: str) -> Dict:
+    """
+    Messages API request for one translation hop.
+
+    Args:
+        text: Text to translate
+        source_lang: Source language (e.g., "English", "French", "Hebrew")
+        target_lang: Target language
+
+    Returns:
+        messages.create() keyword arguments with the agent's compiled system
+        prompt (from agents/ and skills/), marked for prompt caching
+    """
+    from agent_prompts import get_registry
+
+    registry = get_registry()
+    agent = registry.for_direction(source_lang, target_lang)
+    if agent is not None:
+        return registry.build_request(CLAUDE_MODEL, text, agent.agent_id)
+
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 1024,
+        "system": f"You are an expert {source_lang} to {target_lang} translator. Return ONLY the translation.",
+        "messages": [{"role": "user", "content": f"Translate:\n\n{text}"}],
+    }
+
+
+def _claude_hop(source_lang: str, target_lang: str) -> str:
+    """Agent identifier used to report a direction's token usage."""
+    from agent_prompts import get_registry
+
+    agent = get_registry().for_direction(source_lang, target_lang)
+    return agent.agent_id if agent is not None else f"{source_lang}-{target_lang}"
+
+
+def _claude_cache_params(request: Dict, source_lang: str, target_lang: str) -> Dict:
+    """Generation parameters that key a Claude translation in the cache."""
+    system = request["system"]
+    if isinstance(system, list):
+        system = "".join(block["text"] for block in system)
+    return {"direction": [source_lang, target_lang], "system": system,
+            "max_tokens": request["max_tokens"]}
+
+
 def translate_with_claude(text: str, source_lang: str, target_lang: str,
-                         api_key: Optional[str] = None) -> str:
+                         api_key: Optional[str] = None, cache=None,
+                         metrics: Optional[HopMetrics] = None) -> str:
     """
     Translate text using Claude API with agent-specific system prompts.
 
@@ -105,12 +206,16 @@ def translate_with_claude(text: str, source_lang: str, target_lang: str,
         source_lang: Source language (e.g., "English", "French", "Hebrew")
         target_lang: Target language
         api_key: Anthropic API key (uses env var if not provided)
+        cache: Optional TranslationCache; a hit skips the API call
+        metrics: Optional HopMetrics to add the response's token usage to
 
     Returns:
         Translated text
     """
     try:
-        import anthropic
+        from claude_client import get_client
+        from agent_prompts import get_usage_tracker
+        from rate_limiter import get_scheduler
     except ImportError:
         raise ImportError("Please install anthropic: pip install anthropic")
 
@@ -118,60 +223,126 @@ def translate_with_claude(text: str, source_lang: str, target_lang: str,
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not set. Use --mock for testing without API.")
 
-    client = anthropic.Anthropic(api_key=api_key)
-
-    # Agent-specific system prompts based on translation direction
-    system_prompts = {
-        ("English", "French"): """You are Agent 1: Expert English to French translator.
-Follow these guidelines:
-- Use subjunctive for doubt, emotion, desire, necessity
-- Apply partitive articles (du/de la/de l'/des) correctly
-- Always include subject pronouns
-- BANGS adjectives before nouns, others after
-- Natural phrasing: "I miss you" → "Tu me manques", "I am cold" → "J'ai froid"
-- Handle spelling errors by understanding intended meaning
-Return ONLY the French translation.""",
-
-        ("French", "Hebrew"): """You are Agent 2: Expert French to Hebrew translator.
-Follow these guidelines:
-- French gender does NOT transfer to Hebrew - determine Hebrew gender independently
-- Select correct binyan based on meaning (Pa'al, Nif'al, Pi'el, Hif'il, Hitpa'el)
-- Convert articles: le/la/les → ה prefix
-- Tense mapping: passé composé → past, futur → future
-Return ONLY the Hebrew translation.""",
-
-        ("Hebrew", "English"): """You are Agent 3: Expert Hebrew to English translator.
-Follow these guidelines:
-- Resolve nikud ambiguities using context
-- Map Hebrew binyan to appropriate English verb forms
-- Convert VSO word order to SVO
-- Map gender to correct pronouns (feminine -ת → "she", masculine → "he")
-- Expand prefixes: ב → "in", ל → "to", מ → "from", ה → "the"
-- Produce natural, native-sounding English
-Return ONLY the English translation."""
-    }
+    request = claude_request(text, source_lang, target_lang)
 
-    system = system_prompts.get((source_lang, target_lang),
-        f"You are an expert {source_lang} to {target_lang} translator. Return ONLY the translation.")
+    if cache is not None:
+        params = _claude_cache_params(request, source_lang, target_lang)
+        return cache.get_or_translate("claude", CLAUDE_MODEL, params, text,
+                                      lambda t: translate_with_claude(t, source_lang, target_lang, api_key,
+                                                                      metrics=metrics))
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1024,
-        system=system,
-        messages=[{"role": "user", "content": f"Translate:\n\n{text}"}]
-    )
+    # Shared keep-alive client: no new connection per call
+    client = get_client(api_key)
+
+    # Paced to the RPM/TPM budget; 429s and overloads are retried with backoff
+    hop = _claude_hop(source_lang, target_lang)
+    message = get_scheduler().create(client, request, hop)
+    get_usage_tracker().record(hop, message.usage)
+    if metrics is not None:
+        metrics.record_usage(message.usage)
 
     return message.content[0].text.strip()
 
 
-def mock_translate(text: str, source_lang: str, target_lang: str) -> str:
+def claude_pack_request(texts: List[str], source_lang: str, target_lang: str) -> Dict:
+    """
+    Messages API request translating several numbered segments at once.
+
+    The system prompt is the same as claude_request()'s, so packed requests
+    share its prompt cache entry. The output budget grows with the number of
+    segments up to CLAUDE_MAX_OUTPUT_TOKENS.
+    """
+    from segment_packing import pack_message
+
+    request = claude_request("", source_lang, target_lang)
+    request["max_tokens"] = min(request["max_tokens"] * len(texts), CLAUDE_MAX_OUTPUT_TOKENS)
+    request["messages"] = [{"role": "user", "content": pack_message(texts, source_lang, target_lang)}]
+    return request
+
+
+def translate_with_claude_many(texts: List[str], source_lang: str, target_lang: str,
+                               api_key: Optional[str] = None, cache=None,
+                               batch_translator=None, pack_size: int = 1,
+                               pack_stats=None, metrics: Optional[HopMetrics] = None) -> List[str]:
+    """
+    Translate many texts with Claude, as a message batch and/or packed.
+
+    Args:
+        texts: Texts to translate
+        source_lang: Source language
+        target_lang: Target language
+        api_key: Anthropic API key (uses env var if not provided)
+        cache: Optional TranslationCache; only misses are sent
+        batch_translator: Optional claude_batches.BatchTranslator; requests
+                          then go out as one Message Batches job
+        pack_size: Segments per request (1 = one text per request)
+        pack_stats: Optional segment_packing.PackStats to update
+        metrics: Optional HopMetrics to add every response's token usage to
+
+    Returns:
+        Translated texts in input order
+    """
+    from agent_prompts import get_usage_tracker
+
+    hop = _claude_hop(source_lang, target_lang)
+
+    def on_message(message):
+        get_usage_tracker().record(hop, message.usage)
+        if metrics is not None:
+            metrics.record_usage(message.usage)
+
+    if batch_translator is not None:
+        send = lambda requests: batch_translator.run(requests, on_message=on_message)
+    else:
+        from claude_client import get_client
+        from rate_limiter import get_scheduler
+        client = get_client(api_key)
+
+        def send(requests: List[Dict]) -> List[str]:
+            outputs = []
+            for request in requests:
+                message = get_scheduler().create(client, request, hop)
+                on_message(message)
+                outputs.append(message.content[0].text.strip())
+            return outputs
+
+    def translate_all(batch: List[str]) -> List[str]:
+        if pack_size > 1:
+            from segment_packing import translate_packed
+            return translate_packed(batch,
+                                    lambda pack: claude_pack_request(pack, source_lang, target_lang),
+                                    lambda text: claude_request(text, source_lang, target_lang),
+                                    send, pack_size=pack_size, stats=pack_stats)
+        return send([claude_request(text, source_lang, target_lang) for text in batch])
+
+    if cache is None:
+        return translate_all(list(texts))
+
+    params = _claude_cache_params(claude_request("", source_lang, target_lang), source_lang, target_lang)
+    outputs = cache.get_many("claude", CLAUDE_MODEL, params, texts)
+    missing = [i for i, output in enumerate(outputs) if output is None]
+    if missing:
+        translated = translate_all([texts[i] for i in missing])
+        cache.put_many("claude", CLAUDE_MODEL, params, [texts[i] for i in missing], translated)
+        for i, translation in zip(missing, translated):
+            outputs[i] = translation
+    return outputs
+
+
+def mock_translate(text: str, source_lang: str, target_lang: str, cache=None) -> str:
     """
     Mock translation for testing without API.
 
     This simulates translation by making word-by-word replacements.
     Misspelled words won't match the dictionary and will pass through unchanged,
     causing degradation in the final output (simulating real translation behavior).
+
+    Pass a TranslationCache as cache to reuse earlier results.
     """
+    if cache is not None:
+        return cache.get_or_translate("mock", "mock", {"direction": [source_lang, target_lang]}, text,
+                                      lambda t: mock_translate(t, source_lang, target_lang))
+
     if source_lang == "English" and target_lang == "French":
         # EN -> FR: Word-by-word replacement
         # Misspelled words won't match and pass through unchanged
@@ -268,10 +439,91 @@ def mock_translate(text: str, source_lang: str, target_lang: str) -> str:
     return text
 
 
+def _backend_name(use_mock: bool, use_local: bool) -> str:
+    """Backend label recorded for every hop of an unhedged run."""
+    if use_local:
+        return "local"
+    return "mock" if use_mock else "claude"
+
+
+def _local_tokens(local_pipeline, agent_id: str) -> Tuple[int, int]:
+    """Input and output tokens the local agent has generated so far."""
+    stats = local_pipeline.hop_stats.get(agent_id)
+    return (stats.input_tokens, stats.output_tokens) if stats else (0, 0)
+
+
+def translate_hop(text: str, agent_id: str, use_mock: bool = False,
+                  use_local: bool = False,
+                  api_key: Optional[str] = None,
+                  local_pipeline=None,
+                  cache=None) -> Tuple[str, HopMetrics]:
+    """
+    Translate one hop and measure it.
+
+    Token counts are what the backend processed: tokenizer tokens for the
+    local models (none on a cache hit), API usage for Claude (none on a
+    cache hit), and whitespace-separated words for mock mode.
+
+    Args:
+        text: Text to translate
+        agent_id: Agent identifier ("en-fr", "fr-he", or "he-en")
+        use_mock, use_local, api_key, local_pipeline, cache:
+            As for run_translation_pipeline()
+
+    Returns:
+        Tuple of (translated_text, HopMetrics)
+    """
+    source, target = HOP_DIRECTIONS[agent_id]
+    metrics = HopMetrics()
+    start = time.perf_counter()
+
+    if use_local:
+        tokens_before = _local_tokens(local_pipeline, agent_id)
+        output = local_pipeline.translate(text, agent_id)
+        tokens_after = _local_tokens(local_pipeline, agent_id)
+        metrics.input_tokens = tokens_after[0] - tokens_before[0]
+        metrics.output_tokens = tokens_after[1] - tokens_before[1]
+    elif use_mock:
+        output = mock_translate(text, source, target, cache=cache)
+        metrics.input_tokens = len(text.split())
+        metrics.output_tokens = len(output.split())
+    else:
+        output = translate_with_claude(text, source, target, api_key, cache=cache, metrics=metrics)
+
+    metrics.seconds = time.perf_counter() - start
+    return output, metrics
+
+
+def make_hedger(local_pipeline, deadline: float, api_key: Optional[str] = None, cache=None):
+    """
+    HedgedTranslator racing Claude hops against the warm local agents.
+
+    Both backends return translate_hop()'s (text, HopMetrics).
+
+    Args:
+        local_pipeline: Preloaded LocalTranslationPipeline used as the fallback
+        deadline: Seconds a Claude hop may take before the local agent starts
+        api_key: Anthropic API key (uses env var if not provided)
+        cache: Optional TranslationCache for the Claude hops
+
+    Returns:
+        hedging.HedgedTranslator
+    """
+    from hedging import HedgedTranslator
+
+    claude = lambda text, agent_id: translate_hop(text, agent_id, api_key=api_key, cache=cache)
+    local = lambda text, agent_id: translate_hop(text, agent_id, use_local=True, local_pipeline=local_pipeline)
+    return HedgedTranslator(claude, local, deadline)
+
+
 def run_translation_pipeline(text: str, use_mock: bool = False,
                             use_local: bool = False,
                             api_key: Optional[str] = None,
-                            local_pipeline=None) -> Tuple[str, str, str]:
+                            local_pipeline=None,
+                            cache=None,
+                            hedger=None,
+                            hop_backends: Optional[Dict[str, str]] = None,
+                            hop_metrics: Optional[Dict[str, HopMetrics]] = None) -> Tuple[str, str, str]:
     """
     Run the full translation pipeline: EN -> FR -> HE -> EN
 
@@ -280,29 +532,128 @@ def run_translation_pipeline(text: str, use_mock: bool = False,
         use_mock: If True, use mock translations instead of API
         use_local: If True, use local MarianMT models
         api_key: Optional API key for Claude
-        local_pipeline: LocalTranslationPipeline instance (for local mode)
+        local_pipeline: LocalTranslationPipeline instance (for local mode;
+                        it carries its own cache)
+        cache: Optional TranslationCache for mock and Claude hops
+        hedger: Optional HedgedTranslator (see make_hedger); in Claude mode a
+                hop that misses its deadline is raced on the local agent
+        hop_backends: Optional dict filled with the backend that produced
+                      each hop ("en-fr", "fr-he", "he-en")
+        hop_metrics: Optional dict filled with a HopMetrics per hop
 
     Returns:
         Tuple of (french_text, hebrew_text, final_english_text)
     """
-    if use_local and local_pipeline:
-        # Use local MarianMT models
-        return local_pipeline.run_pipeline(text)
-    elif use_mock:
-        translate = mock_translate
-    else:
-        translate = lambda t, s, d: translate_with_claude(t, s, d, api_key)
+    use_local = bool(use_local and local_pipeline)
+    backend = _backend_name(use_mock, use_local)
+
+    outputs = []
+    current = text
+    for agent_id in HOP_DIRECTIONS:
+        if hedger is not None and backend == "claude":
+            hop = hedger.translate(current, agent_id)
+            current, metrics = hop.output
+            # Wall time of the hop, including the wait before hedging
+            metrics.seconds = hop.seconds
+            hop_backend = hop.backend
+        else:
+            current, metrics = translate_hop(current, agent_id, use_mock=use_mock, use_local=use_local,
+                                             api_key=api_key, local_pipeline=local_pipeline, cache=cache)
+            hop_backend = backend
+
+        if hop_backends is not None:
+            hop_backends[agent_id] = hop_backend
+        if hop_metrics is not None:
+            hop_metrics[agent_id] = metrics
+        outputs.append(current)
+
+    french, hebrew, final_english = outputs
+    return french, hebrew, final_english
 
-    # Step 1: English -> French
-    french = translate(text, "English", "French")
 
-    # Step 2: French -> Hebrew
-    hebrew = translate(french, "French", "Hebrew")
+def run_translation_pipeline_batch(texts: List[str], use_mock: bool = False,
+                                   use_local: bool = False,
+                                   api_key: Optional[str] = None,
+                                   local_pipeline=None,
+                                   cache=None,
+                                   dedup_stats: Optional[Dict] = None,
+                                   batch_translator=None,
+                                   pack_size: int = 1,
+                                   pack_stats=None,
+                                   hop_metrics: Optional[Dict[str, HopMetrics]] = None) -> List[Tuple[str, str, str]]:
+    """
+    Run the translation pipeline stage-wise over many texts.
 
-    # Step 3: Hebrew -> English
-    final_english = translate(hebrew, "Hebrew", "English")
+    Every text goes EN -> FR before any text goes FR -> HE, and so on.
+    Local mode hands whole stages to the model as padded batches. At every
+    hop, identical inputs (including identical French or Hebrew outputs of
+    the previous hop) are translated once and fanned back out.
 
-    return french, hebrew, final_english
+    Args:
+        texts: English texts to translate
+        use_mock: If True, use mock translations instead of API
+        use_local: If True, use local MarianMT models
+        api_key: Optional API key for Claude
+        local_pipeline: LocalTranslationPipeline instance (for local mode;
+                        it carries its own cache)
+        cache: Optional TranslationCache for mock and Claude hops
+        dedup_stats: Optional dict filled with a DedupStats per hop
+                     ("en-fr", "fr-he", "he-en") for mock and Claude mode;
+                     local mode records them in local_pipeline.dedup_stats
+        batch_translator: Optional claude_batches.BatchTranslator; in Claude
+                          mode each hop is then one Message Batches job
+        pack_size: Claude mode: numbered segments sent per request
+        pack_stats: Optional segment_packing.PackStats for Claude packing
+        hop_metrics: Optional dict filled with a HopMetrics per hop, totalled
+                     over all texts
+
+    Returns:
+        List of (french_text, hebrew_text, final_english_text) tuples in input order
+    """
+    if dedup_stats is None:
+        dedup_stats = {}
+    if hop_metrics is None:
+        hop_metrics = {}
+
+    def translate_many(unique: List[str], agent_id: str, metrics: HopMetrics) -> List[str]:
+        source, target = HOP_DIRECTIONS[agent_id]
+        if use_mock:
+            outputs = [mock_translate(t, source, target, cache=cache) for t in unique]
+            metrics.input_tokens += sum(len(t.split()) for t in unique)
+            metrics.output_tokens += sum(len(t.split()) for t in outputs)
+            return outputs
+        if batch_translator is not None or pack_size > 1:
+            return translate_with_claude_many(
+                unique, source, target, api_key, cache=cache, batch_translator=batch_translator,
+                pack_size=pack_size, pack_stats=pack_stats, metrics=metrics)
+        return [translate_with_claude(t, source, target, api_key, cache=cache, metrics=metrics) for t in unique]
+
+    def hop(inputs: List[str], agent_id: str) -> List[str]:
+        metrics = hop_metrics.setdefault(agent_id, HopMetrics())
+        start = time.perf_counter()
+        if use_local and local_pipeline:
+            # The local pipeline deduplicates and records its own stats
+            tokens_before = _local_tokens(local_pipeline, agent_id)
+            outputs = local_pipeline.translate_batch(inputs, agent_id)
+            tokens_after = _local_tokens(local_pipeline, agent_id)
+            metrics.input_tokens += tokens_after[0] - tokens_before[0]
+            metrics.output_tokens += tokens_after[1] - tokens_before[1]
+        else:
+            stats = dedup_stats.setdefault(agent_id, DedupStats())
+            outputs = translate_unique(inputs, lambda unique: translate_many(unique, agent_id, metrics), stats)
+        metrics.seconds += time.perf_counter() - start
+        return outputs
+
+    # Step 1: English -> French (all texts)
+    french = hop(texts, "en-fr")
+
+    # Step 2: French -> Hebrew (all texts)
+    hebrew = hop(french, "fr-he")
+
+    # Step 3: Hebrew -> English (all texts)
+    final_english = hop(hebrew, "he-en")
+
+    return list(zip(french, hebrew, final_english))
 
 
 # ============================================================================
@@ -314,7 +665,15 @@ def run_experiment(sentences: List[str] = None,
                   use_mock: bool = False,
                   use_local: bool = False,
                   api_key: Optional[str] = None,
-                  verbose: bool = True) -> ExperimentResult:
+                  verbose: bool = True,
+                  batched: bool = False,
+                  local_backend: str = "transformers",
+                  cache=None,
+                  batch_api: bool = False,
+                  batch_poll_interval: float = 30.0,
+                  pack_size: int = 1,
+                  hedge_deadline: Optional[float] = None,
+                  embedding_store=None) -> ExperimentResult:
     """
     Run the full spelling error vs vector distance experiment.
 
@@ -325,10 +684,34 @@ def run_experiment(sentences: List[str] = None,
         use_local: If True, use local MarianMT models (no API needed)
         api_key: Optional API key
         verbose: Print progress
+        batched: If True, inject errors for the whole grid, run each hop over
+                 all variants at once, then embed everything in one pass
+        local_backend: Inference runtime for local mode ("transformers" or "ctranslate2")
+        cache: Optional TranslationCache shared by every hop of every backend
+        batch_api: If True (Claude mode only), submit each hop for the whole
+                   grid as one Message Batches job; implies batched
+        batch_poll_interval: Seconds between batch status checks
+        pack_size: Claude mode: numbered sentences sent per request; above 1
+                   implies batched
+        hedge_deadline: Claude mode: seconds a hop may take before the warm
+                        local model is started on it too (first result wins)
+        embedding_store: Optional EmbeddingStore; only texts it has not seen
+                         are embedded for similarity scoring
 
     Returns:
         ExperimentResult with all data
     """
+    if batch_api and (use_mock or use_local):
+        raise ValueError("batch_api requires Claude mode (not mock or local)")
+    if not 1 <= pack_size <= MAX_PACK_SIZE:
+        raise ValueError(f"pack_size must be between 1 and {MAX_PACK_SIZE}")
+    if pack_size > 1 and (use_mock or use_local):
+        raise ValueError("pack_size requires Claude mode (not mock or local)")
+    if hedge_deadline is not None and (use_mock or use_local):
+        raise ValueError("hedge_deadline requires Claude mode (not mock or local)")
+    if hedge_deadline is not None and (batched or batch_api or pack_size > 1):
+        raise ValueError("hedge_deadline hedges single requests; it cannot be batched")
+
     if sentences is None:
         sentences = TEST_SENTENCES
 
@@ -337,23 +720,48 @@ def run_experiment(sentences: List[str] = None,
 
     # Initialize components
     injector = SpellingErrorInjector(seed=42)
-    similarity_checker = LocalEmbeddingSimilarityChecker()
+    similarity_checker = LocalEmbeddingSimilarityChecker(store=embedding_store)
 
     # Initialize local translation pipeline if needed
     local_pipeline = None
-    if use_local:
+    if use_local or hedge_deadline is not None:
         from local_translation_agents import LocalTranslationPipeline
-        local_pipeline = LocalTranslationPipeline(verbose=False)
+        local_pipeline = LocalTranslationPipeline(verbose=False, backend=local_backend, cache=cache)
+        # Load and warm up all agents now so no model load lands inside a measured cell
+        load_timings = local_pipeline.preload()
+        if verbose:
+            for agent_id, timings in load_timings.items():
+                print(f"Preloaded {agent_id}: load {timings['load_seconds']:.1f}s, "
+                      f"warmup {timings['warmup_seconds']:.1f}s")
+
+    batch_translator = None
+    if batch_api:
+        from claude_batches import BatchTranslator
+        batch_translator = BatchTranslator(api_key=api_key, poll_interval=batch_poll_interval,
+                                           verbose=verbose)
+        batched = True
+    if pack_size > 1:
+        batched = True
+
+    hedger = None
+    if hedge_deadline is not None:
+        hedger = make_hedger(local_pipeline, hedge_deadline, api_key=api_key, cache=cache)
 
     results: List[TranslationResult] = []
 
     # Determine mode string
     if use_local:
-        mode_str = "Local Models (MarianMT)"
+        mode_str = f"Local Models (MarianMT, {local_backend})"
     elif use_mock:
         mode_str = "Mock (no API)"
+    elif batch_api:
+        mode_str = "Claude Message Batches API"
     else:
         mode_str = "Claude API"
+    if pack_size > 1:
+        mode_str += f", {pack_size} sentences per request"
+    if hedger is not None:
+        mode_str += f", hedged to local ({local_backend}) after {hedge_deadline:g}s"
 
     if verbose:
         print("\n" + "=" * 70)
@@ -362,42 +770,179 @@ def run_experiment(sentences: List[str] = None,
         print("=" * 70)
         print(f"\nTest sentences: {len(sentences)}")
         print(f"Error rates to test: {[f'{r*100:.0f}%' for r in error_rates]}")
-        print(f"Mode: {mode_str}")
+        print(f"Mode: {mode_str}{' (batched)' if batched else ''}")
         print()
 
-    # Run experiments
-    for sent_idx, sentence in enumerate(sentences):
-        if verbose:
-            print(f"\n--- Sentence {sent_idx + 1} ({len(sentence.split())} words) ---")
-            print(f"Original: {sentence[:80]}...")
+    if batched:
+        results = _run_batched_grid(sentences, error_rates, injector, similarity_checker,
+                                    use_mock=use_mock, use_local=use_local, api_key=api_key,
+                                    local_pipeline=local_pipeline, verbose=verbose, cache=cache,
+                                    batch_translator=batch_translator, pack_size=pack_size)
+    else:
+        # Run experiments
+        for sent_idx, sentence in enumerate(sentences):
+            if verbose:
+                print(f"\n--- Sentence {sent_idx + 1} ({len(sentence.split())} words) ---")
+                print(f"Original: {sentence[:80]}...")
 
-        for error_rate in error_rates:
-            # Inject errors
-            error_stats = injector.inject_errors(sentence, error_rate)
+            for error_rate in error_rates:
+                # Inject errors
+                error_stats = injector.inject_errors(sentence, error_rate)
 
-            if verbose:
-                print(f"\n  Error rate: {error_rate*100:.0f}% (actual: {error_stats.actual_error_rate*100:.1f}%)")
-
-            # Run translation pipeline
-            try:
-                french, hebrew, final_english = run_translation_pipeline(
-                    error_stats.modified_text,
-                    use_mock=use_mock,
-                    use_local=use_local,
-                    api_key=api_key,
-                    local_pipeline=local_pipeline
+                if verbose:
+                    print(f"\n  Error rate: {error_rate*100:.0f}% (actual: {error_stats.actual_error_rate*100:.1f}%)")
+
+                # Run translation pipeline
+                hop_backends = {}
+                hop_metrics = {}
+                try:
+                    french, hebrew, final_english = run_translation_pipeline(
+                        error_stats.modified_text,
+                        use_mock=use_mock,
+                        use_local=use_local,
+                        api_key=api_key,
+                        local_pipeline=local_pipeline,
+                        cache=cache,
+                        hedger=hedger,
+                        hop_backends=hop_backends,
+                        hop_metrics=hop_metrics
+                    )
+                except Exception as e:
+                    if verbose:
+                        print(f"    ERROR: {e}")
+                    continue
+
+                # Similarity is filled in for all cells at once below
+                result = TranslationResult(
+                    original_sentence=sentence,
+                    input_with_errors=error_stats.modified_text,
+                    error_rate=error_rate,
+                    actual_error_rate=error_stats.actual_error_rate,
+                    french_translation=french,
+                    hebrew_translation=hebrew,
+                    final_english=final_english,
+                    similarity_score=0.0,
+                    vector_distance=1.0,
+                    hop_backends=hop_backends,
+                    hop_metrics=hop_metrics
                 )
-            except Exception as e:
+                results.append(result)
+
                 if verbose:
-                    print(f"    ERROR: {e}")
-                continue
+                    print(f"    Input:  {error_stats.modified_text[:60]}...")
+                    print(f"    Output: {final_english[:60]}...")
+
+        # Compare each ORIGINAL clean sentence to its final translation
+        score_results(results, similarity_checker)
+        if verbose and results:
+            print("\nSimilarity (original vs final):")
+            for result in results:
+                print(f"  {result.original_sentence[:40]}... @ {result.error_rate*100:.0f}%: "
+                      f"Similarity: {result.similarity_score:.4f} | Distance: {result.vector_distance:.4f}")
+
+    if hedger is not None:
+        # Let losing Claude calls finish so their latency is in the report
+        hedger.close()
+    if verbose and cache is not None:
+        cache.print_stats()
+    if verbose and embedding_store is not None:
+        embedding_store.print_stats()
+    if verbose and hedger is not None:
+        hedger.print_report()
+    if verbose and batch_translator is not None:
+        batch_translator.print_stats()
+    if verbose and not use_mock and not use_local:
+        from claude_client import get_pool
+        from agent_prompts import get_usage_tracker
+        from rate_limiter import get_scheduler
+        get_pool().print_stats()
+        get_usage_tracker().print_report()
+        get_scheduler().print_report()
 
-            # Calculate similarity (compare ORIGINAL clean sentence to final translation)
-            sim_results = similarity_checker.analyze(sentence, final_english)
-            similarity = sim_results['similarity_score']
-            distance = 1 - similarity
+    # Calculate summary statistics
+    summary = calculate_summary(results, error_rates)
+    if hedger is not None:
+        summary['hedging'] = hedger.latency_report()
+
+    return ExperimentResult(
+        timestamp=datetime.now().isoformat(),
+        test_sentences=sentences,
+        sentence_lengths=[len(s.split()) for s in sentences],
+        error_rates=error_rates,
+        results=results,
+        summary=summary
+    )
+
+
+def _run_batched_grid(sentences: List[str],
+                      error_rates: List[float],
+                      injector: SpellingErrorInjector,
+                      similarity_checker: LocalEmbeddingSimilarityChecker,
+                      use_mock: bool = False,
+                      use_local: bool = False,
+                      api_key: Optional[str] = None,
+                      local_pipeline=None,
+                      verbose: bool = True,
+                      cache=None,
+                      batch_translator=None,
+                      pack_size: int = 1) -> List[TranslationResult]:
+    """
+    Run the sentence x error_rate grid stage by stage.
+
+    Errors are injected in the same order as the per-cell loop, so a fixed
+    injector seed yields the same variants in both modes. Each hop runs once
+    for the whole grid, so every cell records an equal share of its time
+    and tokens, marked amortized (the per-error-rate summary leaves these
+    out, since every rate would get the same figures). If the batched run fails, each cell is retried on its own
+    and only the cells that still fail are dropped.
+
+    Returns:
+        List of TranslationResult, one per translated grid cell
+    """
+    # Stage 1: inject errors for the whole grid
+    cells = [(sentence, error_rate, injector.inject_errors(sentence, error_rate))
+             for sentence in sentences
+             for error_rate in error_rates]
+
+    if verbose:
+        print(f"Translating {len(cells)} variants stage by stage...")
+
+    # Stage 2: run every hop over all variants
+    dedup_stats = {}
+    hop_metrics = {}
+    pack_stats = None
+    if pack_size > 1:
+        from segment_packing import PackStats
+        pack_stats = PackStats()
+    try:
+        translations = run_translation_pipeline_batch(
+            [error_stats.modified_text for _, _, error_stats in cells],
+            use_mock=use_mock,
+            use_local=use_local,
+            api_key=api_key,
+            local_pipeline=local_pipeline,
+            cache=cache,
+            dedup_stats=dedup_stats,
+            batch_translator=batch_translator,
+            pack_size=pack_size,
+            pack_stats=pack_stats,
+            hop_metrics=hop_metrics
+        )
+    except Exception as e:
+        if verbose:
+            print(f"    ERROR: {e}")
+            print("    Falling back to translating each variant on its own")
+        results = _run_cells_individually(cells, use_mock=use_mock, use_local=use_local, api_key=api_key,
+                                          local_pipeline=local_pipeline, verbose=verbose, cache=cache)
+    else:
+        if verbose:
+            print_dedup_report(local_pipeline.dedup_stats if use_local and local_pipeline else dedup_stats)
+            if pack_stats is not None:
+                from segment_packing import print_pack_report
+                print_pack_report(pack_stats, pack_size)
 
-            result = TranslationResult(
+        results = [
+            TranslationResult(
                 original_sentence=sentence,
                 input_with_errors=error_stats.modified_text,
                 error_rate=error_rate,
@@ -405,27 +950,129 @@ def run_experiment(sentences: List[str] = None,
                 french_translation=french,
                 hebrew_translation=hebrew,
                 final_english=final_english,
-                similarity_score=similarity,
-                vector_distance=distance
+                similarity_score=0.0,
+                vector_distance=1.0,
+                hop_backends=dict.fromkeys(HOP_DIRECTIONS, _backend_name(use_mock, use_local)),
+                hop_metrics={agent_id: metrics.share(len(cells)) for agent_id, metrics in hop_metrics.items()}
             )
-            results.append(result)
+            for (sentence, error_rate, error_stats), (french, hebrew, final_english) in zip(cells, translations)
+        ]
+
+    # Stage 3: embed originals and outputs in one pass
+    score_results(results, similarity_checker)
+
+    if verbose:
+        for result in results:
+            print(f"\n  {result.original_sentence[:40]}... @ {result.error_rate*100:.0f}% "
+                  f"(actual: {result.actual_error_rate*100:.1f}%)")
+            print(f"    Output: {result.final_english[:60]}...")
+            print(f"    Similarity: {result.similarity_score:.4f} | Distance: {result.vector_distance:.4f}")
+
+    return results
+
+
+def _run_cells_individually(cells: List[Tuple[str, float, ErrorStats]],
+                            use_mock: bool = False,
+                            use_local: bool = False,
+                            api_key: Optional[str] = None,
+                            local_pipeline=None,
+                            verbose: bool = True,
+                            cache=None) -> List[TranslationResult]:
+    """
+    Translate grid cells one pipeline run at a time.
+
+    Used when a batched hop fails, so only the cells that fail on their own
+    are dropped (and logged) rather than the whole grid.
 
+    Returns:
+        List of TranslationResult for the cells that translated, unscored
+    """
+    results: List[TranslationResult] = []
+    for sentence, error_rate, error_stats in cells:
+        hop_backends = {}
+        hop_metrics = {}
+        try:
+            french, hebrew, final_english = run_translation_pipeline(
+                error_stats.modified_text,
+                use_mock=use_mock,
+                use_local=use_local,
+                api_key=api_key,
+                local_pipeline=local_pipeline,
+                cache=cache,
+                hop_backends=hop_backends,
+                hop_metrics=hop_metrics
+            )
+        except Exception as e:
             if verbose:
-                print(f"    Input:  {error_stats.modified_text[:60]}...")
-                print(f"    Output: {final_english[:60]}...")
-                print(f"    Similarity: {similarity:.4f} | Distance: {distance:.4f}")
+                print(f"    ERROR: {sentence[:40]}... @ {error_rate*100:.0f}%: {e}")
+            continue
+
+        results.append(TranslationResult(
+            original_sentence=sentence,
+            input_with_errors=error_stats.modified_text,
+            error_rate=error_rate,
+            actual_error_rate=error_stats.actual_error_rate,
+            french_translation=french,
+            hebrew_translation=hebrew,
+            final_english=final_english,
+            similarity_score=0.0,
+            vector_distance=1.0,
+            hop_backends=hop_backends,
+            hop_metrics=hop_metrics
+        ))
+
+    return results
+
+
+def score_results(results: List[TranslationResult],
+                  similarity_checker: LocalEmbeddingSimilarityChecker):
+    """
+    Fill in similarity_score and vector_distance of every result.
 
-    # Calculate summary statistics
-    summary = calculate_summary(results, error_rates)
+    All originals and final translations are embedded in one batched pass
+    (see LocalEmbeddingSimilarityChecker.score_pairs).
+    """
+    similarities = similarity_checker.score_pairs([result.original_sentence for result in results],
+                                                  [result.final_english for result in results])
+    for result, similarity in zip(results, similarities):
+        result.similarity_score = float(similarity)
+        result.vector_distance = 1 - result.similarity_score
 
-    return ExperimentResult(
-        timestamp=datetime.now().isoformat(),
-        test_sentences=sentences,
-        sentence_lengths=[len(s.split()) for s in sentences],
-        error_rates=error_rates,
-        results=results,
-        summary=summary
-    )
+
+def summarize_hops(results: List[TranslationResult], include_amortized: bool = True) -> Dict[str, Dict]:
+    """
+    Total and average time and tokens per hop over some results.
+
+    Args:
+        results: Translated grid cells
+        include_amortized: Count equal shares of batched hops (see HopMetrics.share)
+
+    Returns:
+        agent_id -> count, total/avg/max seconds, token totals and whether
+        any figure is an amortized share
+    """
+    by_hop: Dict[str, List[HopMetrics]] = {}
+    for result in results:
+        for agent_id, metrics in result.hop_metrics.items():
+            if include_amortized or not metrics.amortized:
+                by_hop.setdefault(agent_id, []).append(metrics)
+
+    summary = {}
+    for agent_id, hops in by_hop.items():
+        seconds = [m.seconds for m in hops]
+        summary[agent_id] = {
+            'count': len(hops),
+            'total_seconds': sum(seconds),
+            'avg_seconds': sum(seconds) / len(seconds),
+            'max_seconds': max(seconds),
+            'input_tokens': sum(m.input_tokens for m in hops),
+            'output_tokens': sum(m.output_tokens for m in hops),
+            'cache_write_tokens': sum(m.cache_write_tokens for m in hops),
+            'cache_read_tokens': sum(m.cache_read_tokens for m in hops),
+            'billed_input_tokens': sum(m.billed_input_tokens for m in hops),
+            'amortized': any(m.amortized for m in hops),
+        }
+    return summary
 
 
 def calculate_summary(results: List[TranslationResult],
@@ -433,7 +1080,8 @@ def calculate_summary(results: List[TranslationResult],
     """Calculate summary statistics from results."""
     summary = {
         'total_runs': len(results),
-        'by_error_rate': {}
+        'by_error_rate': {},
+        'by_hop': summarize_hops(results)
     }
 
     for rate in error_rates:
@@ -446,7 +1094,9 @@ def calculate_summary(results: List[TranslationResult],
                 'avg_distance': sum(distances) / len(distances),
                 'avg_similarity': sum(similarities) / len(similarities),
                 'min_distance': min(distances),
-                'max_distance': max(distances)
+                'max_distance': max(distances),
+                # Batched shares are identical at every rate, so only measured cells compare
+                'hops': summarize_hops(rate_results, include_amortized=False)
             }
 
     return summary
@@ -621,6 +1271,15 @@ def print_deliverables(experiment: ExperimentResult):
     for rate, stats in experiment.summary['by_error_rate'].items():
         print(f"   {rate:<15} {stats['avg_distance']:<15.4f} {stats['avg_similarity']:<15.4f}")
 
+    if experiment.summary.get('by_hop'):
+        print(f"\n   {'Hop':<8} {'Avg (s)':>8} {'Max (s)':>8} {'In tok':>9} {'Out tok':>9} {'Billed in':>11}")
+        print(f"   {'-'*56}")
+        for agent_id, hop in experiment.summary['by_hop'].items():
+            print(f"   {agent_id:<8} {hop['avg_seconds']:>8.3f} {hop['max_seconds']:>8.3f} "
+                  f"{hop['input_tokens']:>9.0f} {hop['output_tokens']:>9.0f} {hop['billed_input_tokens']:>11.0f}")
+        if any(hop['amortized'] for hop in experiment.summary['by_hop'].values()):
+            print("   (batched: each cell holds an equal share of the grid's hop time and tokens)")
+
     # 4. Graph info
     print("\n\n4. GRAPH:")
     print("-" * 40)
@@ -651,9 +1310,45 @@ def main():
                        help='Output directory for results')
     parser.add_argument('--text', type=str, default=None,
                        help='Custom text to test (instead of default sentences)')
+    parser.add_argument('--batched', action='store_true',
+                       help='Run each hop over the whole error-rate grid at once')
+    parser.add_argument('--backend', type=str, choices=['transformers', 'ctranslate2'],
+                       default='transformers',
+                       help='Inference runtime for --local (default: transformers)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the persistent translation cache and embedding store')
+    parser.add_argument('--max-connections', type=int, default=None,
+                       help='Most open connections to the Claude API (default: 16)')
+    parser.add_argument('--batch-api', action='store_true',
+                       help='Submit each hop for the whole grid as one Claude message batch')
+    parser.add_argument('--batch-poll-interval', type=float, default=30.0,
+                       help='Seconds between message batch status checks (default: 30)')
+    parser.add_argument('--rpm', type=float, default=None,
+                       help='Claude requests-per-minute budget to pace to (default: unlimited)')
+    parser.add_argument('--tpm', type=float, default=None,
+                       help='Claude input tokens-per-minute budget to pace to (default: unlimited)')
+    parser.add_argument('--max-retries', type=int, default=6,
+                       help='Retries of a rate-limited or overloaded Claude request (default: 6)')
+    parser.add_argument('--pack-size', type=int, default=1,
+                       help=f'Sentences per Claude request, as numbered segments, '
+                            f'at most {MAX_PACK_SIZE} (default: 1)')
+    parser.add_argument('--hedge-deadline', type=float, default=None, metavar='SECONDS',
+                       help='Start the local model on a Claude hop still running after SECONDS; '
+                            'the first result wins')
 
     args = parser.parse_args()
 
+    if args.batch_api and (args.mock or args.local):
+        parser.error("--batch-api uses the Claude API; it cannot be combined with --mock or --local")
+    if not 1 <= args.pack_size <= MAX_PACK_SIZE:
+        parser.error(f"--pack-size must be between 1 and {MAX_PACK_SIZE}")
+    if args.pack_size > 1 and (args.mock or args.local):
+        parser.error("--pack-size packs Claude requests; it cannot be combined with --mock or --local")
+    if args.hedge_deadline is not None and (args.mock or args.local):
+        parser.error("--hedge-deadline hedges Claude hops; it cannot be combined with --mock or --local")
+    if args.hedge_deadline is not None and (args.batched or args.batch_api or args.pack_size > 1):
+        parser.error("--hedge-deadline cannot be combined with --batched, --batch-api or --pack-size")
+
     # Show sentences only
     if args.sentences_only:
         print("\n" + "=" * 70)
@@ -671,6 +1366,23 @@ def main():
         sentences = validate_sentences([args.text], strict=False)
         print(f"\nUsing custom text ({len(args.text.split())} words): {args.text[:80]}{'...' if len(args.text) > 80 else ''}")
 
+    cache = None
+    embedding_store = None
+    if not args.no_cache:
+        from translation_cache import TranslationCache
+        from embedding_store import EmbeddingStore
+        cache = TranslationCache()
+        embedding_store = EmbeddingStore()
+
+    if args.max_connections and not args.mock and not args.local:
+        from claude_client import configure
+        configure(max_connections=args.max_connections)
+
+    if not args.mock and not args.local:
+        from rate_limiter import configure_scheduler, DEFAULT_RPM, DEFAULT_TPM
+        configure_scheduler(rpm=args.rpm or DEFAULT_RPM, tpm=args.tpm or DEFAULT_TPM,
+                            max_retries=args.max_retries)
+
     # Run full experiment
     print("\nStarting experiment...")
     experiment = run_experiment(
@@ -678,7 +1390,15 @@ def main():
         use_mock=args.mock,
         use_local=args.local,
         api_key=args.api_key,
-        verbose=True
+        verbose=True,
+        batched=args.batched,
+        local_backend=args.backend,
+        cache=cache,
+        batch_api=args.batch_api,
+        batch_poll_interval=args.batch_poll_interval,
+        pack_size=args.pack_size,
+        hedge_deadline=args.hedge_deadline,
+        embedding_store=embedding_store
     )
 
     # Print deliverables
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Segment Packing - Several sentences per Claude request
+
+A sweep sends one sentence per request, so 50 sentences x 7 error rates
+x 3 hops is over a thousand round trips. Packing sends N numbered segments
+in one request under a strict delimiter protocol:
+
+    <<<1>>>
+    first sentence
+    <<<2>>>
+    second sentence
+
+and the reply must repeat every marker, each followed by that segment's
+translation. unpack_segments() accepts only a reply with exactly one
+non-empty block per marker. If a segment is missing, duplicated or empty,
+that segment alone is re-sent as a normal single-sentence request. The same
+happens to the segment before a missing one, since a dropped marker usually
+means two translations were merged. The pack size trades request count
+against per-request latency (and the damage of a bad reply).
+
+The agent system prompt is unchanged, so packed requests still hit the
+prompt cache; only the user message carries the protocol.
+
+Usage:
+    from segment_packing import translate_packed, PackStats
+
+    stats = PackStats()
+    outputs = translate_packed(texts, build_pack_request, build_request, send, pack_size=8, stats=stats)
+"""
+
+import re
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass
+
+
+# A marker line: <<<n>>> alone on its line
+_MARKER = re.compile(r'^[ \t]*<<<(\d+)>>>[ \t]*$', re.MULTILINE)
+
+
+def marker(number: int) -> str:
+    return f"<<<{number}>>>"
+
+
+def pack_message(texts: List[str], source_lang: str, target_lang: str) -> str:
+    """
+    User message asking for every numbered segment to be translated.
+
+    Args:
+        texts: Segments, numbered from 1 in order
+        source_lang: Source language
+        target_lang: Target language
+
+    Returns:
+        Instructions, a blank line, then the marked segments
+    """
+    segments = "\n".join(f"{marker(i)}\n{' '.join(text.split())}" for i, text in enumerate(texts, 1))
+    return (f"Translate each of the {len(texts)} numbered {source_lang} segments below to {target_lang}. "
+            f"Reply with each marker ({marker(1)} to {marker(len(texts))}) on its own line, exactly as "
+            f"given and in the same order, followed by the translation of that segment only. Translate "
+            f"every segment separately: never merge, split, skip or reorder segments, and add nothing "
+            f"else.\n\n{segments}")
+
+
+def unpack_segments(response: str, count: int) -> List[Optional[str]]:
+    """
+    Split a packed reply back into segments.
+
+    Args:
+        response: Model reply
+        count: Segments that were sent
+
+    Returns:
+        count entries: the translation of each segment, or None where its
+        marker is missing, repeated, out of order or followed by nothing
+    """
+    matches = list(_MARKER.finditer(response))
+    blocks: Dict[int, List[str]] = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        blocks.setdefault(int(match.group(1)), []).append(response[match.end():end].strip())
+
+    numbers = [int(match.group(1)) for match in matches]
+    in_order = [n for n in numbers if 1 <= n <= count] == sorted(n for n in numbers if 1 <= n <= count)
+
+    results: List[Optional[str]] = []
+    for number in range(1, count + 1):
+        found = blocks.get(number, [])
+        results.append(found[0] if len(found) == 1 and found[0] and in_order else None)
+    return results
+
+
+@dataclass
+class PackStats:
+    """Requests and retries of packed translation."""
+    segments: int = 0
+    requests: int = 0              # Packed requests sent
+    retried: int = 0               # Segments re-sent alone
+
+    @property
+    def requests_saved(self) -> int:
+        """Round trips avoided versus one request per segment."""
+        return self.segments - self.requests - self.retried
+
+
+def translate_packed(texts: List[str],
+                     build_pack_request: Callable[[List[str]], Dict],
+                     build_request: Callable[[str], Dict],
+                     send: Callable[[List[Dict]], List[str]],
+                     pack_size: int = 8,
+                     stats: Optional[PackStats] = None) -> List[str]:
+    """
+    Translate texts pack_size segments per request.
+
+    Args:
+        texts: Texts to translate
+        build_pack_request: Request for a list of segments
+        build_request: Request for one text (used for retries)
+        send: Sends requests and returns each reply's text, in order
+        pack_size: Segments per request
+        stats: Optional PackStats to update
+
+    Returns:
+        Translations in input order
+    """
+    if pack_size < 1:
+        raise ValueError("pack_size must be at least 1")
+    if not texts:
+        return []
+
+    packs = [list(texts[start:start + pack_size]) for start in range(0, len(texts), pack_size)]
+    replies = send([build_pack_request(pack) for pack in packs])
+
+    outputs: List[Optional[str]] = []
+    retry = set()
+    for pack, reply in zip(packs, replies):
+        unpacked = unpack_segments(reply, len(pack))
+        for i, segment in enumerate(unpacked):
+            if segment is None:
+                retry.add(len(outputs) + i)
+                # The previous segment probably swallowed this one
+                previous = next((j for j in range(i - 1, -1, -1) if unpacked[j] is not None), None)
+                if previous is not None:
+                    retry.add(len(outputs) + previous)
+        outputs.extend(unpacked)
+
+    retry = sorted(retry)
+    if retry:
+        for i, translation in zip(retry, send([build_request(texts[i]) for i in retry])):
+            outputs[i] = translation
+
+    if stats is not None:
+        stats.segments += len(texts)
+        stats.requests += len(packs)
+        stats.retried += len(retry)
+
+    return outputs
+
+
+def print_pack_report(stats: PackStats, pack_size: int):
+    """Print request savings of packing."""
+    print(f"\nSegment packing (pack size {pack_size}): {stats.segments} segments in "
+          f"{stats.requests} packed requests + {stats.retried} single retries "
+          f"({stats.requests_saved} round trips saved)")
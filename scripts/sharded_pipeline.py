@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Sharded Pipeline - One worker process per agent, pinned to its own cores
+
+Three MarianMT models in one Python process share one GIL and one torch
+thread pool. ShardedPipeline instead starts a worker process per agent (and
+optionally several replicas per agent), gives each worker a disjoint set of
+CPU cores, and moves batches between workers through multiprocessing queues:
+
+    main -> [q] -> en-fr workers -> [q] -> fr-he workers -> [q] -> he-en workers -> [q] -> main
+
+Replicas of the same agent pull from a shared queue, so a slow hop can be
+given more workers. Results are tagged with their input index and put back
+in order by the main process. Batches are a few sentences of text, so
+pickling them through the queues costs little next to generation.
+
+Usage:
+    python sharded_pipeline.py --input-file sentences.txt --replicas 2
+    python sharded_pipeline.py --benchmark --replicas 1 2 4   # scaling report
+"""
+
+import os
+import sys
+import time
+import queue
+import argparse
+import multiprocessing
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+STAGES = ("en-fr", "fr-he", "he-en")
+
+
+@dataclass
+class WorkerInfo:
+    """A started stage worker."""
+    agent_id: str
+    replica: int
+    pid: int
+    cores: List[int]
+    load_seconds: float
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def assign_cores(cores: Sequence[int], workers: int) -> List[List[int]]:
+    """
+    Split cores into contiguous, disjoint sets, one per worker.
+
+    With fewer cores than workers, cores are shared round-robin.
+
+    Args:
+        cores: CPU ids to hand out
+        workers: Number of workers
+
+    Returns:
+        One list of CPU ids per worker
+    """
+    cores = list(cores)
+    if len(cores) < workers:
+        return [[cores[i % len(cores)]] for i in range(workers)]
+
+    base, extra = divmod(len(cores), workers)
+    sets, start = [], 0
+    for i in range(workers):
+        size = base + (1 if i < extra else 0)
+        sets.append(cores[start:start + size])
+        start += size
+    return sets
+
+
+def default_pipeline_factory(num_threads: int, backend: str = "transformers",
+                             quantize: Optional[str] = None):
+    """Build the LocalTranslationPipeline used inside a worker."""
+    from local_translation_agents import LocalTranslationPipeline, InferenceConfig
+
+    return LocalTranslationPipeline(verbose=False, backend=backend, quantize=quantize,
+                                    inference=InferenceConfig(num_threads=num_threads,
+                                                              num_interop_threads=1))
+
+
+def _stage_worker(agent_id: str, replica: int, cores: List[int],
+                  pipeline_factory: Callable, factory_kwargs: Dict,
+                  in_q, out_q, control_q):
+    """
+    Worker process body: pin to cores, load one agent, translate batches.
+
+    Messages on in_q/out_q are (batch_id, [(index, texts_so_far), ...]);
+    None on in_q stops the worker. Readiness and errors go to control_q.
+    """
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+
+        start = time.perf_counter()
+        pipeline = pipeline_factory(num_threads=len(cores), **factory_kwargs)
+        pipeline.preload(agents=[agent_id], parallel=False, warmup=True)
+        control_q.put(("ready", WorkerInfo(agent_id, replica, os.getpid(), cores,
+                                           time.perf_counter() - start)))
+
+        while True:
+            message = in_q.get()
+            if message is None:
+                return
+            batch_id, items = message
+            outputs = pipeline.translate_batch([texts[-1] for _, texts in items], agent_id)
+            out_q.put((batch_id, [(index, texts + (output,))
+                                  for (index, texts), output in zip(items, outputs)]))
+    except Exception as e:
+        control_q.put(("error", f"{agent_id}#{replica}: {type(e).__name__}: {e}"))
+
+
+class ShardedPipeline:
+    """Multi-process EN -> FR -> HE -> EN pipeline with per-stage core sets."""
+
+    # Seconds to wait for workers to load their models
+    START_TIMEOUT = 600.0
+    # Seconds between checks for results, worker errors and dead workers
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, replicas: int = 1, cores: Optional[Sequence[int]] = None,
+                 batch_size: int = 8, backend: str = "transformers",
+                 quantize: Optional[str] = None,
+                 pipeline_factory: Callable = default_pipeline_factory,
+                 start_method: str = "spawn"):
+        """
+        Initialize the sharded pipeline (call start() to launch workers).
+
+        Args:
+            replicas: Worker processes per agent (int, or dict agent_id -> int)
+            cores: CPU ids to spread the workers over (default: all available)
+            batch_size: Sentences per batch sent between workers
+            backend: Inference runtime for every worker
+            quantize: Weight quantization for every worker
+            pipeline_factory: Picklable callable(num_threads, **kwargs) returning
+                              a LocalTranslationPipeline inside each worker
+            start_method: multiprocessing start method ("spawn" is safe with torch)
+        """
+        if isinstance(replicas, int):
+            replicas = {agent_id: replicas for agent_id in STAGES}
+        if any(replicas.get(agent_id, 0) < 1 for agent_id in STAGES):
+            raise ValueError("Every stage needs at least one replica")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.replicas = {agent_id: replicas[agent_id] for agent_id in STAGES}
+        self.cores = list(cores) if cores is not None else available_cores()
+        self.batch_size = batch_size
+        self.pipeline_factory = pipeline_factory
+        self.factory_kwargs = {"backend": backend, "quantize": quantize} \
+            if pipeline_factory is default_pipeline_factory else {}
+        self._context = multiprocessing.get_context(start_method)
+        self._processes = []
+        self._queues = []
+        self._control_q = None
+        self.workers: List[WorkerInfo] = []
+
+    def start(self) -> List[WorkerInfo]:
+        """
+        Launch the workers and wait until every model is loaded.
+
+        Returns:
+            WorkerInfo for each worker (agent, pid, pinned cores, load time)
+        """
+        if self._processes:
+            return self.workers
+
+        total = sum(self.replicas.values())
+        core_sets = iter(assign_cores(self.cores, total))
+        self._queues = [self._context.Queue() for _ in range(len(STAGES) + 1)]
+        self._control_q = self._context.Queue()
+
+        for stage, agent_id in enumerate(STAGES):
+            for replica in range(self.replicas[agent_id]):
+                process = self._context.Process(
+                    target=_stage_worker,
+                    args=(agent_id, replica, next(core_sets), self.pipeline_factory, self.factory_kwargs,
+                          self._queues[stage], self._queues[stage + 1], self._control_q),
+                    name=f"{agent_id}#{replica}",
+                    daemon=True
+                )
+                process.start()
+                self._processes.append((agent_id, process))
+
+        self.workers = []
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while len(self.workers) < total:
+            kind, payload = self._control(deadline)
+            if kind == "error":
+                self.close()
+                raise RuntimeError(f"Worker failed to start: {payload}")
+            self.workers.append(payload)
+
+        return self.workers
+
+    def _control(self, deadline: float):
+        """Next control message, raising if a worker dies or none arrives before the deadline."""
+        while True:
+            try:
+                return self._control_q.get(timeout=min(self.POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            dead = self._dead_worker()
+            if dead is not None:
+                self.close()
+                raise RuntimeError(f"Worker failed to start: {dead}")
+            if time.monotonic() >= deadline:
+                self.close()
+                raise TimeoutError("Timed out waiting for sharded pipeline workers")
+
+    def _dead_worker(self) -> Optional[str]:
+        """Name and exit code of a worker that has exited, if any (workers only exit on close())."""
+        for _, process in self._processes:
+            if process.exitcode is not None:
+                return f"{process.name} exited with code {process.exitcode}"
+        return None
+
+    def run(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[Tuple[str, str, str]]:
+        """
+        Translate texts through the worker processes.
+
+        Args:
+            texts: English texts
+            timeout: Seconds to wait for all results (default: no limit)
+
+        Returns:
+            (french, hebrew, final_english) tuples in input order
+        """
+        self.start()
+
+        batches = [[(i, (texts[i],)) for i in range(start, min(start + self.batch_size, len(texts)))]
+                   for start in range(0, len(texts), self.batch_size)]
+        for batch_id, items in enumerate(batches):
+            self._queues[0].put((batch_id, items))
+
+        results: List[Optional[Tuple[str, str, str]]] = [None] * len(texts)
+        remaining = len(batches)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while remaining:
+            # Poll both the output queue and the control queue for worker errors
+            try:
+                _, items = self._queues[-1].get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                try:
+                    kind, payload = self._control_q.get_nowait()
+                except queue.Empty:
+                    # A killed worker (e.g. out of memory) never posts an error
+                    dead = self._dead_worker()
+                    if dead is not None:
+                        raise RuntimeError(f"Worker failed: {dead}")
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise TimeoutError("Timed out waiting for sharded pipeline results")
+                    continue
+                if kind == "error":
+                    raise RuntimeError(f"Worker failed: {payload}")
+                continue
+            for index, (_, french, hebrew, final_english) in items:
+                results[index] = (french, hebrew, final_english)
+            remaining -= 1
+
+        return results
+
+    def close(self):
+        """Stop all workers."""
+        for stage, agent_id in enumerate(STAGES):
+            for _ in range(self.replicas[agent_id]):
+                if self._queues:
+                    self._queues[stage].put(None)
+        for _, process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def benchmark_scaling(sentences: List[str], replica_counts: Sequence[int] = (1, 2, 4),
+                      batch_size: int = 8, backend: str = "transformers",
+                      verbose: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Compare single-process throughput with sharded pipelines of growing size.
+
+    The single-process baseline runs run_pipeline_batch() with torch using
+    every available core, over the same batch_size chunks the sharded
+    workers receive, so dedup and length bucketing see the same batches in
+    every configuration. Model loading is excluded from all timings.
+
+    Args:
+        sentences: English sentences to translate
+        replica_counts: Replicas per agent to try
+        batch_size: Sentences per batch
+        backend: Inference runtime
+        verbose: Print the scaling table
+
+    Returns:
+        Dictionary mapping configuration name to seconds, sentences_per_second
+        and speedup over the single-process run
+    """
+    from local_translation_agents import LocalTranslationPipeline
+
+    report = {}
+
+    pipeline = LocalTranslationPipeline(verbose=False, backend=backend)
+    pipeline.preload()
+    start = time.perf_counter()
+    for offset in range(0, len(sentences), batch_size):
+        pipeline.run_pipeline_batch(sentences[offset:offset + batch_size])
+    seconds = time.perf_counter() - start
+    report["single-process"] = {"workers": 1, "seconds": seconds}
+    del pipeline
+
+    for replicas in replica_counts:
+        with ShardedPipeline(replicas=replicas, batch_size=batch_size, backend=backend) as sharded:
+            start = time.perf_counter()
+            sharded.run(sentences)
+            seconds = time.perf_counter() - start
+        report[f"sharded x{replicas}"] = {"workers": 3 * replicas, "seconds": seconds}
+
+    baseline = report["single-process"]["seconds"]
+    for stats in report.values():
+        stats["sentences_per_second"] = len(sentences) / stats["seconds"] if stats["seconds"] else 0.0
+        stats["speedup"] = baseline / stats["seconds"] if stats["seconds"] else 0.0
+
+    if verbose:
+        print("\n" + "=" * 60)
+        print(f"SHARDED PIPELINE SCALING ({len(sentences)} sentences, {len(available_cores())} cores)")
+        print("=" * 60)
+        print(f"  {'Configuration':<16} {'Workers':>8} {'Seconds':>9} {'Sent/s':>9} {'Speedup':>9}")
+        for name, stats in report.items():
+            print(f"  {name:<16} {stats['workers']:>8} {stats['seconds']:>9.2f} "
+                  f"{stats['sentences_per_second']:>9.2f} {stats['speedup']:>8.2f}x")
+        print("=" * 60)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Multi-process translation pipeline with per-stage core pinning"
+    )
+    parser.add_argument('--input-file', type=str,
+                       help='File with one English sentence per line')
+    parser.add_argument('--replicas', type=int, nargs='+', default=[1],
+                       help='Worker processes per agent (several values with --benchmark)')
+    parser.add_argument('--batch-size', type=int, default=8,
+                       help='Sentences per batch (default: 8)')
+    parser.add_argument('--backend', type=str, choices=['transformers', 'ctranslate2'],
+                       default='transformers',
+                       help='Inference runtime (default: transformers)')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Compare single-process and sharded throughput')
+    parser.add_argument('--sentences', type=int, default=256,
+                       help='Sentences to generate for --benchmark without --input-file')
+
+    args = parser.parse_args()
+
+    if args.input_file:
+        with open(args.input_file, encoding='utf-8') as f:
+            sentences = [line.strip() for line in f if line.strip()]
+    elif args.benchmark:
+        from run_experiment import TEST_SENTENCES
+        from spelling_error_injector import SpellingErrorInjector
+        injector = SpellingErrorInjector(seed=42)
+        rates = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
+        sentences = [injector.inject_errors(TEST_SENTENCES[i % len(TEST_SENTENCES)],
+                                            rates[i % len(rates)]).modified_text
+                     for i in range(args.sentences)]
+    else:
+        parser.error("--input-file is required unless --benchmark is given")
+
+    if args.benchmark:
+        benchmark_scaling(sentences, replica_counts=args.replicas,
+                          batch_size=args.batch_size, backend=args.backend)
+        return
+
+    with ShardedPipeline(replicas=args.replicas[0], batch_size=args.batch_size,
+                         backend=args.backend) as sharded:
+        for worker in sharded.workers:
+            print(f"  {worker.agent_id}#{worker.replica}: pid {worker.pid}, cores {worker.cores}, "
+                  f"loaded in {worker.load_seconds:.1f}s")
+        for _, _, final_english in sharded.run(sentences):
+            print(final_english)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Shared-Weight Worker Pool - Many translation workers, one copy of the models
+
+Fanning an experiment out over N processes that each call
+LocalTranslationPipeline() loads N copies of the three opus-mt models
+(~900MB each time). SharedWeightPool loads and warms the agents once in the
+parent, moves their weights into shared memory (torch share_memory()), and
+then forks the workers:
+
+    parent: load + warm up en-fr, fr-he, he-en -> share_memory()
+        fork -> worker 0 \\
+        fork -> worker 1  } every worker maps the same weight pages
+        fork -> worker N /
+
+Weight pages are never written during inference, so they stay shared and a
+worker's unique memory is only its activations and Python heap. The memory
+report shows RSS, PSS and unique set size (USS) per worker from
+/proc/<pid>/smaps_rollup.
+
+Requires the "fork" start method (Linux). Only the transformers backend is
+supported: a ctranslate2 Translator owns native threads that do not survive
+fork. For the same reason the parent loads and warms up the agents with one
+torch thread: an OpenMP (libgomp) thread team started before fork leaves the
+children hanging in their first parallel region. Each worker then sets its
+own thread count.
+
+Usage:
+    python shared_worker_pool.py --input-file sentences.txt --workers 4
+"""
+
+import os
+import sys
+import time
+import queue
+import argparse
+import multiprocessing
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+# Pipeline inherited by forked workers (set in the parent just before forking)
+_SHARED_PIPELINE = None
+
+
+def process_memory_mb(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Memory of one process, split into shared and unique pages.
+
+    Args:
+        pid: Process id (default: this process)
+
+    Returns:
+        Dictionary with rss, pss, uss (private pages) and shared, in MB;
+        all zero where /proc/<pid>/smaps_rollup is unavailable
+    """
+    fields = {"Rss": 0, "Pss": 0, "Private_Clean": 0, "Private_Dirty": 0,
+              "Shared_Clean": 0, "Shared_Dirty": 0}
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in fields:
+                    fields[name] = int(rest.split()[0])
+    except OSError:
+        pass
+
+    return {
+        "rss": fields["Rss"] / 1024,
+        "pss": fields["Pss"] / 1024,
+        "uss": (fields["Private_Clean"] + fields["Private_Dirty"]) / 1024,
+        "shared": (fields["Shared_Clean"] + fields["Shared_Dirty"]) / 1024,
+    }
+
+
+def share_weights(pipeline) -> float:
+    """
+    Move every loaded agent's weights into shared memory.
+
+    Args:
+        pipeline: LocalTranslationPipeline with its agents loaded
+
+    Returns:
+        MB of model tensors now shared
+    """
+    from local_translation_agents import estimate_resident_mb
+
+    shared_mb = 0.0
+    for agent in pipeline.agents.values():
+        if hasattr(agent.model, "share_memory"):
+            agent.model.share_memory()
+        shared_mb += estimate_resident_mb(agent.model) or 0.0
+    return shared_mb
+
+
+def _pool_worker(worker_id: int, num_threads: int, in_q, out_q):
+    """
+    Worker process body: translate batches with the inherited pipeline.
+
+    Messages on in_q are (batch_id, texts); None stops the worker.
+    Everything on out_q is (kind, worker_id, payload): ("ready", pid),
+    ("start", batch_id) when a batch is taken, ("result", (batch_id,
+    outputs)) and ("error", message).
+    """
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        pipeline = _SHARED_PIPELINE
+        out_q.put(("ready", worker_id, os.getpid()))
+
+        while True:
+            message = in_q.get()
+            if message is None:
+                return
+            batch_id, texts = message
+            out_q.put(("start", worker_id, batch_id))
+            out_q.put(("result", worker_id, (batch_id, pipeline.run_pipeline_batch(texts))))
+    except Exception as e:
+        out_q.put(("error", worker_id, f"{type(e).__name__}: {e}"))
+
+
+class SharedWeightPool:
+    """Forked translation workers sharing one copy of the model weights."""
+
+    # Seconds to wait for workers to report ready
+    START_TIMEOUT = 60.0
+    # Seconds between checks for results and dead workers
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, workers: int = 2, batch_size: int = 8, threads_per_worker: int = 1,
+                 pipeline=None, quantize: Optional[str] = None):
+        """
+        Initialize the pool (call start() to fork the workers).
+
+        Args:
+            workers: Worker processes
+            batch_size: Sentences per task sent to a worker
+            threads_per_worker: torch intra-op threads in each worker
+            pipeline: LocalTranslationPipeline to share (default: a new
+                      transformers pipeline)
+            quantize: Weight quantization for the default pipeline
+        """
+        if workers < 1 or batch_size < 1 or threads_per_worker < 1:
+            raise ValueError("workers, batch_size and threads_per_worker must be at least 1")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("SharedWeightPool needs the 'fork' start method (Linux)")
+
+        if pipeline is None:
+            from local_translation_agents import LocalTranslationPipeline
+            pipeline = LocalTranslationPipeline(verbose=False, quantize=quantize)
+        if pipeline.backend != "transformers":
+            raise ValueError("SharedWeightPool only supports the transformers backend")
+
+        self.pipeline = pipeline
+        self.workers = workers
+        self.batch_size = batch_size
+        self.threads_per_worker = threads_per_worker
+        self.shared_mb = 0.0
+        self.worker_pids: List[int] = []
+        self._context = multiprocessing.get_context("fork")
+        self._processes = []
+        self._in_q = None
+        self._out_q = None
+        # worker_id -> batch it is translating
+        self._owned: Dict[int, int] = {}
+
+    def start(self) -> List[int]:
+        """
+        Load the agents once, share their weights and fork the workers.
+
+        Returns:
+            Worker process ids
+        """
+        global _SHARED_PIPELINE
+
+        if self._processes:
+            return self.worker_pids
+
+        import torch
+
+        # No OpenMP thread team may exist in the parent when it forks
+        threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+        try:
+            self.pipeline.preload(warmup=True)
+        except BaseException:
+            torch.set_num_threads(threads)
+            raise
+        self.shared_mb = share_weights(self.pipeline)
+
+        self._in_q = self._context.Queue()
+        self._out_q = self._context.Queue()
+        _SHARED_PIPELINE = self.pipeline
+        try:
+            for worker_id in range(self.workers):
+                process = self._context.Process(
+                    target=_pool_worker,
+                    args=(worker_id, self.threads_per_worker, self._in_q, self._out_q),
+                    name=f"shared-worker-{worker_id}",
+                    daemon=True
+                )
+                process.start()
+                self._processes.append(process)
+        finally:
+            _SHARED_PIPELINE = None
+            torch.set_num_threads(threads)
+
+        self.worker_pids = []
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while len(self.worker_pids) < self.workers:
+            kind, _, payload = self._next(deadline)
+            if kind == "error":
+                self.close()
+                raise RuntimeError(f"Worker failed to start: {payload}")
+            self.worker_pids.append(payload)
+
+        return self.worker_pids
+
+    def _next(self, deadline: Optional[float]):
+        """
+        Next worker message other than "start".
+
+        Raises (after stopping the pool) if a worker dies or no message
+        arrives before the deadline.
+        """
+        while True:
+            try:
+                kind, worker_id, payload = self._out_q.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                dead = self._dead_worker()
+                if dead is not None:
+                    self.close()
+                    raise RuntimeError(dead)
+                if deadline is not None and time.monotonic() > deadline:
+                    self.close()
+                    raise TimeoutError("Timed out waiting for shared-weight workers")
+                continue
+            if kind == "start":
+                self._owned[worker_id] = payload
+                continue
+            if kind == "result":
+                self._owned.pop(worker_id, None)
+            return kind, worker_id, payload
+
+    def _dead_worker(self) -> Optional[str]:
+        """Description of a worker that has exited, if any (workers only exit on close())."""
+        for worker_id, process in enumerate(self._processes):
+            if process.exitcode is not None:
+                batch = self._owned.get(worker_id)
+                return (f"Shared-weight worker {worker_id} exited with code {process.exitcode}"
+                        + (f" while translating batch {batch}" if batch is not None else ""))
+        return None
+
+    def run(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[Tuple[str, str, str]]:
+        """
+        Translate texts across the workers.
+
+        Args:
+            texts: English texts
+            timeout: Seconds to wait for all results (default: no limit)
+
+        Returns:
+            (french, hebrew, final_english) tuples in input order
+        """
+        self.start()
+
+        starts = range(0, len(texts), self.batch_size)
+        for batch_id, start in enumerate(starts):
+            self._in_q.put((batch_id, list(texts[start:start + self.batch_size])))
+
+        results: List[Tuple[str, str, str]] = [None] * len(texts)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for _ in starts:
+            kind, worker_id, payload = self._next(deadline)
+            if kind == "error":
+                self.close()
+                raise RuntimeError(f"Worker {worker_id} failed: {payload}")
+            batch_id, outputs = payload
+            start = batch_id * self.batch_size
+            results[start:start + len(outputs)] = outputs
+
+        return results
+
+    def memory_report(self) -> Dict:
+        """
+        Memory of the parent and each worker.
+
+        Returns:
+            Dictionary with shared_model_mb, parent and workers (pid -> rss,
+            pss, uss, shared) and naive_mb, the model memory N independently
+            loaded workers would need
+        """
+        return {
+            "shared_model_mb": self.shared_mb,
+            "parent": process_memory_mb(os.getpid()),
+            "workers": {pid: process_memory_mb(pid) for pid in self.worker_pids},
+            "naive_mb": self.shared_mb * self.workers,
+        }
+
+    def print_memory_report(self):
+        """Print per-worker RSS, PSS and unique memory."""
+        report = self.memory_report()
+        print("\n" + "=" * 60)
+        print(f"SHARED-WEIGHT POOL MEMORY ({self.workers} workers, "
+              f"{report['shared_model_mb']:.0f} MB of shared weights)")
+        print("=" * 60)
+        print(f"  {'Process':<14} {'RSS (MB)':>10} {'PSS (MB)':>10} {'Unique (MB)':>12}")
+        rows = [("parent", report["parent"])]
+        rows += [(f"worker {pid}", memory) for pid, memory in report["workers"].items()]
+        for name, memory in rows:
+            print(f"  {name:<14} {memory['rss']:>10.1f} {memory['pss']:>10.1f} {memory['uss']:>12.1f}")
+        unique = sum(memory["uss"] for memory in report["workers"].values())
+        print(f"\n  Worker unique total: {unique:.1f} MB "
+              f"(separate model copies would add ~{report['naive_mb']:.0f} MB)")
+        print("=" * 60)
+
+    def close(self):
+        """Stop all workers."""
+        for _ in self._processes:
+            self._in_q.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._owned = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    from local_translation_agents import LocalTranslationPipeline
+
+    parser = argparse.ArgumentParser(
+        description="Translate with forked workers that share one copy of the model weights"
+    )
+    parser.add_argument('--input-file', type=str, required=True,
+                       help='File with one English sentence per line')
+    parser.add_argument('--workers', type=int, default=2,
+                       help='Worker processes (default: 2)')
+    parser.add_argument('--batch-size', type=int, default=8,
+                       help='Sentences per task (default: 8)')
+    parser.add_argument('--threads-per-worker', type=int, default=1,
+                       help='torch intra-op threads per worker (default: 1)')
+    parser.add_argument('--quantize', type=str, choices=list(LocalTranslationPipeline.QUANTIZE_MODES),
+                       help='Dynamic quantization of Linear layers (default: fp32)')
+
+    args = parser.parse_args()
+
+    with open(args.input_file, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+
+    with SharedWeightPool(workers=args.workers, batch_size=args.batch_size,
+                          threads_per_worker=args.threads_per_worker, quantize=args.quantize) as pool:
+        start = time.perf_counter()
+        results = pool.run(sentences)
+        seconds = time.perf_counter() - start
+        for _, _, final_english in results:
+            print(final_english)
+        print(f"\n{len(sentences)} sentences in {seconds:.2f}s "
+              f"({len(sentences) / seconds if seconds else 0.0:.1f} sentences/s)")
+        pool.print_memory_report()
+
+
+if __name__ == "__main__":
+    main()
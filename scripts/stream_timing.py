@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Stream Timing - Latency of streamed translation hops
+
+Shared by the local (MarianMT) and Claude agents' --stream modes. For
+interactive use the number that matters is time-to-first-token: how long
+the user waits before the translation starts appearing.
+"""
+
+from typing import Callable, List, Tuple
+from dataclasses import dataclass
+
+
+@dataclass
+class StreamTiming:
+    """Latency of one streamed hop."""
+    agent_id: str
+    backend: str
+    time_to_first_token: float   # Seconds until the first text chunk
+    total_seconds: float         # Seconds until the hop finished
+    output_tokens: int = 0
+
+
+def print_chunk(chunk: str):
+    """Write a streamed chunk to stdout immediately."""
+    print(chunk, end="", flush=True)
+
+
+def stream_pipeline(translate_stream: Callable, text: str) -> Tuple[str, str, str]:
+    """
+    Run EN -> FR -> HE -> EN, printing each hop's text as it is produced.
+
+    Args:
+        translate_stream: An agent's translate_stream(text, agent_id, on_text)
+        text: English text to translate
+
+    Returns:
+        Tuple of (french, hebrew, final_english)
+    """
+    outputs = []
+    for agent_id, label in (("en-fr", "French"), ("fr-he", "Hebrew"), ("he-en", "English")):
+        print(f"{label}: ", end="", flush=True)
+        text = translate_stream(text, agent_id, on_text=print_chunk)
+        print()
+        outputs.append(text)
+    return tuple(outputs)
+
+
+def print_stream_timings(timings: List[StreamTiming]):
+    """Print per-hop time-to-first-token and total latency."""
+    print("\nStreaming latency per hop:")
+    print(f"  {'Agent':<8} {'Backend':<14} {'TTFT (s)':>9} {'Total (s)':>10} {'Tokens':>7}")
+    for timing in timings:
+        print(f"  {timing.agent_id:<8} {timing.backend:<14} {timing.time_to_first_token:>9.3f} "
+              f"{timing.total_seconds:>10.3f} {timing.output_tokens:>7}")
+    if timings:
+        print(f"  {'total':<8} {'':<14} {'':>9} "
+              f"{sum(t.total_seconds for t in timings):>10.3f} {sum(t.output_tokens for t in timings):>7}")
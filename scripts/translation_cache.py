@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Translation Cache - Persistent, content-addressed cache for translation hops
+
+Experiments re-translate the same strings again and again: 0%-error
+variants, repeated sentences, reruns of a sweep. This cache stores every
+hop's output in SQLite under a key derived from:
+
+    backend + model name + generation parameters + normalized source text
+
+so a repeat costs a lookup instead of API money or seconds of CPU. The
+cache is bounded by entry count and evicts least-recently-used entries.
+
+Within one batch, translate_unique() goes further: identical inputs are
+translated once and the result is fanned back out, whether or not a cache
+is in use.
+
+Usage (as module):
+    from translation_cache import TranslationCache
+
+    cache = TranslationCache()
+    french = cache.get_or_translate("mock", "mock", {}, text, lambda t: mock_translate(t, ...))
+    print(cache.stats())
+
+Usage (command line):
+    python translation_cache.py             # Show cache size
+    python translation_cache.py --clear     # Delete all entries
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass
+
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "ROUNDTRIP_TRANSLATION_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "round-trip-translator", "translations.sqlite")
+)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize text and collapse runs of whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+@dataclass
+class DedupStats:
+    """Inputs seen and translated by one hop of the batch path."""
+    inputs: int = 0
+    unique: int = 0
+
+    @property
+    def saved(self) -> int:
+        """Translations avoided by deduplication."""
+        return self.inputs - self.unique
+
+    @property
+    def saved_fraction(self) -> float:
+        return self.saved / self.inputs if self.inputs else 0.0
+
+    def record(self, inputs: int, unique: int):
+        self.inputs += inputs
+        self.unique += unique
+
+
+def translate_unique(texts: List[str], translate_many: Callable[[List[str]], List[str]],
+                     stats: Optional[DedupStats] = None) -> List[str]:
+    """
+    Translate each distinct text once and fan the results back out.
+
+    Args:
+        texts: Texts to translate (may repeat)
+        translate_many: Translates a list of distinct texts, in order
+        stats: Optional DedupStats updated with the input and unique counts
+
+    Returns:
+        One translation per input text, in input order
+    """
+    unique = list(dict.fromkeys(texts))
+    if stats is not None:
+        stats.record(len(texts), len(unique))
+    if len(unique) == len(texts):
+        return translate_many(list(texts))
+
+    translated = dict(zip(unique, translate_many(unique)))
+    return [translated[text] for text in texts]
+
+
+def print_dedup_report(stats: Dict[str, DedupStats]):
+    """Print per-hop deduplication savings."""
+    print("\nDeduplication per hop:")
+    print(f"  {'Hop':<8} {'Inputs':>7} {'Unique':>7} {'Saved':>7} {'Saved %':>8}")
+    for hop, hop_stats in stats.items():
+        print(f"  {hop:<8} {hop_stats.inputs:>7} {hop_stats.unique:>7} {hop_stats.saved:>7} "
+              f"{hop_stats.saved_fraction:>8.0%}")
+    inputs = sum(s.inputs for s in stats.values())
+    saved = sum(s.saved for s in stats.values())
+    print(f"  {'total':<8} {inputs:>7} {inputs - saved:>7} {saved:>7} "
+          f"{saved / inputs if inputs else 0.0:>8.0%}")
+
+
+class TranslationCache:
+    """SQLite-backed LRU cache of translations."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100_000):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file path (":memory:" for a private in-memory cache)
+            max_entries: Entries kept before least-recently-used ones are evicted
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " translation TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON translations(last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(backend: str, model: str, params: Dict, text: str) -> str:
+        """
+        Content address of one translation request.
+
+        Args:
+            backend: Translation backend ("mock", "claude", "transformers", ...)
+            model: Model name
+            params: Generation parameters that affect the output
+            text: Source text (normalized before hashing)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps([backend, model, params, normalize_text(text)],
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, backend: str, model: str, params: Dict, texts: List[str]) -> List[Optional[str]]:
+        """
+        Look up several texts at once.
+
+        Returns:
+            Cached translation per text, or None for a miss
+        """
+        keys = [self.make_key(backend, model, params, text) for text in texts]
+        with self._lock:
+            found = {}
+            for key in set(keys):
+                row = self._conn.execute("SELECT translation FROM translations WHERE key = ?",
+                                         (key,)).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE translations SET last_used = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, backend: str, model: str, params: Dict, texts: List[str], translations: List[str]):
+        """Store translations for several texts, evicting LRU entries if over budget."""
+        now = time.time()
+        rows = [(self.make_key(backend, model, params, text), translation, now)
+                for text, translation in zip(texts, translations)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, last_used) VALUES (?, ?, ?)", rows)
+            excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN "
+                    "(SELECT key FROM translations ORDER BY last_used LIMIT ?)", (excess,))
+                self.evictions += excess
+            self._conn.commit()
+
+    def get(self, backend: str, model: str, params: Dict, text: str) -> Optional[str]:
+        """Cached translation of text, or None."""
+        return self.get_many(backend, model, params, [text])[0]
+
+    def put(self, backend: str, model: str, params: Dict, text: str, translation: str):
+        """Store the translation of text."""
+        self.put_many(backend, model, params, [text], [translation])
+
+    def get_or_translate(self, backend: str, model: str, params: Dict, text: str,
+                         translate: Callable[[str], str]) -> str:
+        """
+        Return the cached translation, or translate and cache it.
+
+        Args:
+            backend: Translation backend
+            model: Model name
+            params: Generation parameters that affect the output
+            text: Source text
+            translate: Called with text on a miss
+
+        Returns:
+            Translated text
+        """
+        cached = self.get(backend, model, params, text)
+        if cached is not None:
+            return cached
+        translation = translate(text)
+        self.put(backend, model, params, text, translation)
+        return translation
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this session and the current cache size."""
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def print_stats(self):
+        """Print hit/miss counters."""
+        stats = self.stats()
+        print(f"\nTranslation cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']}/{stats['max_entries']} entries")
+
+    def clear(self):
+        """Delete every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the translation cache")
+    parser.add_argument('--path', type=str, default=DEFAULT_CACHE_PATH,
+                       help=f'Cache file (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--clear', action='store_true',
+                       help='Delete all cached translations')
+
+    args = parser.parse_args()
+
+    cache = TranslationCache(args.path)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.path}")
+    print(f"{len(cache)} cached translations in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Translation Daemon - Keep the local MarianMT agents warm between CLI calls
+
+Loading the three MarianMT models takes seconds to tens of seconds. This
+daemon loads them once and serves translate/pipeline requests over a UNIX
+domain socket, so local_translation_agents.py only pays for translation.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "ping"}                                   -> {"ok": true, "result": "pong"}
+    {"op": "translate", "agent": "en-fr", "text": ...} -> {"ok": true, "result": "..."}
+    {"op": "pipeline", "text": ...}                  -> {"ok": true, "result": [fr, he, en]}
+    {"op": "stats"}                                  -> {"ok": true, "result": {...}}
+    {"op": "config"}                                 -> {"ok": true, "result": {"backend": ..., ...}}
+Errors come back as {"ok": false, "error": "..."}.
+
+Usage:
+    python translation_daemon.py                      # Serve on the default socket
+    python translation_daemon.py --socket /tmp/rt.sock --backend ctranslate2
+    python local_translation_agents.py --text "..."   # Uses the daemon if running
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+import threading
+import socketserver
+from typing import Dict, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+DEFAULT_SOCKET_PATH = os.environ.get(
+    "ROUNDTRIP_DAEMON_SOCKET",
+    os.path.join(tempfile.gettempdir(), "round-trip-translator.sock")
+)
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon reports a failed request."""
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle newline-delimited JSON requests on one connection."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = {"ok": True, "result": self.server.daemon.dispatch(request)}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class TranslationDaemon:
+    """Serve a warm LocalTranslationPipeline over a UNIX domain socket."""
+
+    def __init__(self, pipeline, socket_path: str = DEFAULT_SOCKET_PATH, verbose: bool = True):
+        """
+        Initialize the daemon.
+
+        Args:
+            pipeline: LocalTranslationPipeline serving the requests
+            socket_path: Path of the UNIX domain socket to listen on
+            verbose: Log requests to stdout
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("UNIX domain sockets are not available on this platform")
+
+        self.pipeline = pipeline
+        self.socket_path = socket_path
+        self.verbose = verbose
+        # Model loading and generate() are not safe to interleave across threads
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _log(self, message: str):
+        """Print message if verbose mode is on."""
+        if self.verbose:
+            print(message)
+
+    def dispatch(self, request: Dict):
+        """
+        Execute one request against the pipeline.
+
+        Args:
+            request: Decoded JSON request with an "op" field
+
+        Returns:
+            JSON-serializable result
+        """
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "config":
+            return self.pipeline.engine_settings()
+
+        with self._lock:
+            if op == "translate":
+                self._log(f"translate [{request['agent']}] {request['text'][:60]}")
+                return self.pipeline.translate(request["text"], request["agent"])
+            if op == "pipeline":
+                self._log(f"pipeline {request['text'][:60]}")
+                return list(self.pipeline.run_pipeline(request["text"]))
+            if op == "stats":
+                return {
+                    "loaded_agents": sorted(self.pipeline.agents),
+                    "throughput": self.pipeline.throughput_report(),
+                    "memory": self.pipeline.models.stats(),
+                }
+
+        raise ValueError(f"Unknown op: {op}")
+
+    def start(self):
+        """Bind the socket; call serve_forever() afterwards to handle requests."""
+        if os.path.exists(self.socket_path):
+            if DaemonClient(self.socket_path).is_available():
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            # Stale socket left by a daemon that did not shut down cleanly
+            os.remove(self.socket_path)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.daemon = self
+
+    def serve_forever(self):
+        """Handle requests until shutdown() is called."""
+        if self._server is None:
+            self.start()
+        self._log(f"Translation daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self):
+        """Stop serve_forever() (call from another thread)."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class DaemonClient:
+    """
+    Client for a running TranslationDaemon.
+
+    Offers the same translate()/run_pipeline() calls as
+    LocalTranslationPipeline, so callers can use either interchangeably.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 300.0):
+        """
+        Initialize the client.
+
+        Args:
+            socket_path: Path of the daemon's UNIX domain socket
+            timeout: Seconds to wait for a response (None waits forever)
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    # Seconds to wait for a ping before treating the daemon as absent
+    PING_TIMEOUT = 2.0
+
+    def _request(self, request: Dict, timeout: Optional[float] = None):
+        """Send one request and return its result, raising DaemonError on failure."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout if timeout is not None else self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+
+        if not line:
+            raise DaemonError("Daemon closed the connection without a response")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+    def is_available(self) -> bool:
+        """Return True if a daemon answers on the socket."""
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(self.socket_path):
+            return False
+        try:
+            return self._request({"op": "ping"}, timeout=self.PING_TIMEOUT) == "pong"
+        except (OSError, ValueError, DaemonError):
+            return False
+
+    def translate(self, text: str, agent_id: str) -> str:
+        """Translate text with one agent on the daemon."""
+        return self._request({"op": "translate", "agent": agent_id, "text": text})
+
+    def run_pipeline(self, text: str) -> Tuple[str, str, str]:
+        """Run EN -> FR -> HE -> EN on the daemon."""
+        french, hebrew, final_english = self._request({"op": "pipeline", "text": text})
+        return french, hebrew, final_english
+
+    def engine_settings(self) -> Dict:
+        """Backend, quantization, decoding and cache settings the daemon was started with."""
+        return self._request({"op": "config"})
+
+    def stats(self) -> Dict:
+        """Loaded agents and per-hop throughput of the daemon."""
+        return self._request({"op": "stats"})
+
+
+def main():
+    from local_translation_agents import LocalTranslationPipeline, InferenceConfig
+
+    parser = argparse.ArgumentParser(
+        description="Serve warm local translation agents over a UNIX domain socket"
+    )
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH,
+                       help=f'Socket path (default: {DEFAULT_SOCKET_PATH})')
+    parser.add_argument('--backend', type=str, choices=list(LocalTranslationPipeline.BACKENDS),
+                       default='transformers',
+                       help='Inference runtime (default: transformers)')
+    parser.add_argument('--quantize', type=str, choices=list(LocalTranslationPipeline.QUANTIZE_MODES),
+                       help='Dynamic quantization of Linear layers (default: fp32)')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='torch intra-op thread count')
+    parser.add_argument('--memory-budget', type=float, default=None,
+                       help='MB of model memory to keep loaded; least recently used agents '
+                            'are evicted past it (default: unlimited)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the persistent translation cache')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Do not log requests')
+
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        from translation_cache import TranslationCache
+        cache = TranslationCache()
+
+    pipeline = LocalTranslationPipeline(verbose=not args.quiet,
+                                        inference=InferenceConfig(num_threads=args.threads),
+                                        quantize=args.quantize, backend=args.backend, cache=cache,
+                                        memory_budget_mb=args.memory_budget)
+    for agent_id, timings in pipeline.preload().items():
+        print(f"  {agent_id}: loaded in {timings['load_seconds']:.1f}s, "
+              f"warmed up in {timings['warmup_seconds']:.1f}s")
+    pipeline.verbose = False
+
+    daemon = TranslationDaemon(pipeline, socket_path=args.socket, verbose=not args.quiet)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down translation daemon")
+
+
+if __name__ == "__main__":
+    main()
@@ -77,3 +77,420 @@ def sample_misspelled_sentence():
     """Provide a misspelled version of the sample sentence (~25% errors)."""
     return ("The magnificant goldon sunset paintd the entier western skye "
             "with beautful shades of oraneg, pink, and deap purpel colors.")
+
+
+# ============================================================================
+# Fake MarianMT models (no downloads needed)
+# ============================================================================
+
+class FakeMarianTokenizer:
+    """
+    Whitespace tokenizer with the subset of the MarianTokenizer API we use.
+
+    Decoding wraps the text in the agent id, e.g. "en-fr(hello world)",
+    so tests can see which hops a string has been through.
+    """
+
+    PAD_ID = 0
+    EOS_ID = 1
+    pad_token_id = PAD_ID
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.words = ["<pad>", "</s>"]
+        self.vocab = {word: i for i, word in enumerate(self.words)}
+
+    @classmethod
+    def from_pretrained(cls, model_name, **kwargs):
+        saved = os.path.join(model_name, "fake_tokenizer.txt")
+        if os.path.exists(saved):
+            with open(saved) as f:
+                return cls(f.read())
+        from local_translation_agents import LocalTranslationPipeline
+        tags = {name: agent_id for agent_id, name in LocalTranslationPipeline.MODELS.items()}
+        return cls(tags.get(model_name, model_name))
+
+    def save_pretrained(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "fake_tokenizer.txt"), "w") as f:
+            f.write(self.tag)
+
+    def convert_ids_to_tokens(self, ids):
+        return [self.words[i] for i in ids]
+
+    def convert_tokens_to_ids(self, tokens):
+        return [self._token_id(token) for token in tokens]
+
+    def _token_id(self, word: str) -> int:
+        if word not in self.vocab:
+            self.vocab[word] = len(self.words)
+            self.words.append(word)
+        return self.vocab[word]
+
+    def _encode(self, text: str, max_length=None):
+        ids = [self._token_id(word) for word in text.split()]
+        if max_length is not None:
+            ids = ids[:max_length - 1]
+        return ids + [self.EOS_ID]
+
+    def __call__(self, texts, return_tensors=None, padding=False, truncation=False, max_length=None):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        ids = [self._encode(text, max_length if truncation else None) for text in batch]
+
+        if return_tensors != "pt":
+            return {"input_ids": ids[0] if single else ids}
+
+        import torch
+        width = max(len(row) for row in ids)
+        padded = [row + [self.PAD_ID] * (width - len(row)) for row in ids]
+        mask = [[1] * len(row) + [0] * (width - len(row)) for row in ids]
+        return {"input_ids": torch.tensor(padded), "attention_mask": torch.tensor(mask)}
+
+    def decode(self, ids, skip_special_tokens=False):
+        ids = ids.tolist() if hasattr(ids, "tolist") else list(ids)
+        special = (self.PAD_ID, self.EOS_ID) if skip_special_tokens else ()
+        words = [self.words[i] for i in ids if i not in special]
+        return f"{self.tag}({' '.join(words)})"
+
+    def batch_decode(self, sequences, skip_special_tokens=False):
+        return [self.decode(seq, skip_special_tokens=skip_special_tokens) for seq in sequences]
+
+
+class FakeMarianModel:
+    """Echo model: generate() returns its input ids and records batch shapes."""
+
+    def __init__(self):
+        self.generate_shapes = []
+        self.generate_kwargs = []
+        self.inference_mode_calls = []
+        self.training = True
+
+    @classmethod
+    def from_pretrained(cls, model_name, **kwargs):
+        return cls()
+
+    def eval(self):
+        self.training = False
+        return self
+
+    def generate(self, input_ids, attention_mask=None, streamer=None, **kwargs):
+        import torch
+        self.inference_mode_calls.append(torch.is_inference_mode_enabled())
+        self.generate_shapes.append(tuple(input_ids.shape))
+        self.generate_kwargs.append(kwargs)
+        if streamer is not None:
+            # Like an encoder-decoder: the decoder start token, then one token per step
+            streamer.put(torch.tensor([[FakeMarianTokenizer.PAD_ID]]))
+            for token in input_ids[0]:
+                streamer.put(token.reshape(1))
+            streamer.end()
+        return input_ids
+
+
+@pytest.fixture
+def fake_marian(monkeypatch):
+    """Patch local_translation_agents to load fake MarianMT models."""
+    import local_translation_agents
+    monkeypatch.setattr(local_translation_agents, "MarianTokenizer", FakeMarianTokenizer)
+    monkeypatch.setattr(local_translation_agents, "MarianMTModel", FakeMarianModel)
+    return local_translation_agents
+
+
+def fake_pipeline_factory(num_threads, **kwargs):
+    """
+    Build a LocalTranslationPipeline with fake models inside a worker process.
+
+    Module-level so spawned sharded_pipeline workers can unpickle it.
+    """
+    import local_translation_agents
+    local_translation_agents.MarianTokenizer = FakeMarianTokenizer
+    local_translation_agents.MarianMTModel = FakeMarianModel
+    return local_translation_agents.LocalTranslationPipeline(
+        verbose=False,
+        inference=local_translation_agents.InferenceConfig(num_threads=num_threads)
+    )
+
+
+# ============================================================================
+# Stub Anthropic Messages API (no network or API key needed)
+# ============================================================================
+
+class StubMessagesServer:
+    """
+    Local HTTP server answering POST /v1/messages like the Messages API.
+
+    The reply to a user message is "translated(<text>)", where <text> is
+    everything after the first blank line of the message (the text to
+    translate). Streaming requests get server-sent events with one
+    text delta per word. Each request waits `latency` seconds first;
+    max_in_flight records the most requests seen waiting at once.
+
+    Message batches (POST /v1/messages/batches) stay "in_progress" for
+    `batch_polls` status checks, then end with a JSONL results file.
+    Requests whose text is in `batch_errors` come back errored; a cancel
+    request is acknowledged without changing the batch.
+
+    Packed requests (numbered <<<n>>> segments) are answered segment by
+    segment; segments in `pack_drop` are left out and segments in
+    `pack_merge` are appended to the previous segment's translation.
+
+    `throttle` is a list of status codes (429, 529, ...) returned, in
+    order, to the next POST /v1/messages requests instead of a message;
+    429s carry a retry-after header when `retry_after` is set.
+
+    System blocks marked with cache_control are reported as cache writes
+    the first time a prompt is seen and as cache reads afterwards, with one
+    "token" per word.
+    """
+
+    def __init__(self, latency: float = 0.0, batch_polls: int = 1):
+        import threading
+        from http.server import ThreadingHTTPServer
+
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.batch_polls = batch_polls
+        self.batch_errors = set()
+        self.batches = {}
+        self.cached_prompts = set()
+        self.pack_drop = set()
+        self.pack_merge = set()
+        self.throttle = []
+        self.retry_after = None
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def reply_text(self, body) -> str:
+        import re
+
+        content = body["messages"][-1]["content"].split(chr(10) * 2, 1)[-1]
+        if not content.startswith("<<<1>>>"):
+            return f"translated({content})"
+
+        # Packed segments: answer marker by marker, dropping or merging on request
+        segments = re.split(r"^<<<\d+>>>\n", content, flags=re.MULTILINE)[1:]
+        blocks = []
+        for number, segment in enumerate((segment.strip() for segment in segments), 1):
+            if segment in self.pack_drop:
+                continue
+            if segment in self.pack_merge and blocks:
+                blocks[-1][1] += f" translated({segment})"
+                continue
+            blocks.append([number, f"translated({segment})"])
+        return "\n".join(f"<<<{number}>>>\n{block}" for number, block in blocks)
+
+    def message(self, body):
+        import json
+
+        text = self.reply_text(body)
+        usage = {"input_tokens": len(json.dumps(body["messages"]).split()),
+                 "output_tokens": len(text.split()),
+                 "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        system = body.get("system", "")
+        if isinstance(system, list):
+            prompt = "".join(block["text"] for block in system)
+            if any("cache_control" in block for block in system):
+                with self._lock:
+                    cached = prompt in self.cached_prompts
+                    self.cached_prompts.add(prompt)
+                usage["cache_read_input_tokens" if cached else "cache_creation_input_tokens"] = len(prompt.split())
+            else:
+                usage["input_tokens"] += len(prompt.split())
+        else:
+            usage["input_tokens"] += len(system.split())
+        return {"id": f"msg_{len(self.requests)}", "type": "message", "role": "assistant",
+                "model": body["model"], "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn", "stop_sequence": None, "usage": usage}
+
+    def batch_failed(self, params) -> bool:
+        content = params["messages"][-1]["content"]
+        return content.split(chr(10) * 2, 1)[-1] in self.batch_errors
+
+    def batch_status(self, batch_id):
+        batch = self.batches[batch_id]
+        ended = batch["polls"] >= self.batch_polls
+        count = len(batch["requests"])
+        errored = sum(self.batch_failed(request["params"]) for request in batch["requests"])
+        return {"id": batch_id, "type": "message_batch",
+                "processing_status": "ended" if ended else "in_progress",
+                "request_counts": {"processing": 0 if ended else count,
+                                   "succeeded": count - errored if ended else 0,
+                                   "errored": errored if ended else 0,
+                                   "canceled": 0, "expired": 0},
+                "created_at": "2024-01-01T00:00:00Z", "expires_at": "2024-01-02T00:00:00Z",
+                "ended_at": "2024-01-01T00:01:00Z" if ended else None,
+                "archived_at": None, "cancel_initiated_at": None,
+                "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None}
+
+    def batch_results(self, batch_id):
+        import json
+
+        lines = []
+        for request in self.batches[batch_id]["requests"]:
+            params = request["params"]
+            if self.batch_failed(params):
+                result = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "api_error", "message": "stub failure"}}}
+            else:
+                result = {"type": "succeeded", "message": self.message(params)}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return "\n".join(lines) + "\n"
+
+    def _handler(self):
+        import json
+        import time
+        from http.server import BaseHTTPRequestHandler
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_not_found(self):
+                self._send_json(404, {"type": "error", "error": {"type": "not_found_error",
+                                                                 "message": self.path}})
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append({"path": self.path, "headers": dict(self.headers), "body": None})
+                parts = self.path.strip("/").split("/")
+                if parts[:3] != ["v1", "messages", "batches"] or len(parts) < 4 or parts[3] not in stub.batches:
+                    self._send_not_found()
+                    return
+
+                batch_id = parts[3]
+                if len(parts) == 5 and parts[4] == "results":
+                    data = stub.batch_results(batch_id).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/binary")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+
+                with stub._lock:
+                    stub.batches[batch_id]["polls"] += 1
+                self._send_json(200, stub.batch_status(batch_id))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length)) if length else {}
+                with stub._lock:
+                    stub.requests.append({"path": self.path, "headers": dict(self.headers), "body": body})
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+                if self.path == "/v1/messages/batches":
+                    with stub._lock:
+                        batch_id = f"msgbatch_{len(stub.batches)}"
+                        stub.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+                    self._send_json(200, stub.batch_status(batch_id))
+                    return
+
+                parts = self.path.strip("/").split("/")
+                if parts[:3] == ["v1", "messages", "batches"] and parts[4:] == ["cancel"] \
+                        and parts[3] in stub.batches:
+                    self._send_json(200, dict(stub.batch_status(parts[3]), processing_status="canceling"))
+                    return
+
+                if self.path != "/v1/messages":
+                    self._send_not_found()
+                    return
+
+                with stub._lock:
+                    status = stub.throttle.pop(0) if stub.throttle else None
+                if status is not None:
+                    kind = "rate_limit_error" if status == 429 else "overloaded_error"
+                    headers = {"retry-after": str(stub.retry_after)} if status == 429 and stub.retry_after else {}
+                    self._send_json(status, {"type": "error", "error": {"type": kind, "message": "stub"}},
+                                    headers)
+                    return
+
+                message = stub.message(body)
+                text = message["content"][0]["text"]
+                usage = message["usage"]
+
+                if not body.get("stream"):
+                    self._send_json(200, message)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def event(kind, payload):
+                    payload = dict(payload, type=kind)
+                    self.wfile.write(f"event: {kind}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                event("message_start", {"message": dict(message, content=[], stop_reason=None,
+                                                        usage=dict(usage, output_tokens=0))})
+                event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+                words = text.split(" ")
+                for i, word in enumerate(words):
+                    chunk = word if i == 0 else " " + word
+                    event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+                event("content_block_stop", {"index": 0})
+                event("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                        "usage": {"output_tokens": usage["output_tokens"]}})
+                event("message_stop", {})
+                self.close_connection = True
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def messages_stub(monkeypatch):
+    """Run a stub Messages API and point the anthropic SDK at it."""
+    stub = StubMessagesServer().start()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    # Pooled clients remember the base URL they were created with; the
+    # scheduler's budgets and counters are per test
+    _reset_claude_pool()
+    yield stub
+    _reset_claude_pool()
+    stub.stop()
+
+
+def _reset_claude_pool():
+    try:
+        import claude_client
+        import rate_limiter
+    except ImportError:
+        return
+    claude_client.reset_pool()
+    rate_limiter.reset_scheduler()
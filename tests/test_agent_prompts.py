@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Agent Prompts registry.
+
+Run with: pytest tests/test_agent_prompts.py -v
+Or: python -m pytest tests/ -v
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+from agent_prompts import (
+    PromptRegistry, TokenUsageTracker, HopUsage, parse_frontmatter,
+    get_registry, get_usage_tracker, REPO_ROOT, OUTPUT_CONTRACT
+)
+
+
+class TestParseFrontmatter:
+    """Test the frontmatter subset used by agents/*.md."""
+
+    def test_keys_and_lists(self):
+        text = "---\ndescription: An agent\nskills:\n  - one\n  - two\nskills_path: skills/x\n---\n\n# Body\n"
+        metadata, body = parse_frontmatter(text)
+
+        assert metadata == {"description": "An agent", "skills": ["one", "two"], "skills_path": "skills/x"}
+        assert body == "# Body"
+
+    def test_no_frontmatter(self):
+        assert parse_frontmatter("# Skill\ntext\n") == ({}, "# Skill\ntext")
+
+
+class TestPromptRegistry:
+    """Test compiling the agents/ and skills/ definitions."""
+
+    def test_compiles_agent_and_skills(self):
+        """Test that each prompt holds the agent body and every listed skill."""
+        registry = PromptRegistry()
+
+        agent = registry.get("en-fr")
+        assert agent.skills == ("subjunctive_mastery", "partitive_article_usage",
+                                "natural_phrasing_preservation")
+        assert agent.system_prompt.startswith("# English to French Translation Agent")
+        assert "# Subjunctive Mastery Skill" in agent.system_prompt
+        assert "skills_path" not in agent.system_prompt
+        assert [a.agent_id for a in registry.agents.values()] == ["en-fr", "fr-he", "he-en"]
+
+    def test_prompt_ends_with_output_contract(self):
+        """Test that the output contract and spelling-error handling come after the skills."""
+        for agent in get_registry().agents.values():
+            assert agent.system_prompt.endswith(OUTPUT_CONTRACT.format(target=agent.target_lang))
+        assert "Handle spelling errors" in OUTPUT_CONTRACT
+        assert get_registry().get("en-fr").system_prompt.endswith("Return ONLY the French translation with no explanations.")
+
+    def test_for_direction(self):
+        registry = get_registry()
+
+        assert registry.for_direction("French", "Hebrew").agent_id == "fr-he"
+        assert registry.for_direction("English", "German") is None
+
+    def test_request_marks_system_for_caching(self):
+        """Test that the system prompt is one cached block and the text goes last."""
+        request = get_registry().build_request("claude-test", "Bonjour", "fr-he")
+
+        assert request["system"] == [{"type": "text", "text": get_registry().get("fr-he").system_prompt,
+                                      "cache_control": {"type": "ephemeral"}}]
+        assert request["messages"][0]["content"].endswith("\n\nBonjour")
+
+    def test_unknown_agent(self):
+        with pytest.raises(ValueError):
+            get_registry().get("en-de")
+
+    def test_missing_definitions(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            PromptRegistry(root=str(tmp_path))
+
+    def test_runner_and_experiment_share_prompts(self):
+        """Test that agent_runner and run_experiment send the same system prompt per hop."""
+        pytest.importorskip("anthropic")
+        from agent_runner import AGENTS
+        from run_experiment import claude_request
+
+        request = claude_request("Hello", "English", "French")
+        assert request["system"][0]["text"] == AGENTS["en-fr"].system_prompt
+        assert AGENTS is get_registry().agents
+
+
+def usage(input_tokens=10, output_tokens=5, write=0, read=0):
+    return SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens,
+                           cache_creation_input_tokens=write, cache_read_input_tokens=read)
+
+
+class TestTokenUsageTracker:
+    """Test per-hop usage accounting."""
+
+    def test_record_and_savings(self):
+        tracker = TokenUsageTracker()
+        tracker.record("en-fr", usage(write=1000))
+        tracker.record("en-fr", usage(read=1000))
+        tracker.record("en-fr", usage(read=1000))
+
+        stats = tracker.hops["en-fr"]
+        assert stats.requests == 3
+        assert stats.cache_read_tokens == 2000
+        assert stats.saved_tokens == pytest.approx(2000 * 0.9 - 1000 * 0.25)
+        assert stats.cache_read_fraction == pytest.approx(2000 / 3030)
+
+    def test_missing_cache_fields(self):
+        """Test usage objects without cache fields (older responses)."""
+        tracker = TokenUsageTracker()
+        tracker.record("he-en", SimpleNamespace(input_tokens=7, output_tokens=3))
+
+        assert tracker.hops["he-en"].prompt_tokens == 7
+
+    def test_report(self, capsys):
+        tracker = TokenUsageTracker()
+        tracker.record("fr-he", usage(read=500))
+        tracker.print_report()
+
+        assert "fr-he" in capsys.readouterr().out
+
+    def test_empty(self):
+        assert HopUsage().cache_read_fraction == 0.0
+
+
+class TestPromptCachingAgainstStub:
+    """Test that repeated hops read the system prompt from the cache."""
+
+    def test_second_request_reads_cache(self, messages_stub):
+        pytest.importorskip("anthropic")
+        from agent_runner import TranslationAgent
+
+        get_usage_tracker().reset()
+        agent = TranslationAgent()
+        agent.translate("first", "en-fr")
+        agent.translate("second", "en-fr")
+
+        stats = get_usage_tracker().hops["en-fr"]
+        assert stats.requests == 2
+        assert stats.cache_write_tokens == stats.cache_read_tokens > 0
+        get_usage_tracker().reset()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Agent Runner module.
+
+Run with: pytest tests/test_agent_runner.py -v
+Or: python -m pytest tests/ -v
+
+Note: These tests talk to the stub Messages API from conftest.py,
+so no API key or network access is needed.
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import asyncio
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from agent_runner import TranslationAgent, AsyncTranslationAgent, AGENTS, run_bulk_file
+    AGENT_RUNNER_AVAILABLE = True
+except (ImportError, SystemExit):
+    AGENT_RUNNER_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not AGENT_RUNNER_AVAILABLE,
+    reason="anthropic not installed"
+)
+
+
+class TestTranslationAgent:
+    """Test blocking translations against the stub server."""
+
+    def test_translate(self, messages_stub):
+        """Test one hop and the request it sends."""
+        assert TranslationAgent().translate("hello world", "en-fr") == "translated(hello world)"
+
+        body = messages_stub.requests[0]["body"]
+        assert body["system"][0]["text"] == AGENTS["en-fr"].system_prompt
+        assert body["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "stream" not in body
+
+    def test_unknown_agent(self, messages_stub):
+        """Test that an unknown agent is rejected before any request."""
+        with pytest.raises(ValueError):
+            TranslationAgent().translate("hello", "en-de")
+        assert messages_stub.requests == []
+
+
+class TestStreaming:
+    """Test --stream mode against the stub server's event stream."""
+
+    def test_translate_stream_matches_blocking(self, messages_stub):
+        """Test that streamed chunks add up to the blocking result."""
+        agent = TranslationAgent()
+        chunks = []
+        result = agent.translate_stream("the quick brown fox", "en-fr", on_text=chunks.append)
+
+        assert result == agent.translate("the quick brown fox", "en-fr")
+        assert "".join(chunks) == result
+        assert len(chunks) == 4
+        assert messages_stub.requests[0]["body"]["stream"] is True
+
+    def test_timings_recorded(self, messages_stub):
+        """Test per-hop time-to-first-token and total latency."""
+        messages_stub.latency = 0.05
+        agent = TranslationAgent()
+        agent.translate_stream("hello world", "en-fr")
+        timing = agent.stream_timings[0]
+
+        assert timing.agent_id == "en-fr"
+        assert timing.backend == "claude"
+        assert 0.05 <= timing.time_to_first_token <= timing.total_seconds
+        assert timing.output_tokens == 2
+
+    def test_pipeline_stream(self, messages_stub, capsys):
+        """Test the streamed pipeline output and latency report."""
+        from stream_timing import print_stream_timings
+        agent = TranslationAgent()
+        french, hebrew, final = agent.run_pipeline_stream("hello")
+        print_stream_timings(agent.stream_timings)
+        output = capsys.readouterr().out
+
+        assert final == "translated(translated(translated(hello)))"
+        assert f"English: {final}" in output
+        assert [t.agent_id for t in agent.stream_timings] == ["en-fr", "fr-he", "he-en"]
+        assert "TTFT" in output
+
+
+class TestBulkMode:
+    """Test the async bulk runner against the stub server."""
+
+    def test_concurrency_limit(self, messages_stub):
+        """Test that no more than `concurrency` requests are in flight."""
+        messages_stub.latency = 0.2
+        agent = AsyncTranslationAgent(concurrency=3)
+        output = io.StringIO()
+
+        start = time.perf_counter()
+        summary = asyncio.run(agent.run_bulk([f"text {i}" for i in range(9)], agent_id="en-fr", output=output))
+        elapsed = time.perf_counter() - start
+
+        assert messages_stub.max_in_flight == 3
+        assert 0.55 <= elapsed < 1.5
+        assert summary["requests"] == 9
+        assert summary["errors"] == 0
+
+    def test_jsonl_records(self, messages_stub):
+        """Test one JSON line per text with outputs and latency."""
+        output = io.StringIO()
+        texts = ["hello", "good morning", "goodbye"]
+        asyncio.run(AsyncTranslationAgent(concurrency=2).run_bulk(texts, output=output))
+        records = sorted((json.loads(line) for line in output.getvalue().splitlines()),
+                         key=lambda r: r["index"])
+
+        assert [r["input"] for r in records] == texts
+        assert records[0]["final_english"] == "translated(translated(translated(hello)))"
+        assert records[0]["french"] == "translated(hello)"
+        assert set(records[0]["hop_latency_seconds"]) == {"en-fr", "fr-he", "he-en"}
+        assert all(r["latency_seconds"] >= 0 and r["error"] is None for r in records)
+
+    def test_errors_recorded_not_raised(self, messages_stub, monkeypatch):
+        """Test that a failed request becomes an error record."""
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", messages_stub.base_url + "/missing")
+        output = io.StringIO()
+        agent = AsyncTranslationAgent(concurrency=2)
+        agent.client = agent.client.with_options(max_retries=0)
+        summary = asyncio.run(agent.run_bulk(["a", "b"], agent_id="en-fr", output=output))
+
+        assert summary["errors"] == 2
+        assert all(json.loads(line)["error"] for line in output.getvalue().splitlines())
+
+    def test_run_bulk_file(self, messages_stub, tmp_path):
+        """Test reading texts from a file, skipping blank lines."""
+        path = tmp_path / "texts.txt"
+        path.write_text("first\n\nsecond\n", encoding="utf-8")
+        output = io.StringIO()
+        summary = run_bulk_file(str(path), agent_id="en-fr", concurrency=4, output=output)
+
+        assert summary["requests"] == 2
+        assert {json.loads(line)["output"] for line in output.getvalue().splitlines()} == \
+            {"translated(first)", "translated(second)"}
+
+    def test_invalid_concurrency(self, messages_stub):
+        """Test that a zero concurrency limit is rejected."""
+        with pytest.raises(ValueError):
+            AsyncTranslationAgent(concurrency=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
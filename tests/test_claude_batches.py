@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Claude Message Batches module.
+
+Run with: pytest tests/test_claude_batches.py -v
+Or: python -m pytest tests/ -v
+
+Note: These tests talk to the stub Messages API from conftest.py.
+"""
+
+import sys
+import os
+import json
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from claude_batches import BatchTranslator
+    import run_experiment as experiment_module
+    from run_experiment import claude_request, run_translation_pipeline_batch, run_experiment
+    from translation_cache import TranslationCache
+    BATCHES_AVAILABLE = True
+except (ImportError, SystemExit):
+    BATCHES_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not BATCHES_AVAILABLE,
+    reason="anthropic not installed"
+)
+
+
+def batch_paths(stub):
+    return [request["path"] for request in stub.requests]
+
+
+class TestBatchTranslator:
+    """Test submit, poll and collect against the stub server."""
+
+    def test_one_batch_in_request_order(self, messages_stub):
+        """Test that all requests go in one batch and results come back in order."""
+        messages_stub.batch_polls = 3
+        texts = ["one", "two", "three"]
+        batches = BatchTranslator(poll_interval=0)
+
+        outputs = batches.run([claude_request(t, "English", "French") for t in texts])
+
+        assert outputs == [f"translated({t})" for t in texts]
+        assert len(messages_stub.batches) == 1
+        assert batches.stats.polls == 3
+        assert batches.stats.succeeded == 3
+        assert "/v1/messages" not in batch_paths(messages_stub)
+
+    def test_empty_submits_nothing(self, messages_stub):
+        """Test that no batch is created for an empty request list."""
+        assert BatchTranslator(poll_interval=0).run([]) == []
+        assert messages_stub.batches == {}
+
+    def test_errored_requests_resent_interactively(self, messages_stub):
+        """Test that requests the batch failed are retried through messages.create."""
+        messages_stub.batch_errors = {"two"}
+        batches = BatchTranslator(poll_interval=0)
+
+        outputs = batches.run([claude_request(t, "English", "French") for t in ["one", "two"]])
+
+        assert outputs == ["translated(one)", "translated(two)"]
+        assert batches.stats.fallbacks == 1
+        assert batch_paths(messages_stub).count("/v1/messages") == 1
+
+    def test_large_runs_split_into_several_batches(self, messages_stub, monkeypatch):
+        """Test that runs over MAX_BATCH_REQUESTS are split across batches."""
+        monkeypatch.setattr(BatchTranslator, "MAX_BATCH_REQUESTS", 2)
+        texts = ["a", "b", "c", "d", "e"]
+
+        outputs = BatchTranslator(poll_interval=0).run([claude_request(t, "English", "French") for t in texts])
+
+        assert outputs == [f"translated({t})" for t in texts]
+        assert len(messages_stub.batches) == 3
+
+    def test_large_payloads_split_by_size(self, messages_stub, monkeypatch):
+        """Test that batches stay under MAX_BATCH_BYTES of serialized requests."""
+        requests = [claude_request(t, "English", "French") for t in ["a", "b", "c", "d", "e"]]
+        request_bytes = len(json.dumps({"custom_id": "req-0", "params": requests[0]}))
+        monkeypatch.setattr(BatchTranslator, "MAX_BATCH_BYTES", 2 * request_bytes + 100)
+
+        outputs = BatchTranslator(poll_interval=0).run(requests)
+
+        assert outputs == [f"translated({t})" for t in ["a", "b", "c", "d", "e"]]
+        assert [len(batch["requests"]) for batch in messages_stub.batches.values()] == [2, 2, 1]
+
+    def test_timeout(self, messages_stub):
+        """Test that a batch that never ends raises TimeoutError."""
+        messages_stub.batch_polls = 10 ** 6
+        batches = BatchTranslator(poll_interval=0.01, timeout=0.05)
+
+        with pytest.raises(TimeoutError):
+            batches.run([claude_request("one", "English", "French")])
+
+    def test_rejects_negative_poll_interval(self):
+        with pytest.raises(ValueError):
+            BatchTranslator(poll_interval=-1)
+
+
+class TestBatchPipeline:
+    """Test run_translation_pipeline_batch with a batch translator."""
+
+    def test_one_batch_per_hop(self, messages_stub):
+        """Test that each hop is one batch fed by the previous hop's results."""
+        texts = ["the cat", "the dog", "the cat"]
+        dedup = {}
+
+        results = run_translation_pipeline_batch(texts, batch_translator=BatchTranslator(poll_interval=0),
+                                                 dedup_stats=dedup)
+
+        assert len(messages_stub.batches) == 3
+        assert [len(b["requests"]) for b in messages_stub.batches.values()] == [2, 2, 2]
+        assert results[0] == ("translated(the cat)", "translated(translated(the cat))",
+                              "translated(translated(translated(the cat)))")
+        assert results[2] == results[0]
+        assert dedup["fr-he"].saved == 1
+
+    def test_cache_hits_skip_the_batch(self, messages_stub):
+        """Test that only cache misses are submitted."""
+        cache = TranslationCache(":memory:")
+        batches = BatchTranslator(poll_interval=0)
+        run_translation_pipeline_batch(["the cat"], batch_translator=batches, cache=cache)
+        first = len(messages_stub.batches)
+
+        results = run_translation_pipeline_batch(["the cat", "the dog"], batch_translator=batches, cache=cache)
+
+        assert len(messages_stub.batches) == first + 3
+        assert all(len(b["requests"]) == 1 for b in list(messages_stub.batches.values())[first:])
+        assert results[0][2] == "translated(translated(translated(the cat)))"
+
+
+class WordOverlapChecker:
+    """Minimal stand-in for LocalEmbeddingSimilarityChecker."""
+
+    def __init__(self, model_name: str = "fake", store=None):
+        pass
+
+    def get_embeddings(self, texts):
+        return [set(text.lower().replace("(", " ").replace(")", " ").split()) for text in texts]
+
+    def cosine_similarity(self, a, b):
+        return len(a & b) / len(a | b) if a | b else 0.0
+
+    def score_pairs(self, originals, finals):
+        return [self.cosine_similarity(a, b)
+                for a, b in zip(self.get_embeddings(originals), self.get_embeddings(finals))]
+
+
+class TestBatchExperiment:
+    """Test run_experiment(batch_api=True)."""
+
+    def test_grid_through_batches(self, messages_stub, monkeypatch):
+        """Test that the whole grid runs as three batches and reaches the similarity stage."""
+        monkeypatch.setattr(experiment_module, "LocalEmbeddingSimilarityChecker", WordOverlapChecker)
+        sentences = ["The quick brown fox jumps over the lazy dog near the old river bank today"]
+
+        experiment = run_experiment(sentences=sentences, error_rates=[0.0, 0.25], verbose=False,
+                                    batch_api=True, batch_poll_interval=0)
+
+        assert len(messages_stub.batches) == 3
+        assert len(experiment.results) == 2
+        assert experiment.results[0].final_english.startswith("translated(translated(translated(")
+        assert 0.0 < experiment.results[0].similarity_score < 1.0
+
+    def test_requires_claude_mode(self):
+        with pytest.raises(ValueError):
+            run_experiment(sentences=["x"], use_mock=True, verbose=False, batch_api=True)
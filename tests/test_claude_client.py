@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Claude Client Pool module.
+
+Run with: pytest tests/test_claude_client.py -v
+Or: python -m pytest tests/ -v
+
+Note: These tests talk to the stub Messages API from conftest.py.
+"""
+
+import sys
+import os
+import asyncio
+import io
+import threading
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    import claude_client
+    from claude_client import ClaudeClientPool, get_async_client, get_client, get_pool, configure
+    from run_experiment import translate_with_claude
+    from agent_runner import AsyncTranslationAgent, TranslationAgent
+    CLIENT_AVAILABLE = True
+except (ImportError, SystemExit):
+    CLIENT_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not CLIENT_AVAILABLE,
+    reason="anthropic not installed"
+)
+
+
+def ask(client, text="hello"):
+    message = client.messages.create(model="claude-test", max_tokens=16,
+                                     messages=[{"role": "user", "content": f"Translate:\n\n{text}"}])
+    return message.content[0].text
+
+
+class TestClaudeClientPool:
+    """Test connection reuse and limits against the stub server."""
+
+    def test_sequential_requests_reuse_connection(self, messages_stub):
+        """Test that keep-alive serves many requests over one connection."""
+        client = get_client()
+        for i in range(5):
+            assert ask(client, f"text {i}") == f"translated(text {i})"
+
+        stats = get_pool().stats()
+        assert stats["requests"] == 5
+        assert stats["connections"] == 1
+        assert stats["reused"] == 4
+
+    def test_same_client_per_key(self, messages_stub):
+        """Test that repeated lookups return the shared client."""
+        assert get_client("key-a") is get_client("key-a")
+        assert get_client("key-a") is not get_client("key-b")
+
+    def test_shared_by_experiment_and_agent_runner(self, messages_stub):
+        """Test that translate_with_claude and TranslationAgent share one pool."""
+        translate_with_claude("hello", "English", "French")
+        TranslationAgent().translate("bonjour", "fr-he")
+        translate_with_claude("shalom", "Hebrew", "English")
+
+        assert TranslationAgent().client is get_client()
+        stats = get_pool().stats()
+        assert stats["requests"] == 3
+        assert stats["connections"] == 1
+
+    def test_async_agent_uses_pool(self, messages_stub):
+        """Test that AsyncTranslationAgent gets its client, limits and counters from the pool."""
+        agent = AsyncTranslationAgent(concurrency=1)
+        assert agent.client is get_async_client()
+
+        texts = [f"text {i}" for i in range(4)]
+        asyncio.run(agent.run_bulk(texts, agent_id="en-fr", output=io.StringIO()))
+
+        stats = get_pool().stats()
+        assert stats["requests"] == 4
+        assert stats["connections"] == 1
+
+    def test_connection_limit(self, messages_stub):
+        """Test that concurrent callers never open more than max_connections."""
+        messages_stub.latency = 0.1
+        pool = configure(max_connections=2)
+        client = get_client()
+        threads = [threading.Thread(target=ask, args=(client, f"t{i}")) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        assert messages_stub.max_in_flight <= 2
+        assert pool.stats()["connections"] <= 2
+        assert pool.stats()["requests"] == 6
+
+    def test_missing_api_key(self, monkeypatch):
+        """Test that no key is an error, as with a direct client."""
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        with pytest.raises(ValueError):
+            ClaudeClientPool().client()
+
+    def test_invalid_limit(self):
+        """Test that a zero connection limit is rejected."""
+        with pytest.raises(ValueError):
+            ClaudeClientPool(max_connections=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Document Translation module.
+
+Run with: pytest tests/test_document_translation.py -v
+Or: python -m pytest tests/ -v
+
+Note: These tests use the fake MarianMT models from conftest.py.
+"""
+
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+from document_translation import split_paragraphs, split_sentences
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from local_translation_agents import LocalTranslationPipeline
+    from document_translation import DocumentTranslator
+    LOCAL_AGENTS_AVAILABLE = True
+except (ImportError, SystemExit):
+    LOCAL_AGENTS_AVAILABLE = False
+
+
+def roundtrip(text):
+    """What the fake agents produce for one segment."""
+    return f"he-en(fr-he(en-fr({text})))"
+
+
+class TestSegmentation:
+    """Test paragraph and sentence splitting."""
+
+    def test_sentences(self):
+        """Test splitting at terminal punctuation."""
+        assert split_sentences("One. Two? Three! Four") == ["One.", "Two?", "Three!", "Four"]
+
+    def test_closing_quotes_stay_with_sentence(self):
+        """Test that a quote after the period belongs to the sentence."""
+        assert split_sentences('He said "stop." Then left.') == ['He said "stop."', "Then left."]
+
+    def test_decimal_not_split(self):
+        """Test that a period inside a number does not end a sentence."""
+        assert split_sentences("It costs 3.5 euros. Cheap.") == ["It costs 3.5 euros.", "Cheap."]
+
+    def test_paragraph_separators_kept(self):
+        """Test that blank lines and single line breaks are preserved."""
+        paragraphs, separators = split_paragraphs("\nFirst para.\n\nSecond para.\nThird line.\n")
+
+        assert paragraphs == ["First para.", "Second para.", "Third line."]
+        assert separators == ["\n\n", "\n"]
+
+
+@pytest.mark.skipif(not LOCAL_AGENTS_AVAILABLE, reason="transformers not installed")
+class TestDocumentTranslator:
+    """Test document round trips with the fake agents."""
+
+    @pytest.fixture
+    def pipeline(self, fake_marian):
+        return LocalTranslationPipeline(verbose=False)
+
+    def test_structure_preserved(self, pipeline):
+        """Test that paragraphs come back in place, sentence by sentence."""
+        text = "First sentence. Second one.\n\nNew paragraph here."
+        result = DocumentTranslator(pipeline).translate_document(text)
+
+        assert result.final_english == (f"{roundtrip('First sentence.')} {roundtrip('Second one.')}"
+                                        f"\n\n{roundtrip('New paragraph here.')}")
+        assert result.french.split("\n\n") == ["en-fr(First sentence.) en-fr(Second one.)",
+                                               "en-fr(New paragraph here.)"]
+        assert result.paragraphs == 2
+        assert result.segments == 3
+
+    def test_segments_batched(self, pipeline):
+        """Test that all segments share batched generate() calls."""
+        text = " ".join(f"Sentence {i}." for i in range(10))
+        DocumentTranslator(pipeline).translate_document(text)
+
+        shapes = pipeline.agents["en-fr"].model.generate_shapes
+        assert sum(shape[0] for shape in shapes) == 10
+        assert len(shapes) < 10
+
+    def test_long_sentence_split_not_truncated(self, pipeline):
+        """Test that an over-long sentence is chunked and no words are lost."""
+        words = [f"w{i}" for i in range(100)]
+        translator = DocumentTranslator(pipeline, max_segment_tokens=16)
+        result = translator.translate_document(" ".join(words))
+
+        assert result.segments > 1
+        assert max(result.segment_lengths) <= 16
+        translated_words = result.french.replace("en-fr(", "").replace(")", "").split()
+        assert translated_words == words
+
+    def test_empty_document(self, pipeline):
+        """Test that an empty document needs no model calls."""
+        result = DocumentTranslator(pipeline).translate_document("  \n ")
+
+        assert result.final_english == ""
+        assert result.segments == 0
+
+    def test_translate_documents_report(self, pipeline, capsys):
+        """Test per-document results and throughput report."""
+        results = DocumentTranslator(pipeline).translate_documents(["One. Two.", "Three."])
+        output = capsys.readouterr().out
+
+        assert [r.segments for r in results] == [2, 1]
+        assert all(r.words_per_second > 0 for r in results)
+        assert "Document throughput" in output
+
+    def test_segment_limit_validated(self, pipeline):
+        """Test that segments cannot exceed the model's input limit."""
+        with pytest.raises(ValueError):
+            DocumentTranslator(pipeline, max_segment_tokens=pipeline.MAX_INPUT_LENGTH + 1)
+
+    def test_truncation_warns(self, pipeline):
+        """Test that the batch path no longer truncates silently."""
+        long_text = " ".join(f"w{i}" for i in range(pipeline.MAX_INPUT_LENGTH + 10))
+        with pytest.warns(UserWarning, match="truncated"):
+            pipeline.translate_batch([long_text], "en-fr")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -277,6 +277,60 @@ class TestTranslationQualityThresholds:
             f"Translation quality {result['similarity_score']:.4f} below 0.85 threshold"
 
 
+class FakeSentenceModel:
+    """Bag-of-letters encoder that records its encode calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        import numpy as np
+        self.calls.append((list(texts), batch_size, normalize_embeddings))
+        vectors = np.array([[text.lower().count(c) for c in "abcdefghijklmnopqrstuvwxyz"] + [0.1]
+                            for text in texts], dtype=np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+class TestScorePairs:
+    """Test batched pair scoring without loading a real model."""
+
+    @pytest.fixture
+    def checker(self):
+        checker = LocalEmbeddingSimilarityChecker.__new__(LocalEmbeddingSimilarityChecker)
+        checker.model = FakeSentenceModel()
+        checker.model_name = "fake"
+        checker.store = None
+        return checker
+
+    def test_one_encode_of_unique_texts(self, checker):
+        """Test that repeated texts are embedded once, in one normalized call."""
+        originals = ["the cat", "the cat", "a dog"]
+        finals = ["the cat", "a cat", "a dog"]
+
+        checker.score_pairs(originals, finals, batch_size=8)
+
+        assert checker.model.calls == [(["the cat", "a dog", "a cat"], 8, True)]
+
+    def test_matches_cosine_similarity(self, checker):
+        originals = ["the cat sat", "hello", "abc"]
+        finals = ["the cat sat", "world", "xyz"]
+
+        scores = checker.score_pairs(originals, finals)
+
+        raw = FakeSentenceModel().encode(originals + finals).tolist()
+        expected = [checker.cosine_similarity(raw[i], raw[i + 3]) for i in range(3)]
+        assert scores.tolist() == pytest.approx(expected, abs=1e-6)
+        assert scores[0] == pytest.approx(1.0, abs=1e-6)
+
+    def test_empty_and_mismatched(self, checker):
+        assert len(checker.score_pairs([], [])) == 0
+        assert checker.model.calls == []
+        with pytest.raises(ValueError):
+            checker.score_pairs(["a"], [])
+
+
 class TestEdgeCases:
     """Test edge cases and error handling."""
 
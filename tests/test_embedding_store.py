@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Embedding Store module.
+
+Run with: pytest tests/test_embedding_store.py -v
+Or: python -m pytest tests/ -v
+"""
+
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from embedding_store import EmbeddingStore, text_hash
+
+
+def embed(texts, dim=4):
+    """Deterministic stand-in embeddings: one row per text."""
+    return np.array([[len(text) + i for i in range(dim)] for text in texts], dtype=np.float32)
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return embed(texts)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"))
+    yield store
+    store.close()
+
+
+class TestLookups:
+    """Test appending, lookups and persistence."""
+
+    def test_get_or_embed_only_embeds_misses(self, store):
+        """Test that a repeated sweep embeds only text it has not seen."""
+        embedder = CountingEmbedder()
+        first = store.get_or_embed("m", ["a", "bb", "a"], embedder)
+        second = store.get_or_embed("m", ["bb", "ccc"], embedder)
+
+        assert embedder.calls == [["a", "bb"], ["ccc"]]
+        np.testing.assert_array_equal(first, embed(["a", "bb", "a"]))
+        np.testing.assert_array_equal(second, embed(["bb", "ccc"]))
+        assert (store.hits, store.misses) == (1, 4)
+
+    def test_key_includes_model(self, store):
+        store.add("m1", ["a"], embed(["a"]))
+
+        assert store.lookup("m1", ["a"]) == [0]
+        assert store.lookup("m2", ["a"]) == [None]
+
+    def test_add_keeps_existing_rows(self, store):
+        """Test that adding a stored text again does not append a row."""
+        store.add("m", ["a", "b"], embed(["a", "b"]))
+
+        assert store.add("m", ["b", "c", "c"], embed(["b", "c", "c"])) == [1, 2, 2]
+        assert store.stats()["rows"] == 3
+
+    def test_fixed_dimension(self, store):
+        store.add("m", ["a"], embed(["a"]))
+
+        assert store.dim("m") == 4
+        with pytest.raises(ValueError):
+            store.add("m", ["b"], embed(["b"], dim=3))
+        with pytest.raises(ValueError):
+            store.add("m", ["b", "c"], embed(["b"]))
+
+    def test_models_with_different_dimensions(self, store):
+        """Test that switching to a model with another embedding size starts its own matrix."""
+        store.add("small", ["a", "b"], embed(["a", "b"], dim=3))
+        store.add("large", ["a"], embed(["a"], dim=5))
+
+        np.testing.assert_array_equal(store.vectors("small", store.lookup("small", ["b"])), embed(["b"], dim=3))
+        np.testing.assert_array_equal(store.vectors("large", store.lookup("large", ["a"])), embed(["a"], dim=5))
+        assert store.stats()["rows"] == 3
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "store")
+        first = EmbeddingStore(path)
+        first.add("m", ["hello", "world"], embed(["hello", "world"]))
+        first.close()
+
+        reopened = EmbeddingStore(path)
+        np.testing.assert_array_equal(reopened.vectors("m", reopened.lookup("m", ["world"])), embed(["world"]))
+
+    def test_single_matrix_layout_discarded(self, tmp_path):
+        """Test that a store from the one-matrix layout is emptied rather than misread."""
+        import sqlite3
+
+        path = tmp_path / "store"
+        path.mkdir()
+        (path / "embeddings-0.f32").write_bytes(b"\x00" * 16)
+        conn = sqlite3.connect(str(path / "index.sqlite"))
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE rows (model TEXT, text_hash TEXT, row INTEGER, last_used REAL)")
+        conn.execute("INSERT INTO rows VALUES ('m', ?, 0, 0)", (text_hash("a"),))
+        conn.commit()
+        conn.close()
+
+        store = EmbeddingStore(str(path))
+        assert store.lookup("m", ["a"]) == [None]
+        assert not list(path.glob("*.f32"))
+        store.close()
+
+    def test_partial_row_from_crash_is_overwritten(self, store):
+        """Test that bytes of an interrupted append do not shift later rows."""
+        store.add("m", ["a"], embed(["a"]))
+        with open(store._matrix_path("m"), "ab") as f:
+            f.write(b"\x00" * 6)
+
+        store.add("m", ["b"], embed(["b"]))
+
+        np.testing.assert_array_equal(store.vectors("m", store.lookup("m", ["a", "b"])), embed(["a", "b"]))
+
+
+class TestCompaction:
+    """Test reclaiming dead rows."""
+
+    def test_compact_drops_removed_model(self, store):
+        store.add("old", ["x", "y"], embed(["x", "y"]))
+        store.add("new", ["a", "bb"], embed(["a", "bb"]))
+        store.remove_model("old")
+
+        assert store.stats()["dead_rows"] == 2
+        assert store.compact() == 2
+
+        stats = store.stats()
+        assert (stats["rows"], stats["dead_rows"]) == (2, 0)
+        np.testing.assert_array_equal(store.vectors("new", store.lookup("new", ["a", "bb"])), embed(["a", "bb"]))
+        assert [f for f in os.listdir(store.path) if f.endswith(".f32")] == \
+            [os.path.basename(store._matrix_path("new"))]
+
+    def test_compact_keeps_most_recently_used(self, store):
+        store.add("m", ["a", "b", "c"], embed(["a", "b", "c"]))
+        store.lookup("m", ["a"])
+
+        store.compact(max_rows=1)
+
+        assert store.lookup("m", ["a", "b", "c"]) == [0, None, None]
+
+    def test_append_after_compaction(self, store):
+        store.add("m", ["a", "b"], embed(["a", "b"]))
+        store.remove_model("m")
+        store.compact()
+        store.add("m", ["ccc"], embed(["ccc"]))
+
+        np.testing.assert_array_equal(store.vectors("m", store.lookup("m", ["ccc"])), embed(["ccc"]))
+
+    def test_clear(self, store):
+        store.add("m", ["a"], embed(["a"]))
+        store.clear()
+
+        assert len(store) == 0
+        assert store.stats()["rows"] == 0
+
+
+class TestCheckerIntegration:
+    """Test score_pairs() through the store without a real model."""
+
+    def test_second_sweep_embeds_only_new_outputs(self, store):
+        pytest.importorskip("sentence_transformers")
+        from embedding_similarity_local import LocalEmbeddingSimilarityChecker
+
+        class Model:
+            def __init__(self):
+                self.calls = []
+
+            def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+                self.calls.append(list(texts))
+                vectors = embed(texts)
+                return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        checker = LocalEmbeddingSimilarityChecker.__new__(LocalEmbeddingSimilarityChecker)
+        checker.model, checker.model_name, checker.store = Model(), "fake", store
+
+        first = checker.score_pairs(["orig"] * 2, ["out one", "out two"])
+        second = checker.score_pairs(["orig"] * 2, ["out one", "out three"])
+
+        assert checker.model.calls == [["orig", "out one", "out two"], ["out three"]]
+        assert second[0] == pytest.approx(first[0])
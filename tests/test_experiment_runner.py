@@ -20,6 +20,7 @@ try:
         TEST_SENTENCES,
         mock_translate,
         run_translation_pipeline,
+        run_translation_pipeline_batch,
         run_experiment,
         calculate_summary,
         TranslationResult,
@@ -127,6 +128,217 @@ class TestTranslationPipeline:
         assert result is not None
 
 
+class TestBatchTranslationPipeline:
+    """Test the stage-wise batch translation pipeline."""
+
+    def test_batch_matches_single_pipeline(self):
+        """Test that batch results match per-sentence pipeline results."""
+        texts = ["The beautiful sunset painted the sky", "Tha beautful sunest"]
+        batched = run_translation_pipeline_batch(texts, use_mock=True)
+
+        assert batched == [run_translation_pipeline(t, use_mock=True) for t in texts]
+
+    def test_batch_empty(self):
+        """Test that an empty batch returns an empty list."""
+        assert run_translation_pipeline_batch([], use_mock=True) == []
+
+    def test_duplicates_translated_once(self, monkeypatch):
+        """Test that repeated inputs and intermediates reach the backend once per hop."""
+        import run_experiment as module
+        calls = []
+        original = module.mock_translate
+
+        def counting(text, source_lang, target_lang, cache=None):
+            calls.append((source_lang, text))
+            return original(text, source_lang, target_lang)
+
+        monkeypatch.setattr(module, "mock_translate", counting)
+        texts = ["the cat", "the cat", "the dog", "the cat"]
+        stats = {}
+        results = run_translation_pipeline_batch(texts, use_mock=True, dedup_stats=stats)
+
+        assert len(calls) == 6
+        assert results == [run_translation_pipeline(t, use_mock=True) for t in texts]
+        assert stats["en-fr"].inputs == 4
+        assert stats["en-fr"].unique == 2
+        assert stats["he-en"].saved == 2
+
+
+class FakeSimilarityChecker:
+    """Bag-of-words stand-in for LocalEmbeddingSimilarityChecker."""
+
+    def __init__(self, model_name: str = "fake", store=None):
+        self.model_name = model_name
+        self.store = store
+        self.encoded_texts = []
+        self.score_calls = 0
+
+    def get_embedding(self, text):
+        self.encoded_texts.append(text)
+        words = text.lower().split()
+        return [float(words.count(w)) for w in ("the", "sunset", "sky", "student", "park", "morning")] + [1.0]
+
+    def get_embeddings(self, texts):
+        return [self.get_embedding(t) for t in texts]
+
+    def cosine_similarity(self, vec1, vec2):
+        dot = sum(a * b for a, b in zip(vec1, vec2))
+        mag = (sum(a * a for a in vec1) * sum(b * b for b in vec2)) ** 0.5
+        return dot / mag if mag else 0.0
+
+    def score_pairs(self, originals, finals):
+        self.score_calls += 1
+        return [self.cosine_similarity(a, b)
+                for a, b in zip(self.get_embeddings(originals), self.get_embeddings(finals))]
+
+    def analyze(self, input_sentence, output_sentence):
+        score = self.cosine_similarity(self.get_embedding(input_sentence),
+                                       self.get_embedding(output_sentence))
+        return {'similarity_score': score}
+
+
+class TestBatchedExperiment:
+    """Test run_experiment(batched=True) against the per-cell loop."""
+
+    @pytest.fixture
+    def fake_checker(self, monkeypatch):
+        import run_experiment as module
+        monkeypatch.setattr(module, "LocalEmbeddingSimilarityChecker", FakeSimilarityChecker)
+
+    def test_batched_matches_sequential(self, fake_checker):
+        """Test that batched mode reproduces the per-cell results."""
+        kwargs = dict(sentences=TEST_SENTENCES, error_rates=[0.0, 0.25, 0.50],
+                      use_mock=True, verbose=False)
+        sequential = run_experiment(**kwargs)
+        batched = run_experiment(batched=True, **kwargs)
+
+        assert [r.final_english for r in batched.results] == \
+            [r.final_english for r in sequential.results]
+        assert [r.similarity_score for r in batched.results] == \
+            pytest.approx([r.similarity_score for r in sequential.results])
+
+    def test_batched_result_per_cell(self, fake_checker):
+        """Test that batched mode produces one result per grid cell."""
+        experiment = run_experiment(sentences=TEST_SENTENCES, error_rates=[0.0, 0.10, 0.50],
+                                    use_mock=True, verbose=False, batched=True)
+
+        assert len(experiment.results) == len(TEST_SENTENCES) * 3
+        assert set(experiment.summary['by_error_rate']) == {'0%', '10%', '50%'}
+
+    def test_cells_scored_in_one_pass(self, monkeypatch):
+        """Test that the per-cell loop scores the whole grid with one score_pairs call."""
+        import run_experiment as module
+        checker = FakeSimilarityChecker()
+        monkeypatch.setattr(module, "LocalEmbeddingSimilarityChecker", lambda store=None: checker)
+
+        experiment = run_experiment(sentences=TEST_SENTENCES[:2], error_rates=[0.0, 0.5],
+                                    use_mock=True, verbose=False)
+
+        assert checker.score_calls == 1
+        result = experiment.results[-1]
+        assert result.similarity_score == pytest.approx(checker.cosine_similarity(
+            checker.get_embedding(result.original_sentence), checker.get_embedding(result.final_english)))
+        assert result.vector_distance == pytest.approx(1 - result.similarity_score)
+
+    def test_dedup_report_printed(self, fake_checker, capsys):
+        """Test that batched mode reports the work saved by deduplication."""
+        run_experiment(sentences=TEST_SENTENCES[:2], error_rates=[0.0, 0.0, 0.25],
+                       use_mock=True, verbose=True, batched=True)
+        output = capsys.readouterr().out
+
+        assert "Deduplication per hop" in output
+
+    def test_failed_batch_falls_back_per_cell(self, fake_checker, monkeypatch, capsys):
+        """Test that a failing batched hop loses only the cells that fail on their own."""
+        import run_experiment as module
+
+        def broken_batch(texts, **kwargs):
+            raise RuntimeError("batch rejected")
+
+        def flaky_pipeline(text, **kwargs):
+            if text == TEST_SENTENCES[1]:
+                raise RuntimeError("bad cell")
+            return run_translation_pipeline(text, **kwargs)
+
+        monkeypatch.setattr(module, "run_translation_pipeline_batch", broken_batch)
+        monkeypatch.setattr(module, "run_translation_pipeline", flaky_pipeline)
+        experiment = run_experiment(sentences=TEST_SENTENCES[:2], error_rates=[0.0, 0.5],
+                                    use_mock=True, verbose=True, batched=True)
+        output = capsys.readouterr().out
+
+        assert [(r.original_sentence, r.error_rate) for r in experiment.results] == \
+            [(TEST_SENTENCES[0], 0.0), (TEST_SENTENCES[0], 0.5), (TEST_SENTENCES[1], 0.5)]
+        assert all(r.hop_backends == dict.fromkeys(["en-fr", "fr-he", "he-en"], "mock")
+                   for r in experiment.results)
+        assert "batch rejected" in output and "bad cell" in output
+
+
+class TestHopMetrics:
+    """Test per-hop time and token accounting."""
+
+    @pytest.fixture
+    def fake_checker(self, monkeypatch):
+        import run_experiment as module
+        monkeypatch.setattr(module, "LocalEmbeddingSimilarityChecker", FakeSimilarityChecker)
+
+    def test_pipeline_records_every_hop(self):
+        """Test that mock hops record wall time and word counts."""
+        metrics = {}
+        french, hebrew, final = run_translation_pipeline("the beautiful sunset", use_mock=True,
+                                                         hop_metrics=metrics)
+
+        assert list(metrics) == ["en-fr", "fr-he", "he-en"]
+        assert metrics["en-fr"].input_tokens == 3
+        assert metrics["he-en"].output_tokens == len(final.split())
+        assert all(m.seconds >= 0 and m.billed_input_tokens == 0 for m in metrics.values())
+
+    def test_summary_per_hop_and_error_rate(self, fake_checker):
+        experiment = run_experiment(sentences=TEST_SENTENCES[:2], error_rates=[0.0, 0.5],
+                                    use_mock=True, verbose=False)
+        by_hop = experiment.summary['by_hop']
+
+        assert set(by_hop) == {"en-fr", "fr-he", "he-en"}
+        assert by_hop["en-fr"]["count"] == 4
+        assert by_hop["en-fr"]["input_tokens"] == sum(len(s.split()) for s in TEST_SENTENCES[:2]) * 2
+        assert experiment.summary['by_error_rate']['50%']['hops']["he-en"]["count"] == 2
+        assert not by_hop["en-fr"]["amortized"]
+
+    def test_batched_cells_share_hop_totals(self, fake_checker):
+        """Test that a batched hop's totals are split evenly over the grid."""
+        experiment = run_experiment(sentences=TEST_SENTENCES[:2], error_rates=[0.0, 0.0, 0.5],
+                                    use_mock=True, verbose=False, batched=True)
+        shares = [r.hop_metrics["en-fr"].input_tokens for r in experiment.results]
+
+        # Identical variants are translated once per hop
+        unique = {r.input_with_errors for r in experiment.results}
+        assert sum(shares) == pytest.approx(sum(len(t.split()) for t in unique))
+        assert len(set(shares)) == 1
+        assert all(r.hop_metrics["en-fr"].amortized for r in experiment.results)
+
+    def test_batched_shares_left_out_of_error_rate_summary(self, fake_checker):
+        """Test that amortized shares are labelled overall and not compared across error rates."""
+        experiment = run_experiment(sentences=TEST_SENTENCES[:2], error_rates=[0.0, 0.5],
+                                    use_mock=True, verbose=False, batched=True)
+
+        assert experiment.summary['by_hop']["en-fr"]["amortized"]
+        assert experiment.summary['by_hop']["en-fr"]["count"] == 4
+        assert all(stats['hops'] == {} for stats in experiment.summary['by_error_rate'].values())
+
+    def test_claude_billed_input_weights_cache_tokens(self, messages_stub):
+        pytest.importorskip("anthropic")
+
+        first, second = {}, {}
+        run_translation_pipeline("hello world", hop_metrics=first)
+        run_translation_pipeline("good morning", hop_metrics=second)
+
+        hop = second["en-fr"]
+        assert first["en-fr"].cache_write_tokens > 0 and first["en-fr"].cache_read_tokens == 0
+        assert hop.cache_read_tokens > 0
+        assert hop.billed_input_tokens == pytest.approx(hop.input_tokens + 0.1 * hop.cache_read_tokens)
+        assert first["en-fr"].billed_input_tokens == pytest.approx(
+            first["en-fr"].input_tokens + 1.25 * first["en-fr"].cache_write_tokens)
+
+
 class TestExperimentRunner:
     """Test the experiment runner."""
 
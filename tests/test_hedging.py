@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Hedged Translation module.
+
+Run with: pytest tests/test_hedging.py -v
+Or: python -m pytest tests/ -v
+"""
+
+import sys
+import os
+import time
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+from hedging import HedgedTranslator, latency_percentiles
+
+
+def backend(tag, delay=0.0, error=None):
+    """translate(text, agent_id) that sleeps, then answers or raises."""
+    calls = []
+
+    def translate(text, agent_id):
+        calls.append(text)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return f"{tag}({text})"
+
+    translate.calls = calls
+    return translate
+
+
+class TestPercentiles:
+    """Test nearest-rank percentiles."""
+
+    def test_percentiles(self):
+        stats = latency_percentiles([float(i) for i in range(1, 101)])
+
+        assert (stats["count"], stats["p50"], stats["p90"], stats["p99"], stats["max"]) == (100, 50.0, 90.0, 99.0, 100.0)
+
+    def test_empty(self):
+        assert latency_percentiles([])["count"] == 0
+
+
+class TestHedgedTranslator:
+    """Test deadlines, fallbacks and failures."""
+
+    def test_fast_primary_not_hedged(self):
+        fallback = backend("local")
+        with HedgedTranslator(backend("claude"), fallback, deadline=0.5) as hedger:
+            hop = hedger.translate("hello", "en-fr")
+
+        assert (hop.output, hop.backend, hop.hedged) == ("claude(hello)", "claude", False)
+        assert fallback.calls == []
+
+    def test_slow_primary_loses_to_fallback(self):
+        """Test that the fallback starts at the deadline and its result wins."""
+        with HedgedTranslator(backend("claude", delay=0.5), backend("local"), deadline=0.05) as hedger:
+            hop = hedger.translate("hello", "en-fr")
+
+            assert (hop.output, hop.backend, hop.hedged) == ("local(hello)", "local", True)
+            assert hop.seconds < 0.4
+
+    def test_hedged_primary_can_still_win(self):
+        with HedgedTranslator(backend("claude", delay=0.1), backend("local", delay=0.5), deadline=0.02) as hedger:
+            hop = hedger.translate("hello", "en-fr")
+
+        assert (hop.backend, hop.hedged) == ("claude", True)
+
+    def test_failing_primary_falls_back_immediately(self):
+        fallback = backend("local")
+        with HedgedTranslator(backend("claude", error=RuntimeError("429")), fallback, deadline=5.0) as hedger:
+            start = time.perf_counter()
+            hop = hedger.translate("hello", "en-fr")
+
+        assert hop.backend == "local"
+        assert time.perf_counter() - start < 1.0
+
+    def test_both_failing_raises_primary_error(self):
+        hedger = HedgedTranslator(backend("claude", error=RuntimeError("primary")),
+                                  backend("local", error=RuntimeError("fallback")), deadline=0.0)
+
+        with pytest.raises(RuntimeError, match="primary"):
+            hedger.translate("hello", "en-fr")
+        hedger.close()
+
+    def test_report_includes_losing_primaries(self):
+        """Test that 'before' keeps Claude's tail latency even when it lost."""
+        hedger = HedgedTranslator(backend("claude", delay=0.3), backend("local"), deadline=0.05)
+        for _ in range(3):
+            hedger.translate("hello", "he-en")
+        hedger.close()
+
+        report = hedger.latency_report()["he-en"]
+        assert report["before"]["count"] == 3
+        assert report["before"]["p99"] >= 0.3
+        assert report["after"]["p99"] < 0.3
+        assert (report["hedged"], report["fallback_wins"]) == (3, 3)
+
+    def test_rejects_negative_deadline(self):
+        with pytest.raises(ValueError):
+            HedgedTranslator(backend("claude"), backend("local"), deadline=-1)
+
+
+class TestHedgedPipeline:
+    """Test --hedge-deadline through run_translation_pipeline and the stub server."""
+
+    def test_slow_claude_hops_answered_locally(self, messages_stub, fake_marian):
+        pytest.importorskip("anthropic")
+        from run_experiment import make_hedger, run_translation_pipeline
+
+        messages_stub.latency = 0.5
+        local = fake_marian.LocalTranslationPipeline(verbose=False)
+        local.preload()
+        hedger = make_hedger(local, deadline=0.05)
+
+        hop_backends = {}
+        french, hebrew, final = run_translation_pipeline("hello world", hedger=hedger, hop_backends=hop_backends)
+        hedger.close()
+
+        assert hop_backends == {"en-fr": "local", "fr-he": "local", "he-en": "local"}
+        assert "translated(" not in final
+        assert hedger.latency_report()["en-fr"]["before"]["count"] == 1
+
+    def test_unhedged_backends_recorded(self):
+        from run_experiment import run_translation_pipeline
+
+        hop_backends = {}
+        run_translation_pipeline("hello world", use_mock=True, hop_backends=hop_backends)
+
+        assert set(hop_backends.values()) == {"mock"}
+
+    def test_hedging_requires_claude_mode(self):
+        from run_experiment import run_experiment
+
+        with pytest.raises(ValueError):
+            run_experiment(["x " * 20], use_mock=True, hedge_deadline=1.0, verbose=False)
+        with pytest.raises(ValueError):
+            run_experiment(["x " * 20], pack_size=4, hedge_deadline=1.0, verbose=False)
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Local Translation Agents module.
+
+Run with: pytest tests/test_local_translation_agents.py -v
+Or: python -m pytest tests/ -v
+
+Note: These tests use the fake MarianMT models from conftest.py,
+so no model downloads are needed.
+"""
+
+import sys
+import os
+import time
+import types
+import threading
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from local_translation_agents import (
+        LocalTranslationPipeline,
+        InferenceConfig,
+        HopStats,
+        quantize_int8,
+        current_rss_mb,
+        estimate_resident_mb,
+        ModelManager
+    )
+    LOCAL_AGENTS_AVAILABLE = True
+except (ImportError, SystemExit):
+    LOCAL_AGENTS_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not LOCAL_AGENTS_AVAILABLE,
+    reason="transformers not installed"
+)
+
+
+class TestBatchTranslation:
+    """Test translate_batch() and run_pipeline_batch()."""
+
+    @pytest.fixture
+    def pipeline(self, fake_marian):
+        return LocalTranslationPipeline(verbose=False)
+
+    def test_translate_batch_empty(self, pipeline):
+        """Test that an empty batch returns an empty list."""
+        assert pipeline.translate_batch([], "en-fr") == []
+
+    def test_translate_batch_preserves_order(self, pipeline):
+        """Test that outputs come back in input order despite length sorting."""
+        texts = ["a b c d e", "a", "a b c", "a b"]
+        results = pipeline.translate_batch(texts, "en-fr")
+
+        assert results == [f"en-fr({t})" for t in texts]
+
+    def test_translate_batch_matches_translate(self, pipeline):
+        """Test that batched and single translation agree."""
+        texts = ["The beautiful sunset", "Every morning the student walks"]
+        batched = pipeline.translate_batch(texts, "en-fr")
+
+        assert batched == [pipeline.translate(t, "en-fr") for t in texts]
+
+    def test_translate_batch_respects_token_budget(self, pipeline):
+        """Test that no padded batch exceeds max_batch_tokens."""
+        texts = ["w " * n for n in (1, 7, 3, 2, 9, 4, 5, 8, 6)]
+        pipeline.translate_batch(texts, "en-fr", max_batch_tokens=20)
+
+        shapes = pipeline.agents["en-fr"].model.generate_shapes
+        assert sum(rows for rows, _ in shapes) == len(texts)
+        assert all(rows * width <= 20 for rows, width in shapes)
+
+    def test_oversized_input_gets_own_batch(self, pipeline):
+        """Test that an input longer than the budget is still translated."""
+        texts = ["a b", "w " * 30]
+        results = pipeline.translate_batch(texts, "en-fr", max_batch_tokens=8)
+
+        assert len(results) == 2
+        assert len(pipeline.agents["en-fr"].model.generate_shapes) == 2
+
+    def test_length_buckets_sorted(self):
+        """Test that buckets group indices by ascending length."""
+        batches = LocalTranslationPipeline._length_buckets([5, 1, 3, 1], max_batch_tokens=6)
+
+        assert [i for batch in batches for i in batch] == [1, 3, 2, 0]
+
+    def test_run_pipeline_batch(self, pipeline):
+        """Test that each hop is applied in order for every input."""
+        results = pipeline.run_pipeline_batch(["hello world", "good morning"])
+
+        assert results[0] == (
+            "en-fr(hello world)",
+            "fr-he(en-fr(hello world))",
+            "he-en(fr-he(en-fr(hello world)))",
+        )
+        assert len(results) == 2
+
+    def test_duplicates_generated_once(self, pipeline):
+        """Test that repeated texts share one generation and are counted."""
+        results = pipeline.translate_batch(["a b", "c", "a b", "a b"], "en-fr")
+
+        assert results == ["en-fr(a b)", "en-fr(c)", "en-fr(a b)", "en-fr(a b)"]
+        assert sum(shape[0] for shape in pipeline.agents["en-fr"].model.generate_shapes) == 2
+        assert pipeline.dedup_stats["en-fr"].saved == 2
+
+    def test_run_pipeline_batch_matches_run_pipeline(self, pipeline):
+        """Test that the batched pipeline matches the per-sentence pipeline."""
+        text = "The magnificent golden sunset"
+        assert pipeline.run_pipeline_batch([text])[0] == pipeline.run_pipeline(text)
+
+
+class TestInferenceConfig:
+    """Test inference-mode execution and decoding settings."""
+
+    def test_default_kwargs_use_model_config(self):
+        """Test that unset decoding settings are not passed to generate()."""
+        assert InferenceConfig().generation_kwargs("en-fr") == {}
+
+    def test_greedy_disables_sampling(self):
+        """Test that num_beams=1 requests plain greedy decoding."""
+        kwargs = InferenceConfig(num_beams=1, max_new_tokens=64).generation_kwargs("en-fr")
+
+        assert kwargs == {"num_beams": 1, "max_new_tokens": 64, "do_sample": False}
+
+    def test_agent_overrides(self):
+        """Test that per-agent settings override the defaults."""
+        config = InferenceConfig(num_beams=1, max_new_tokens=64,
+                                 agent_overrides={"he-en": {"num_beams": 4, "max_new_tokens": 128}})
+
+        assert config.generation_kwargs("en-fr")["max_new_tokens"] == 64
+        assert config.generation_kwargs("he-en") == {"num_beams": 4, "max_new_tokens": 128}
+
+    def test_models_loaded_in_eval_mode(self, fake_marian):
+        """Test that load_agent switches models to eval mode."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        agent = pipeline.load_agent("en-fr")
+
+        assert agent.model.training is False
+
+    def test_generate_runs_in_inference_mode(self, fake_marian):
+        """Test that generate() runs without autograd by default."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        pipeline.translate("hello world", "en-fr")
+
+        assert pipeline.agents["en-fr"].model.inference_mode_calls == [True]
+
+    def test_inference_mode_can_be_disabled(self, fake_marian):
+        """Test that inference_mode=False runs generate() normally."""
+        pipeline = LocalTranslationPipeline(verbose=False,
+                                            inference=InferenceConfig(inference_mode=False))
+        pipeline.translate("hello world", "en-fr")
+
+        assert pipeline.agents["en-fr"].model.inference_mode_calls == [False]
+
+    def test_generation_kwargs_reach_model(self, fake_marian):
+        """Test that decoding settings are passed through to generate()."""
+        config = InferenceConfig(num_beams=1, agent_overrides={"en-fr": {"max_new_tokens": 16}})
+        pipeline = LocalTranslationPipeline(verbose=False, inference=config)
+        pipeline.translate("hello world", "en-fr")
+
+        assert pipeline.agents["en-fr"].model.generate_kwargs == [
+            {"num_beams": 1, "max_new_tokens": 16, "do_sample": False}
+        ]
+
+
+class TestThroughputReport:
+    """Test per-hop token and timing accounting."""
+
+    def test_hop_stats_recorded_per_agent(self, fake_marian):
+        """Test that each hop records its own token counts."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        pipeline.run_pipeline_batch(["a b c", "d e"])
+
+        report = pipeline.throughput_report()
+        assert set(report) == {"en-fr", "fr-he", "he-en"}
+        # Fake tokenizer: one id per word plus </s>
+        assert report["en-fr"]["input_tokens"] == 7
+        assert report["en-fr"]["output_tokens"] == 7
+        assert report["en-fr"]["calls"] == 1
+
+    def test_tokens_per_second(self):
+        """Test tokens/sec calculation and the zero-time guard."""
+        stats = HopStats()
+        assert stats.tokens_per_second == 0.0
+
+        stats.record(input_tokens=10, output_tokens=50, seconds=0.5)
+        assert stats.tokens_per_second == pytest.approx(100.0)
+
+
+class TestQuantization:
+    """Test the opt-in int8 quantization mode."""
+
+    def test_unknown_mode_rejected(self):
+        """Test that unsupported quantize modes raise ValueError."""
+        with pytest.raises(ValueError):
+            LocalTranslationPipeline(verbose=False, quantize="fp16")
+
+    def test_default_is_fp32(self, fake_marian, monkeypatch):
+        """Test that models are not quantized unless requested."""
+        calls = []
+        monkeypatch.setattr(fake_marian, "quantize_int8", lambda m: calls.append(m) or m)
+        LocalTranslationPipeline(verbose=False).load_agent("en-fr")
+
+        assert calls == []
+
+    def test_int8_applied_on_load(self, fake_marian, monkeypatch):
+        """Test that quantize="int8" quantizes each loaded agent."""
+        calls = []
+        monkeypatch.setattr(fake_marian, "quantize_int8", lambda m: calls.append(m) or m)
+        pipeline = LocalTranslationPipeline(verbose=False, quantize="int8")
+        pipeline.run_pipeline_batch(["hello world"])
+
+        assert len(calls) == 3
+
+    def test_quantize_int8_replaces_linear_layers(self):
+        """Test that Linear layers become dynamic int8 Linear layers."""
+        import torch
+        model = torch.nn.Sequential(torch.nn.Linear(8, 8), torch.nn.ReLU(), torch.nn.Linear(8, 2)).eval()
+        quantized = quantize_int8(model)
+
+        assert not isinstance(quantized[0], torch.nn.Linear)
+        assert quantized[0].weight().dtype == torch.qint8
+        assert quantized(torch.randn(3, 8)).shape == (3, 2)
+
+    def test_current_rss_mb(self):
+        """Test that the RSS probe returns a non-negative size."""
+        assert current_rss_mb() >= 0.0
+
+
+class TestPreload:
+    """Test parallel model preloading and warmup."""
+
+    def test_preload_all_agents(self, fake_marian):
+        """Test that preload() loads every agent by default."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        timings = pipeline.preload()
+
+        assert set(pipeline.agents) == {"en-fr", "fr-he", "he-en"}
+        assert set(timings) == {"en-fr", "fr-he", "he-en"}
+        assert all(t["load_seconds"] >= 0 and t["warmup_seconds"] >= 0 for t in timings.values())
+
+    def test_preload_subset_without_warmup(self, fake_marian):
+        """Test loading selected agents with warmup disabled."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        timings = pipeline.preload(agents=["he-en"], warmup=False)
+
+        assert list(pipeline.agents) == ["he-en"]
+        assert "warmup_seconds" not in timings["he-en"]
+        assert pipeline.agents["he-en"].model.generate_shapes == []
+
+    def test_warmup_runs_one_generation(self, fake_marian):
+        """Test that warmup generates once per agent without touching hop stats."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        pipeline.preload()
+
+        assert all(len(agent.model.generate_shapes) == 1 for agent in pipeline.agents.values())
+        assert pipeline.throughput_report() == {}
+
+    def test_parallel_loads_overlap(self, fake_marian, monkeypatch):
+        """Test that parallel=True loads the three models concurrently."""
+        barrier = threading.Barrier(3, timeout=5)
+        original = fake_marian.MarianMTModel.from_pretrained
+
+        def from_pretrained(model_name, **kwargs):
+            # Each load waits for the other two; a serial preload would time out
+            barrier.wait()
+            return original(model_name)
+
+        monkeypatch.setattr(fake_marian.MarianMTModel, "from_pretrained", from_pretrained)
+        LocalTranslationPipeline(verbose=False).preload(parallel=True, warmup=False)
+
+    def test_concurrent_loads_of_one_agent(self, fake_marian, monkeypatch):
+        """Test that threads asking for the same agent at once share one load."""
+        loads = []
+        original = fake_marian.MarianMTModel.from_pretrained
+
+        def from_pretrained(model_name, **kwargs):
+            loads.append(model_name)
+            time.sleep(0.05)
+            return original(model_name)
+
+        monkeypatch.setattr(fake_marian.MarianMTModel, "from_pretrained", from_pretrained)
+        pipeline = LocalTranslationPipeline(verbose=False)
+        threads = [threading.Thread(target=pipeline.load_agent, args=("en-fr",)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1
+        assert pipeline.models.stats()["en-fr"]["loads"] == 1
+
+    def test_unknown_agent_rejected(self, fake_marian):
+        """Test that preload() validates agent ids before loading."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        with pytest.raises(ValueError):
+            pipeline.preload(agents=["en-fr", "en-de"])
+        assert pipeline.agents == {}
+
+
+class TestModelManager:
+    """Test memory-budgeted agent residency."""
+
+    @pytest.fixture
+    def sized(self, fake_marian, monkeypatch):
+        """Give every fake agent a resident size of 100 MB."""
+        import local_translation_agents
+        monkeypatch.setattr(local_translation_agents, "estimate_resident_mb", lambda model: 100.0)
+
+    def test_unlimited_by_default(self, sized):
+        """Test that without a budget all agents stay loaded."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        pipeline.run_pipeline("hello world")
+
+        assert set(pipeline.agents) == {"en-fr", "fr-he", "he-en"}
+        assert pipeline.models.resident_mb() == 300.0
+
+    def test_lru_agent_evicted(self, sized):
+        """Test that loading past the budget evicts the least recently used agent."""
+        pipeline = LocalTranslationPipeline(verbose=False, memory_budget_mb=250)
+        pipeline.translate("a", "en-fr")
+        pipeline.translate("b", "fr-he")
+        pipeline.translate("c", "en-fr")   # fr-he is now least recently used
+        pipeline.translate("d", "he-en")
+
+        assert list(pipeline.agents) == ["en-fr", "he-en"]
+        assert pipeline.models.resident_mb() <= 250
+
+    def test_evicted_agent_reloaded_on_demand(self, sized):
+        """Test that an evicted agent is transparently reloaded."""
+        pipeline = LocalTranslationPipeline(verbose=False, memory_budget_mb=150)
+        expected = LocalTranslationPipeline(verbose=False).run_pipeline("hello world")
+
+        assert pipeline.run_pipeline("hello world") == expected
+        assert pipeline.run_pipeline("hello world") == expected
+        stats = pipeline.models.stats()
+        assert list(pipeline.agents) == ["he-en"]
+        assert stats["en-fr"]["loads"] == 2
+        assert stats["en-fr"]["evictions"] == 2
+        assert stats["he-en"]["loaded"]
+
+    def test_oversized_agent_kept_alone(self):
+        """Test that an agent larger than the budget still loads."""
+        manager = ModelManager(budget_mb=50)
+        manager.add("en-fr", object(), 80.0)
+        evicted = manager.add("fr-he", object(), 80.0)
+
+        assert evicted == ["en-fr"]
+        assert list(manager.agents) == ["fr-he"]
+
+    def test_manual_evict(self):
+        """Test explicit unloading."""
+        manager = ModelManager()
+        manager.add("en-fr", object(), 10.0)
+
+        assert manager.evict("en-fr")
+        assert not manager.evict("en-fr")
+        assert manager.stats()["en-fr"] == {"loaded": False, "resident_mb": 10.0, "loads": 1, "evictions": 1}
+
+    def test_invalid_budget(self):
+        """Test that a non-positive budget is rejected."""
+        with pytest.raises(ValueError):
+            ModelManager(budget_mb=0)
+
+    def test_estimate_resident_mb(self):
+        """Test tensor-byte accounting for fp32 and int8 models."""
+        import torch
+        model = torch.nn.Sequential(torch.nn.Linear(512, 512))
+        fp32_mb = estimate_resident_mb(model)
+        int8_mb = estimate_resident_mb(quantize_int8(model))
+
+        assert fp32_mb == pytest.approx((512 * 512 + 512) * 4 / (1024 * 1024))
+        assert int8_mb < fp32_mb / 2
+        assert estimate_resident_mb(object()) is None
+
+
+class TestStreaming:
+    """Test token streaming from the local agents."""
+
+    def test_stream_matches_translate(self, fake_marian):
+        """Test that the streamed hop returns the normal translation."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        chunks = []
+        result = pipeline.translate_stream("one two three", "en-fr", on_text=chunks.append)
+
+        assert result == pipeline.translate("one two three", "en-fr")
+        assert "".join(chunks) == result
+        assert len(chunks) > 1
+
+    def test_stream_forces_greedy(self, fake_marian):
+        """Test that streaming decodes a single hypothesis."""
+        pipeline = LocalTranslationPipeline(verbose=False, inference=InferenceConfig(num_beams=4))
+        pipeline.translate_stream("hello", "en-fr")
+
+        kwargs = pipeline.agents["en-fr"].model.generate_kwargs[-1]
+        assert kwargs["num_beams"] == 1
+        assert kwargs["do_sample"] is False
+
+    def test_stream_timings(self, fake_marian):
+        """Test per-hop latency records for the streamed pipeline."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        final = pipeline.run_pipeline_stream("hello world")[2]
+
+        assert final == pipeline.run_pipeline("hello world")[2]
+        assert [t.agent_id for t in pipeline.stream_timings] == ["en-fr", "fr-he", "he-en"]
+        assert all(0 <= t.time_to_first_token <= t.total_seconds for t in pipeline.stream_timings)
+        assert pipeline.hop_stats["en-fr"].calls == 2
+
+    def test_stream_error_propagates(self, fake_marian, monkeypatch):
+        """Test that a failing generate() raises instead of hanging."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        model = pipeline.load_agent("en-fr").model
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("out of memory")
+
+        monkeypatch.setattr(model, "generate", broken)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            pipeline.translate_stream("hello", "en-fr")
+
+    def test_stream_requires_transformers(self):
+        """Test that the ctranslate2 backend refuses to stream."""
+        with pytest.raises(ValueError):
+            LocalTranslationPipeline(verbose=False, backend="ctranslate2").translate_stream("hi", "en-fr")
+
+
+class TestTruncationWarning:
+    """Test that every translation path warns about inputs over MAX_INPUT_LENGTH."""
+
+    @pytest.fixture
+    def pipeline(self, fake_marian):
+        return LocalTranslationPipeline(verbose=False)
+
+    @staticmethod
+    def words(pipeline, extra):
+        # The fake tokenizer adds one EOS token per input
+        return " ".join(f"w{i}" for i in range(pipeline.MAX_INPUT_LENGTH - 1 + extra))
+
+    def test_translate_without_cache_warns(self, pipeline):
+        with pytest.warns(UserWarning, match="truncated"):
+            pipeline.translate(self.words(pipeline, 1), "en-fr")
+
+    def test_run_pipeline_warns(self, pipeline):
+        with pytest.warns(UserWarning, match="en-fr: 1 input"):
+            pipeline.run_pipeline(self.words(pipeline, 10))
+
+    def test_stream_warns(self, pipeline):
+        with pytest.warns(UserWarning, match="truncated"):
+            pipeline.translate_stream(self.words(pipeline, 1), "en-fr")
+
+    def test_batches_not_retokenized_for_check(self, pipeline, monkeypatch):
+        """Test that the truncation check tokenizes each input once, not once per batch."""
+        tokenizer = pipeline.load_agent("en-fr").tokenizer
+        untruncated = []
+        original = type(tokenizer).__call__
+
+        def counting_call(self, texts, **kwargs):
+            if not kwargs.get("truncation"):
+                untruncated.append(list(texts))
+            return original(self, texts, **kwargs)
+
+        monkeypatch.setattr(type(tokenizer), "__call__", counting_call)
+        texts = [f"sentence number {i}" for i in range(6)]
+        pipeline.translate_batch(texts, "en-fr", max_batch_tokens=8)
+
+        assert untruncated == [texts]
+
+    def test_input_at_limit_not_flagged(self, pipeline, recwarn):
+        """Test that an input of exactly MAX_INPUT_LENGTH tokens is not reported."""
+        pipeline.translate(self.words(pipeline, 0), "en-fr")
+        pipeline.translate_batch([self.words(pipeline, 0)], "en-fr")
+
+        assert not [w for w in recwarn if "truncated" in str(w.message)]
+
+
+class FakeCT2Translator:
+    """Echo translator with the ctranslate2.Translator API we use."""
+
+    def __init__(self, model_path, device="cpu", compute_type="default", intra_threads=0):
+        self.model_path = model_path
+        self.compute_type = compute_type
+        self.calls = []
+
+    def translate_batch(self, source, beam_size=2, max_decoding_length=256):
+        self.calls.append({"beam_size": beam_size, "max_decoding_length": max_decoding_length})
+        # CTranslate2 hypotheses exclude the end-of-sentence token
+        return [types.SimpleNamespace(hypotheses=[[t for t in tokens if t != "</s>"]]) for tokens in source]
+
+
+class TestCTranslate2Backend:
+    """Test the ctranslate2 backend against a fake ctranslate2 module."""
+
+    @pytest.fixture
+    def fake_ct2(self, fake_marian, monkeypatch):
+        conversions = []
+
+        class FakeConverter:
+            def __init__(self, model_name):
+                self.model_name = model_name
+
+            def convert(self, output_dir, force=False):
+                conversions.append(self.model_name)
+                os.makedirs(output_dir, exist_ok=True)
+                open(os.path.join(output_dir, "model.bin"), "w").close()
+                return output_dir
+
+        module = types.SimpleNamespace(
+            Translator=FakeCT2Translator,
+            converters=types.SimpleNamespace(TransformersConverter=FakeConverter)
+        )
+        monkeypatch.setitem(sys.modules, "ctranslate2", module)
+        return conversions
+
+    def test_unknown_backend_rejected(self):
+        """Test that unsupported backends raise ValueError."""
+        with pytest.raises(ValueError):
+            LocalTranslationPipeline(verbose=False, backend="onnx")
+
+    def test_ct2_matches_transformers(self, fake_ct2, tmp_path):
+        """Test that both backends keep the run_pipeline contract."""
+        text = "The magnificent golden sunset"
+        ct2 = LocalTranslationPipeline(verbose=False, backend="ctranslate2", cache_dir=str(tmp_path))
+        reference = LocalTranslationPipeline(verbose=False)
+
+        assert ct2.run_pipeline(text) == reference.run_pipeline(text)
+        assert ct2.run_pipeline_batch([text, "a b"]) == reference.run_pipeline_batch([text, "a b"])
+
+    def test_conversion_cached(self, fake_ct2, tmp_path):
+        """Test that models are converted once and then loaded from the cache."""
+        LocalTranslationPipeline(verbose=False, backend="ctranslate2",
+                                 cache_dir=str(tmp_path)).load_agent("en-fr")
+        LocalTranslationPipeline(verbose=False, backend="ctranslate2",
+                                 cache_dir=str(tmp_path)).load_agent("en-fr")
+
+        assert fake_ct2 == [LocalTranslationPipeline.MODELS["en-fr"]]
+        model_dir = os.path.join(str(tmp_path), "Helsinki-NLP--opus-mt-en-fr")
+        assert os.path.exists(os.path.join(model_dir, "model.bin"))
+
+    def test_stale_model_dir_replaced(self, fake_ct2, tmp_path):
+        """Test that a cache directory without model.bin is converted again, not fatal."""
+        model_dir = os.path.join(str(tmp_path), "Helsinki-NLP--opus-mt-en-fr")
+        os.makedirs(model_dir)
+        open(os.path.join(model_dir, "config.json"), "w").close()
+
+        LocalTranslationPipeline(verbose=False, backend="ctranslate2",
+                                 cache_dir=str(tmp_path)).load_agent("en-fr")
+
+        assert os.path.exists(os.path.join(model_dir, "model.bin"))
+        assert sorted(os.listdir(str(tmp_path))) == ["Helsinki-NLP--opus-mt-en-fr"]
+
+    def test_concurrent_conversion_reuses_winner(self, fake_ct2, tmp_path, monkeypatch):
+        """Test that losing the race to another converter still loads the model."""
+        import local_translation_agents as module
+
+        model_dir = os.path.join(str(tmp_path), "Helsinki-NLP--opus-mt-en-fr")
+
+        def raced_replace(src, dst):
+            # The other process moves its conversion in first
+            os.makedirs(dst)
+            open(os.path.join(dst, "model.bin"), "w").close()
+            raise OSError(39, "Directory not empty")
+
+        monkeypatch.setattr(module.os, "replace", raced_replace)
+        LocalTranslationPipeline(verbose=False, backend="ctranslate2",
+                                 cache_dir=str(tmp_path)).load_agent("en-fr")
+
+        assert sorted(os.listdir(str(tmp_path))) == ["Helsinki-NLP--opus-mt-en-fr"]
+        assert os.path.exists(os.path.join(model_dir, "model.bin"))
+
+    def test_decoding_settings(self, fake_ct2, tmp_path):
+        """Test that beam size and length caps reach translate_batch()."""
+        config = InferenceConfig(num_beams=1, max_new_tokens=32)
+        pipeline = LocalTranslationPipeline(verbose=False, backend="ctranslate2",
+                                            cache_dir=str(tmp_path), inference=config, quantize="int8")
+        pipeline.translate("hello world", "en-fr")
+
+        translator = pipeline.agents["en-fr"].model
+        assert translator.calls == [{"beam_size": 1, "max_decoding_length": 32}]
+        assert translator.compute_type == "int8"
+        assert pipeline.throughput_report()["en-fr"]["output_tokens"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
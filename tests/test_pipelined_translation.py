@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Pipelined Translation module.
+
+Run with: pytest tests/test_pipelined_translation.py -v
+Or: python -m pytest tests/ -v
+
+Note: These tests use the fake MarianMT models from conftest.py.
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from local_translation_agents import LocalTranslationPipeline
+    from pipelined_translation import PipelinedExecutor
+    PIPELINED_AVAILABLE = True
+except (ImportError, SystemExit):
+    PIPELINED_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not PIPELINED_AVAILABLE,
+    reason="transformers not installed"
+)
+
+
+@pytest.fixture
+def pipeline(fake_marian):
+    return LocalTranslationPipeline(verbose=False)
+
+
+class TestPipelinedExecutor:
+    """Test the overlapped three-stage executor."""
+
+    def test_results_match_run_pipeline(self, pipeline):
+        """Test that pipelined results match run_pipeline() in input order."""
+        texts = [f"sentence number {i}" for i in range(20)]
+        results = PipelinedExecutor(pipeline, queue_size=2).run_all(texts)
+
+        assert results == [pipeline.run_pipeline(t) for t in texts]
+
+    def test_micro_batching(self, pipeline):
+        """Test that batch_size groups waiting items without changing results."""
+        texts = [f"w{i} x y" for i in range(12)]
+        executor = PipelinedExecutor(pipeline, queue_size=8, batch_size=4)
+
+        assert executor.run_all(texts) == pipeline.run_pipeline_batch(texts)
+        assert all(s.items == 12 for s in executor.stage_stats.values())
+        assert all(s.batches <= 12 for s in executor.stage_stats.values())
+
+    def test_empty_input(self, pipeline):
+        """Test that an empty stream finishes cleanly."""
+        assert PipelinedExecutor(pipeline).run_all([]) == []
+
+    def test_stages_overlap(self, pipeline, monkeypatch):
+        """Test that sentence k+1 is on hop 1 while sentence k is on hop 2."""
+        second_on_hop2 = threading.Event()
+        original = pipeline.translate_batch
+
+        def translate_batch(texts, agent_id, *args, **kwargs):
+            if agent_id == "fr-he":
+                second_on_hop2.set()
+            if agent_id == "en-fr" and texts == ["second"]:
+                # Only returns if FR->HE starts while EN->FR is still busy
+                assert second_on_hop2.wait(timeout=5)
+            return original(texts, agent_id, *args, **kwargs)
+
+        monkeypatch.setattr(pipeline, "translate_batch", translate_batch)
+        results = PipelinedExecutor(pipeline).run_all(["first", "second"])
+
+        assert len(results) == 2
+
+    def test_back_pressure(self, pipeline):
+        """Test that bounded queues stop the feeder running far ahead."""
+        consumed = []
+
+        def stream():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"text {i}"
+
+        executor = PipelinedExecutor(pipeline, queue_size=1)
+        results = executor.run(stream())
+        next(results)
+        time.sleep(0.3)
+
+        # 4 queues + 3 stages + 1 yielded + 1 blocked in the feeder, with slack
+        assert len(consumed) < 15
+        results.close()
+
+    def test_stage_error_propagates(self, pipeline, monkeypatch):
+        """Test that a failing hop raises in the consumer."""
+        original = pipeline.translate_batch
+
+        def translate_batch(texts, agent_id, *args, **kwargs):
+            if agent_id == "fr-he":
+                raise RuntimeError("model crashed")
+            return original(texts, agent_id, *args, **kwargs)
+
+        monkeypatch.setattr(pipeline, "translate_batch", translate_batch)
+        with pytest.raises(RuntimeError, match="fr-he"):
+            PipelinedExecutor(pipeline).run_all(["a", "b", "c"])
+
+    def test_early_stop_shuts_down_threads(self, pipeline):
+        """Test that abandoning iteration stops the worker threads."""
+        before = threading.active_count()
+        results = PipelinedExecutor(pipeline, queue_size=1).run(f"text {i}" for i in range(100))
+        next(results)
+        results.close()
+
+        assert threading.active_count() == before
+
+    def test_invalid_sizes_rejected(self, pipeline):
+        """Test that zero-sized queues or batches are rejected."""
+        with pytest.raises(ValueError):
+            PipelinedExecutor(pipeline, queue_size=0)
+        with pytest.raises(ValueError):
+            PipelinedExecutor(pipeline, batch_size=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
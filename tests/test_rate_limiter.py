@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Rate Limiter module.
+
+Run with: pytest tests/test_rate_limiter.py -v
+Or: python -m pytest tests/ -v
+
+Note: The retry tests talk to the stub Messages API from conftest.py,
+which can answer with 429 and 529 errors.
+"""
+
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    import anthropic
+    from rate_limiter import (
+        TokenBucket, RateLimitScheduler, estimate_input_tokens, get_scheduler, configure_scheduler
+    )
+    from claude_client import get_client
+    RATE_LIMITER_AVAILABLE = True
+except (ImportError, SystemExit):
+    RATE_LIMITER_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not RATE_LIMITER_AVAILABLE,
+    reason="anthropic not installed"
+)
+
+
+REQUEST = {"model": "claude-test", "max_tokens": 16,
+           "messages": [{"role": "user", "content": "Translate:\n\nhello"}]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test refill and reservation arithmetic."""
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket admits a burst, then callers queue in order."""
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=120, burst_seconds=1.0, clock=clock)  # 2/s, capacity 2
+
+        assert [bucket.reserve(1) for _ in range(4)] == pytest.approx([0.0, 0.0, 0.5, 1.0])
+
+    def test_refill_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=60, burst_seconds=1.0, clock=clock)
+        bucket.reserve(1)
+        clock.now = 10.0
+
+        assert bucket.reserve(1) == 0.0
+        assert bucket.level == pytest.approx(0.0)
+
+    def test_large_reservation_waits_proportionally(self):
+        """Test that a request bigger than the burst waits for its own tokens."""
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=600, burst_seconds=1.0, clock=clock)  # 10/s, capacity 10
+
+        assert bucket.reserve(50) == pytest.approx(4.0)
+
+    def test_adjust_returns_overestimate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=600, clock=clock)
+        bucket.reserve(30)
+        bucket.adjust(-20)
+
+        assert bucket.level == pytest.approx(0.0)
+
+    def test_rejects_zero_budget(self):
+        with pytest.raises(ValueError):
+            TokenBucket(per_minute=0)
+
+
+class TestBackoff:
+    """Test retry delays."""
+
+    def test_exponential_full_jitter(self):
+        scheduler = RateLimitScheduler(base_delay=1.0, max_delay=5.0)
+        delays = [scheduler.backoff_delay(4) for _ in range(200)]
+
+        assert all(0.0 <= d <= 5.0 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_honors_retry_after(self):
+        scheduler = RateLimitScheduler()
+
+        assert 3.0 <= scheduler.backoff_delay(1, retry_after=3.0) <= 3.3
+
+    def test_estimate_input_tokens(self):
+        assert estimate_input_tokens({"messages": [{"role": "user", "content": "x" * 400}]}) >= 100
+
+
+class TestPacing:
+    """Test that requests are spread to fit the budget."""
+
+    def test_rpm_budget_paces_and_reports_queue(self):
+        """Test that waiting for budget is counted as queue time, not model time."""
+        scheduler = RateLimitScheduler(rpm=600, burst_seconds=0.1)  # 10/s, one at once
+        message = SimpleNamespace(usage=SimpleNamespace(input_tokens=1, output_tokens=1))
+
+        start = time.perf_counter()
+        for _ in range(4):
+            scheduler.call(lambda: message, REQUEST, hop="en-fr")
+        elapsed = time.perf_counter() - start
+
+        stats = scheduler.hops["en-fr"]
+        assert elapsed >= 0.25
+        assert stats.queue_seconds >= 0.25
+        assert stats.model_seconds < 0.05
+
+    def test_no_budget_no_wait(self):
+        scheduler = RateLimitScheduler(rpm=None, tpm=None)
+        message = SimpleNamespace(usage=None)
+        for _ in range(20):
+            scheduler.call(lambda: message, REQUEST)
+
+        assert scheduler.hops["claude"].queue_seconds == 0.0
+
+
+class TestRetriesAgainstStub:
+    """Test retries against a stub server that answers 429 and 529."""
+
+    def test_429_retried_with_retry_after(self, messages_stub):
+        """Test that throttled requests wait retry-after and then succeed."""
+        messages_stub.throttle = [429, 429]
+        messages_stub.retry_after = 0.2
+        scheduler = RateLimitScheduler(max_retries=3)
+
+        message = scheduler.create(get_client(), REQUEST, hop="en-fr")
+
+        stats = scheduler.hops["en-fr"]
+        assert message.content[0].text == "translated(hello)"
+        assert (stats.requests, stats.attempts, stats.rate_limited) == (1, 3, 2)
+        assert stats.backoff_seconds >= 0.4
+        assert len(messages_stub.requests) == 3
+
+    def test_overloaded_retried_with_backoff(self, messages_stub):
+        messages_stub.throttle = [529]
+        scheduler = RateLimitScheduler(base_delay=0.01)
+
+        scheduler.create(get_client(), REQUEST)
+
+        assert scheduler.hops["claude"].errors == 1
+        assert scheduler.hops["claude"].retries == 1
+
+    def test_gives_up_after_max_retries(self, messages_stub):
+        messages_stub.throttle = [429] * 5
+        scheduler = RateLimitScheduler(max_retries=2, base_delay=0.01)
+
+        with pytest.raises(anthropic.RateLimitError):
+            scheduler.create(get_client(), REQUEST)
+        assert scheduler.hops["claude"].failed == 1
+        assert len(messages_stub.requests) == 3
+
+    def test_non_retryable_raises_immediately(self, messages_stub):
+        scheduler = RateLimitScheduler()
+        client = get_client()
+
+        with pytest.raises(anthropic.NotFoundError):
+            scheduler.call(lambda: client.with_options(max_retries=0).post(
+                "/v1/unknown", cast_to=object, body={}), REQUEST)
+        assert scheduler.hops["claude"].attempts == 1
+
+    def test_translate_with_claude_survives_429(self, messages_stub):
+        """Test that a rate-limited experiment hop is retried instead of lost."""
+        from run_experiment import translate_with_claude
+
+        messages_stub.throttle = [429]
+        messages_stub.retry_after = 0.05
+
+        assert translate_with_claude("bonjour", "French", "Hebrew") == "translated(bonjour)"
+        assert get_scheduler().hops["fr-he"].rate_limited == 1
+
+    def test_agent_runner_uses_scheduler(self, messages_stub):
+        from agent_runner import TranslationAgent
+
+        configure_scheduler(max_retries=1)
+        messages_stub.throttle = [429]
+        messages_stub.retry_after = 0.05
+
+        assert TranslationAgent().translate("hello", "en-fr") == "translated(hello)"
+        assert get_scheduler().hops["en-fr"].retries == 1
+
+    def test_stream_uses_scheduler(self, messages_stub):
+        from agent_runner import TranslationAgent
+
+        messages_stub.throttle = [429]
+        messages_stub.retry_after = 0.05
+
+        assert TranslationAgent().translate_stream("hello", "en-fr") == "translated(hello)"
+        assert get_scheduler().hops["en-fr"].rate_limited == 1
+
+    def test_bulk_mode_uses_scheduler(self, messages_stub):
+        """Test that --input-file requests are retried and paced like blocking ones."""
+        import asyncio
+        import io
+        from agent_runner import AsyncTranslationAgent
+
+        configure_scheduler(rpm=120)  # Two requests at once, then one every 0.5s
+        messages_stub.throttle = [429]
+        messages_stub.retry_after = 0.05
+        summary = asyncio.run(AsyncTranslationAgent(concurrency=4).run_bulk(
+            ["a", "b", "c"], agent_id="en-fr", output=io.StringIO()))
+
+        stats = get_scheduler().hops["en-fr"]
+        assert summary["errors"] == 0
+        assert (stats.requests, stats.rate_limited) == (3, 1)
+        assert stats.queue_seconds > 0
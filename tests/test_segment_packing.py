@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Segment Packing module.
+
+Run with: pytest tests/test_segment_packing.py -v
+Or: python -m pytest tests/ -v
+"""
+
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+from segment_packing import PackStats, pack_message, unpack_segments, translate_packed
+
+
+def reply(*blocks):
+    return "\n".join(f"<<<{n}>>>\n{text}" for n, text in blocks)
+
+
+class TestProtocol:
+    """Test packing and unpacking of numbered segments."""
+
+    def test_pack_message(self):
+        """Test that segments follow a blank line, one marker per segment."""
+        message = pack_message(["one  two", "three\nfour"], "English", "French")
+        instructions, segments = message.split("\n\n", 1)
+
+        assert "2 numbered English segments" in instructions
+        assert segments == "<<<1>>>\none two\n<<<2>>>\nthree four"
+
+    def test_round_trip(self):
+        assert unpack_segments(reply((1, "un"), (2, "deux"), (3, "trois")), 3) == ["un", "deux", "trois"]
+
+    def test_tolerates_surrounding_whitespace(self):
+        text = "  <<<1>>>  \n\n un \n<<<2>>>\ndeux\n\n"
+        assert unpack_segments(text, 2) == ["un", "deux"]
+
+    def test_missing_segment(self):
+        assert unpack_segments(reply((1, "un"), (3, "trois")), 3) == ["un", None, "trois"]
+
+    def test_duplicate_and_empty_segments(self):
+        text = reply((1, "un"), (2, "deux"), (2, "encore"), (3, ""))
+        assert unpack_segments(text, 3) == ["un", None, None]
+
+    def test_out_of_order_rejects_pack(self):
+        assert unpack_segments(reply((2, "deux"), (1, "un")), 2) == [None, None]
+
+    def test_inline_marker_text_is_not_a_marker(self):
+        """Test that markers only count alone on their line."""
+        assert unpack_segments("<<<1>>>\nsee <<<2>>> here", 2) == ["see <<<2>>> here", None]
+
+
+class FakeSender:
+    """Replies to packed requests like a model; drops or merges on request."""
+
+    def __init__(self, drop=(), merge=()):
+        self.drop = set(drop)
+        self.merge = set(merge)
+        self.sent = []
+
+    def __call__(self, requests):
+        self.sent.append(requests)
+        replies = []
+        for request in requests:
+            if "pack" not in request:
+                replies.append(f"T({request['text']})")
+                continue
+            blocks = []
+            for number, text in enumerate(request["pack"], 1):
+                if text in self.drop:
+                    continue
+                if text in self.merge and blocks:
+                    blocks[-1] = (blocks[-1][0], blocks[-1][1] + f" T({text})")
+                    continue
+                blocks.append((number, f"T({text})"))
+            replies.append(reply(*blocks))
+        return replies
+
+
+def run(texts, sender, pack_size=3, stats=None):
+    return translate_packed(texts, lambda pack: {"pack": pack}, lambda text: {"text": text},
+                            sender, pack_size=pack_size, stats=stats)
+
+
+class TestTranslatePacked:
+    """Test packing, splitting and retries."""
+
+    def test_packs_requests(self):
+        """Test that texts are sent pack_size per request in one send call."""
+        sender = FakeSender()
+        stats = PackStats()
+        texts = [f"s{i}" for i in range(7)]
+
+        assert run(texts, sender, stats=stats) == [f"T(s{i})" for i in range(7)]
+        assert [len(r) for r in sender.sent] == [3]
+        assert (stats.segments, stats.requests, stats.retried, stats.requests_saved) == (7, 3, 0, 4)
+
+    def test_missing_segment_retried_alone(self):
+        """Test that a dropped segment and its predecessor are re-sent singly."""
+        sender = FakeSender(drop={"s4"})
+        stats = PackStats()
+
+        outputs = run([f"s{i}" for i in range(6)], sender, stats=stats)
+
+        assert outputs == [f"T(s{i})" for i in range(6)]
+        assert sender.sent[1] == [{"text": "s3"}, {"text": "s4"}]
+        assert stats.retried == 2
+
+    def test_merged_segment_retried(self):
+        """Test that merged translations are both replaced by single retries."""
+        sender = FakeSender(merge={"s1"})
+
+        assert run(["s0", "s1", "s2"], sender) == ["T(s0)", "T(s1)", "T(s2)"]
+        assert sender.sent[1] == [{"text": "s0"}, {"text": "s1"}]
+
+    def test_first_segment_missing(self):
+        sender = FakeSender(drop={"s0"})
+
+        assert run(["s0", "s1"], sender) == ["T(s0)", "T(s1)"]
+        assert sender.sent[1] == [{"text": "s0"}]
+
+    def test_empty_and_invalid(self):
+        assert run([], FakeSender()) == []
+        with pytest.raises(ValueError):
+            run(["x"], FakeSender(), pack_size=0)
+
+
+class TestPackedClaudeHops:
+    """Test --pack-size through run_translation_pipeline_batch and the stub server."""
+
+    def test_packed_pipeline(self, messages_stub):
+        """Test that each hop sends packs and recovers a merged segment."""
+        pytest.importorskip("anthropic")
+        from run_experiment import run_translation_pipeline_batch
+
+        messages_stub.pack_merge = {"c"}
+        stats = PackStats()
+
+        results = run_translation_pipeline_batch(["a", "b", "c", "d", "e"], pack_size=4, pack_stats=stats)
+
+        assert [final for _, _, final in results] == [f"translated(translated(translated({t})))"
+                                                      for t in "abcde"]
+        # Two packs per hop, plus b and c retried alone on the first hop
+        assert len(messages_stub.requests) == 3 * 2 + 2
+        assert stats.retried == 2
+        assert messages_stub.requests[0]["body"]["max_tokens"] == 4 * 1024
+
+    def test_output_budget_capped(self):
+        """Test that a large pack never asks for more than the model's output limit."""
+        pytest.importorskip("anthropic")
+        from run_experiment import CLAUDE_MAX_OUTPUT_TOKENS, MAX_PACK_SIZE, claude_pack_request
+
+        request = claude_pack_request([f"s{i}" for i in range(MAX_PACK_SIZE)], "English", "French")
+
+        assert request["max_tokens"] == CLAUDE_MAX_OUTPUT_TOKENS
+
+    def test_pack_size_limit(self):
+        pytest.importorskip("anthropic")
+        from run_experiment import MAX_PACK_SIZE, run_experiment
+
+        with pytest.raises(ValueError, match="pack_size"):
+            run_experiment(["x " * 20], pack_size=MAX_PACK_SIZE + 1, verbose=False)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Sharded Pipeline module.
+
+Run with: pytest tests/test_sharded_pipeline.py -v
+Or: python -m pytest tests/ -v
+
+Note: Workers are real spawned processes serving the fake MarianMT
+models from conftest.py. Process startup makes these tests slow.
+"""
+
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from local_translation_agents import LocalTranslationPipeline
+    from sharded_pipeline import ShardedPipeline, assign_cores, available_cores
+    SHARDED_AVAILABLE = True
+except (ImportError, SystemExit):
+    SHARDED_AVAILABLE = False
+
+from conftest import fake_pipeline_factory
+
+
+pytestmark = pytest.mark.skipif(
+    not SHARDED_AVAILABLE,
+    reason="transformers not installed"
+)
+
+
+class TestCoreAssignment:
+    """Test splitting CPU cores between workers."""
+
+    def test_disjoint_even_split(self):
+        """Test that 32 cores split into 3 disjoint, near-equal sets."""
+        sets = assign_cores(range(32), 3)
+
+        assert [len(s) for s in sets] == [11, 11, 10]
+        assert sorted(c for s in sets for c in s) == list(range(32))
+
+    def test_more_workers_than_cores(self):
+        """Test that workers share cores round-robin when cores run out."""
+        assert assign_cores([0, 1], 3) == [[0], [1], [0]]
+
+    def test_available_cores_not_empty(self):
+        """Test that at least one core is reported."""
+        assert len(available_cores()) >= 1
+
+
+class TestShardedPipeline:
+    """Test the multi-process pipeline end to end."""
+
+    @pytest.fixture(scope="class")
+    def sharded(self):
+        pipeline = ShardedPipeline(replicas={"en-fr": 2, "fr-he": 1, "he-en": 1}, batch_size=3,
+                                   cores=available_cores(), pipeline_factory=fake_pipeline_factory)
+        pipeline.start()
+        yield pipeline
+        pipeline.close()
+
+    @pytest.mark.slow
+    def test_workers_started_and_pinned(self, sharded):
+        """Test one worker per replica, each pinned to its assigned cores."""
+        assert sorted(w.agent_id for w in sharded.workers) == ["en-fr", "en-fr", "fr-he", "he-en"]
+        assert len({w.pid for w in sharded.workers}) == 4
+        if hasattr(os, "sched_getaffinity"):
+            for worker in sharded.workers:
+                assert sorted(os.sched_getaffinity(worker.pid)) == sorted(worker.cores)
+
+    @pytest.mark.slow
+    def test_results_match_in_process(self, sharded, fake_marian):
+        """Test that sharded results match run_pipeline_batch() in input order."""
+        texts = [f"sentence number {i}" for i in range(25)]
+        expected = LocalTranslationPipeline(verbose=False).run_pipeline_batch(texts)
+
+        assert sharded.run(texts, timeout=60) == expected
+
+    @pytest.mark.slow
+    def test_empty_input(self, sharded):
+        """Test that an empty run returns immediately."""
+        assert sharded.run([], timeout=5) == []
+
+    @pytest.mark.slow
+    def test_dead_worker_raises(self):
+        """Test that run() fails instead of hanging when a worker is killed."""
+        pipeline = ShardedPipeline(replicas=1, batch_size=2, cores=available_cores(),
+                                   pipeline_factory=fake_pipeline_factory)
+        pipeline.start()
+        try:
+            pipeline._processes[1][1].kill()
+            with pytest.raises(RuntimeError, match="fr-he#0 exited"):
+                pipeline.run(["one", "two", "three"])
+        finally:
+            pipeline.close()
+
+    def test_invalid_replicas_rejected(self):
+        """Test that every stage needs a worker."""
+        with pytest.raises(ValueError):
+            ShardedPipeline(replicas={"en-fr": 1, "fr-he": 0, "he-en": 1})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
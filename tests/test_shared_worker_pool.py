@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Shared-Weight Worker Pool module.
+
+Run with: pytest tests/test_shared_worker_pool.py -v
+Or: python -m pytest tests/ -v
+
+Note: Workers are forked from the test process and serve the fake
+MarianMT models from conftest.py.
+"""
+
+import sys
+import os
+import time
+import threading
+import multiprocessing
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    import torch
+    from local_translation_agents import LocalTranslationPipeline
+    from shared_worker_pool import SharedWeightPool, process_memory_mb, share_weights
+    POOL_AVAILABLE = ("fork" in multiprocessing.get_all_start_methods()
+                      and os.path.exists("/proc/self/smaps_rollup"))
+except (ImportError, SystemExit):
+    POOL_AVAILABLE = False
+
+from conftest import FakeMarianModel
+
+
+pytestmark = pytest.mark.skipif(
+    not POOL_AVAILABLE,
+    reason="transformers not installed or no fork/smaps_rollup (Linux only)"
+)
+
+
+class WeightedFakeModel(FakeMarianModel):
+    """Echo model that also holds 32 MB of real torch weights."""
+
+    def __init__(self):
+        super().__init__()
+        self.weights = torch.nn.Linear(2048, 4096, bias=False)
+
+    def state_dict(self):
+        return self.weights.state_dict()
+
+    def share_memory(self):
+        self.weights.share_memory()
+        return self
+
+
+@pytest.fixture
+def weighted_marian(fake_marian, monkeypatch):
+    import local_translation_agents
+    monkeypatch.setattr(local_translation_agents, "MarianMTModel", WeightedFakeModel)
+
+
+class TestProcessMemory:
+    """Test /proc memory accounting."""
+
+    def test_self_memory(self):
+        """Test that this process reports consistent sizes."""
+        memory = process_memory_mb()
+
+        assert memory["rss"] > 0
+        assert 0 < memory["uss"] <= memory["rss"]
+        assert memory["pss"] <= memory["rss"]
+
+    def test_missing_process(self):
+        """Test that an unknown pid reports zeros instead of raising."""
+        assert process_memory_mb(2 ** 22 + 12345)["rss"] == 0.0
+
+
+class TestSharedWeightPool:
+    """Test the forked pool end to end."""
+
+    def test_results_match_in_process(self, fake_marian):
+        """Test that pooled results match run_pipeline_batch in input order."""
+        texts = [f"sentence number {i}" for i in range(25)]
+        expected = LocalTranslationPipeline(verbose=False).run_pipeline_batch(texts)
+
+        with SharedWeightPool(workers=3, batch_size=4,
+                              pipeline=LocalTranslationPipeline(verbose=False)) as pool:
+            assert pool.run(texts, timeout=30) == expected
+            assert len(set(pool.worker_pids)) == 3
+
+    def test_models_loaded_once_in_parent(self, fake_marian):
+        """Test that workers reuse the parent's agents instead of loading their own."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        with SharedWeightPool(workers=2, pipeline=pipeline) as pool:
+            pool.run(["hello world"], timeout=30)
+
+        assert set(pipeline.agents) == {"en-fr", "fr-he", "he-en"}
+        assert all(memory["loads"] == 1 for memory in pipeline.models.stats().values())
+
+    def test_weights_shared_not_copied(self, weighted_marian):
+        """Test that a worker's unique memory is far below the weight size."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        with SharedWeightPool(workers=2, pipeline=pipeline) as pool:
+            pool.run(["hello world"] * 4, timeout=30)
+            report = pool.memory_report()
+
+        assert report["shared_model_mb"] == pytest.approx(96.0)
+        assert report["naive_mb"] == pytest.approx(192.0)
+        for memory in report["workers"].values():
+            assert memory["uss"] < report["shared_model_mb"] / 2
+        assert all(agent.model.weights.weight.is_shared() for agent in pipeline.agents.values())
+
+    def test_share_weights_returns_size(self, weighted_marian):
+        """Test share_weights on a loaded pipeline."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        pipeline.load_agent("en-fr")
+
+        assert share_weights(pipeline) == pytest.approx(32.0)
+
+    def test_print_memory_report(self, fake_marian, capsys):
+        """Test the printed report lists every worker."""
+        with SharedWeightPool(workers=2, pipeline=LocalTranslationPipeline(verbose=False)) as pool:
+            pool.print_memory_report()
+            pids = pool.worker_pids
+
+        output = capsys.readouterr().out
+        assert all(f"worker {pid}" in output for pid in pids)
+
+    def test_dead_worker_stops_run(self, fake_marian):
+        """Test that killing one worker mid-batch raises instead of waiting for its batch."""
+        pipeline = LocalTranslationPipeline(verbose=False)
+        translate = pipeline.run_pipeline_batch
+
+        def slow_batch(texts):
+            time.sleep(2)
+            return translate(texts)
+
+        pipeline.run_pipeline_batch = slow_batch
+        pool = SharedWeightPool(workers=3, batch_size=1, pipeline=pipeline)
+        pool.start()
+        victim = pool._processes[0]
+        killer = threading.Timer(0.5, victim.kill)
+        killer.start()
+
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match="worker 0 exited .* while translating batch"):
+            pool.run(["a", "b", "c"])
+        killer.join()
+
+        # Only the surviving workers' in-flight batches are waited for by close()
+        assert time.perf_counter() - start < 5
+        assert pool._processes == []
+
+    def test_parent_threads_restored(self, fake_marian):
+        """Test that the single-threaded warmup does not change the parent's thread count."""
+        threads = torch.get_num_threads()
+        with SharedWeightPool(workers=1, pipeline=LocalTranslationPipeline(verbose=False)):
+            pass
+
+        assert torch.get_num_threads() == threads
+
+    def test_ctranslate2_rejected(self):
+        """Test that a non-forkable backend is refused."""
+        with pytest.raises(ValueError):
+            SharedWeightPool(pipeline=LocalTranslationPipeline(verbose=False, backend="ctranslate2"))
+
+    def test_invalid_sizes_rejected(self, fake_marian):
+        """Test that zero workers or batch size are rejected."""
+        with pytest.raises(ValueError):
+            SharedWeightPool(workers=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
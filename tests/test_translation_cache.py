@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Translation Cache module.
+
+Run with: pytest tests/test_translation_cache.py -v
+Or: python -m pytest tests/ -v
+"""
+
+import sys
+import os
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+from translation_cache import TranslationCache, normalize_text, DedupStats, translate_unique
+from run_experiment import run_translation_pipeline, run_translation_pipeline_batch
+
+try:
+    from local_translation_agents import LocalTranslationPipeline, InferenceConfig
+    LOCAL_AGENTS_AVAILABLE = True
+except (ImportError, SystemExit):
+    LOCAL_AGENTS_AVAILABLE = False
+
+
+@pytest.fixture
+def cache():
+    return TranslationCache(":memory:")
+
+
+class TestNormalization:
+    """Test text normalization before hashing."""
+
+    def test_whitespace_collapsed(self):
+        """Test that runs of whitespace collapse to single spaces."""
+        assert normalize_text("  hello \n\t world ") == "hello world"
+
+    def test_unicode_normalized(self):
+        """Test that composed and decomposed forms hash alike."""
+        assert normalize_text("café") == normalize_text("café")
+
+    def test_equivalent_texts_share_key(self):
+        """Test that whitespace variants map to the same cache key."""
+        assert (TranslationCache.make_key("mock", "m", {}, "hello  world")
+                == TranslationCache.make_key("mock", "m", {}, " hello world"))
+
+
+class TestTranslationCache:
+    """Test cache lookups, counters and eviction."""
+
+    def test_miss_then_hit(self, cache):
+        """Test that a stored translation is returned and counted."""
+        assert cache.get("mock", "m", {}, "hello") is None
+        cache.put("mock", "m", {}, "hello", "bonjour")
+
+        assert cache.get("mock", "m", {}, "hello") == "bonjour"
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_key_includes_backend_model_and_params(self, cache):
+        """Test that different backends, models or settings never collide."""
+        cache.put("mock", "m", {"num_beams": 4}, "hello", "bonjour")
+
+        assert cache.get("claude", "m", {"num_beams": 4}, "hello") is None
+        assert cache.get("mock", "other", {"num_beams": 4}, "hello") is None
+        assert cache.get("mock", "m", {"num_beams": 1}, "hello") is None
+
+    def test_get_or_translate_calls_once(self, cache):
+        """Test that the translate callback only runs on a miss."""
+        calls = []
+
+        def translate(text):
+            calls.append(text)
+            return text.upper()
+
+        assert cache.get_or_translate("mock", "m", {}, "abc", translate) == "ABC"
+        assert cache.get_or_translate("mock", "m", {}, "abc", translate) == "ABC"
+        assert calls == ["abc"]
+
+    def test_get_many_preserves_order_and_duplicates(self, cache):
+        """Test batch lookups with repeated and missing texts."""
+        cache.put_many("mock", "m", {}, ["a", "b"], ["A", "B"])
+
+        assert cache.get_many("mock", "m", {}, ["b", "x", "a", "b"]) == ["B", None, "A", "B"]
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = TranslationCache(":memory:", max_entries=2)
+        cache.put("mock", "m", {}, "a", "A")
+        cache.put("mock", "m", {}, "b", "B")
+        cache.get("mock", "m", {}, "a")
+        cache.put("mock", "m", {}, "c", "C")
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.get("mock", "m", {}, "b") is None
+        assert cache.get("mock", "m", {}, "a") == "A"
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that a cache file survives being reopened."""
+        path = str(tmp_path / "cache.sqlite")
+        first = TranslationCache(path)
+        first.put("mock", "m", {}, "hello", "bonjour")
+        first.close()
+
+        assert TranslationCache(path).get("mock", "m", {}, "hello") == "bonjour"
+
+    def test_stats(self, cache):
+        """Test the stats dictionary."""
+        cache.put("mock", "m", {}, "a", "A")
+        cache.get("mock", "m", {}, "a")
+        cache.get("mock", "m", {}, "b")
+        stats = cache.stats()
+
+        assert stats["entries"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_clear(self, cache):
+        """Test that clear() empties the cache."""
+        cache.put("mock", "m", {}, "a", "A")
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_invalid_max_entries(self):
+        """Test that a zero-sized cache is rejected."""
+        with pytest.raises(ValueError):
+            TranslationCache(":memory:", max_entries=0)
+
+
+class TestTranslateUnique:
+    """Test in-batch deduplication."""
+
+    def test_fan_out(self):
+        """Test that each distinct text is translated once, results in input order."""
+        seen = []
+
+        def translate_many(texts):
+            seen.append(list(texts))
+            return [t.upper() for t in texts]
+
+        stats = DedupStats()
+        assert translate_unique(["a", "b", "a", "c", "b"], translate_many, stats) == ["A", "B", "A", "C", "B"]
+        assert seen == [["a", "b", "c"]]
+        assert (stats.inputs, stats.unique, stats.saved) == (5, 3, 2)
+        assert stats.saved_fraction == 0.4
+
+    def test_no_duplicates_passthrough(self):
+        """Test that distinct inputs go through unchanged."""
+        assert translate_unique(["x", "y"], lambda texts: [t * 2 for t in texts]) == ["xx", "yy"]
+
+
+class TestCachedPipelines:
+    """Test the cache wired into the translation backends."""
+
+    def test_mock_pipeline_unchanged_by_cache(self, cache):
+        """Test that cached mock translations match uncached ones."""
+        text = "The magnificent golden sunset"
+        expected = run_translation_pipeline(text, use_mock=True)
+
+        assert run_translation_pipeline(text, use_mock=True, cache=cache) == expected
+        assert run_translation_pipeline(text, use_mock=True, cache=cache) == expected
+        assert cache.hits == 3
+
+    def test_mock_batch_pipeline_reuses_earlier_runs(self, cache):
+        """Test that a repeated batch is served from the cache."""
+        texts = ["the cat", "the cat", "the dog"]
+        results = run_translation_pipeline_batch(texts, use_mock=True, cache=cache)
+
+        assert results == run_translation_pipeline_batch(texts, use_mock=True)
+        assert run_translation_pipeline_batch(texts, use_mock=True, cache=cache) == results
+        assert cache.hits == 6
+
+    @pytest.mark.skipif(not LOCAL_AGENTS_AVAILABLE, reason="transformers not installed")
+    def test_local_batch_skips_cached_texts(self, fake_marian, cache):
+        """Test that only uncached texts reach generate()."""
+        pipeline = LocalTranslationPipeline(verbose=False, cache=cache)
+        first = pipeline.translate_batch(["a b", "c d"], "en-fr")
+        pipeline.agents["en-fr"].model.generate_shapes.clear()
+
+        assert pipeline.translate_batch(["c d", "e f", "a b"], "en-fr") == ["en-fr(c d)", "en-fr(e f)", "en-fr(a b)"]
+        assert first == ["en-fr(a b)", "en-fr(c d)"]
+        # One generate() call, for the single uncached text
+        assert [shape[0] for shape in pipeline.agents["en-fr"].model.generate_shapes] == [1]
+
+    @pytest.mark.skipif(not LOCAL_AGENTS_AVAILABLE, reason="transformers not installed")
+    def test_local_cache_key_includes_settings(self, fake_marian, cache):
+        """Test that different decoding settings do not share translations."""
+        LocalTranslationPipeline(verbose=False, cache=cache).translate_batch(["a b"], "en-fr")
+        greedy = LocalTranslationPipeline(verbose=False, cache=cache, inference=InferenceConfig(num_beams=1))
+        greedy.translate_batch(["a b"], "en-fr")
+
+        assert cache.hits == 0
+        assert len(cache) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
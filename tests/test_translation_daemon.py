@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Translation Daemon module.
+
+Run with: pytest tests/test_translation_daemon.py -v
+Or: python -m pytest tests/ -v
+
+Note: The daemon serves the fake MarianMT models from conftest.py.
+"""
+
+import sys
+import os
+import socket
+import shutil
+import tempfile
+import threading
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pytest
+
+# Try to import the module, skip tests if dependencies not available
+try:
+    from local_translation_agents import LocalTranslationPipeline
+    from translation_daemon import TranslationDaemon, DaemonClient, DaemonError
+    DAEMON_AVAILABLE = hasattr(socket, "AF_UNIX")
+except (ImportError, SystemExit):
+    DAEMON_AVAILABLE = False
+
+
+pytestmark = pytest.mark.skipif(
+    not DAEMON_AVAILABLE,
+    reason="transformers not installed or no UNIX domain sockets"
+)
+
+
+@pytest.fixture
+def socket_path():
+    """Short socket path (AF_UNIX paths are limited to ~100 characters)."""
+    directory = tempfile.mkdtemp(prefix="rtd")
+    yield os.path.join(directory, "daemon.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(fake_marian, socket_path):
+    """Run a daemon with fake models in a background thread."""
+    server = TranslationDaemon(LocalTranslationPipeline(verbose=False), socket_path, verbose=False)
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+class TestTranslationDaemon:
+    """Test requests served by a running daemon."""
+
+    def test_client_detects_daemon(self, daemon, socket_path):
+        """Test that is_available() is True while the daemon runs."""
+        assert DaemonClient(socket_path).is_available()
+
+    def test_translate(self, daemon, socket_path):
+        """Test a single-agent translation through the daemon."""
+        assert DaemonClient(socket_path).translate("hello world", "en-fr") == "en-fr(hello world)"
+
+    def test_pipeline_matches_in_process(self, daemon, socket_path):
+        """Test that the daemon keeps the run_pipeline tuple contract."""
+        text = "The magnificent golden sunset"
+        expected = LocalTranslationPipeline(verbose=False).run_pipeline(text)
+
+        assert DaemonClient(socket_path).run_pipeline(text) == expected
+
+    def test_models_stay_loaded(self, daemon, socket_path):
+        """Test that agents loaded by one request serve the next."""
+        client = DaemonClient(socket_path)
+        client.run_pipeline("first request")
+        model = daemon.pipeline.agents["en-fr"].model
+        client.run_pipeline("second request")
+
+        assert daemon.pipeline.agents["en-fr"].model is model
+        assert client.stats()["loaded_agents"] == ["en-fr", "fr-he", "he-en"]
+
+    def test_unicode_round_trip(self, daemon, socket_path):
+        """Test that Hebrew text survives the JSON protocol."""
+        assert DaemonClient(socket_path).translate("שלום עולם", "he-en") == "he-en(שלום עולם)"
+
+    def test_error_reported(self, daemon, socket_path):
+        """Test that a failed request raises DaemonError on the client."""
+        with pytest.raises(DaemonError, match="Unknown agent"):
+            DaemonClient(socket_path).translate("hello", "en-de")
+
+    def test_concurrent_clients(self, daemon, socket_path):
+        """Test that several clients can be served at once."""
+        results = {}
+
+        def worker(i):
+            results[i] = DaemonClient(socket_path).translate(f"text {i}", "en-fr")
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        assert results == {i: f"en-fr(text {i})" for i in range(8)}
+
+
+def cli_args(socket_path, **flags):
+    """local_translation_agents.py arguments with every engine flag at its default."""
+    import argparse
+    args = dict(socket=socket_path, text="hello world", agent="en-fr", pipeline=False, quiet=True,
+                backend=None, quantize=None, threads=None, interop_threads=None, num_beams=None,
+                greedy=False, max_new_tokens=None, memory_budget=None, no_cache=False)
+    args.update(flags)
+    return argparse.Namespace(**args)
+
+
+class TestEngineSettings:
+    """Test that the CLI only uses a daemon started with the requested engine."""
+
+    def test_config_op(self, daemon, socket_path):
+        settings = DaemonClient(socket_path).engine_settings()
+
+        assert settings == daemon.pipeline.engine_settings()
+        assert (settings["backend"], settings["quantize"], settings["cache"]) == ("transformers", None, False)
+
+    def test_default_flags_use_daemon(self, daemon, socket_path, capsys):
+        from local_translation_agents import run_with_daemon
+
+        assert run_with_daemon(cli_args(socket_path))
+        assert capsys.readouterr().out.strip() == "en-fr(hello world)"
+
+    @pytest.mark.parametrize("flags", [{"backend": "ctranslate2"}, {"quantize": "int8"}, {"greedy": True},
+                                       {"max_new_tokens": 32}, {"memory_budget": 500.0}])
+    def test_mismatched_engine_runs_in_process(self, daemon, socket_path, capsys, flags):
+        """Test that engine flags the daemon was not started with bypass it, with a notice."""
+        from local_translation_agents import run_with_daemon
+
+        assert not run_with_daemon(cli_args(socket_path, **flags))
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "loading models in-process" in captured.err
+        assert daemon.pipeline.throughput_report() == {}
+
+    def test_matching_flags_use_daemon(self, fake_marian, socket_path):
+        from local_translation_agents import InferenceConfig, run_with_daemon
+
+        pipeline = LocalTranslationPipeline(verbose=False, inference=InferenceConfig(num_beams=1))
+        server = TranslationDaemon(pipeline, socket_path, verbose=False)
+        server.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            assert run_with_daemon(cli_args(socket_path, greedy=True, no_cache=True))
+        finally:
+            server.shutdown()
+            thread.join(timeout=5)
+
+
+class TestDaemonClientFallback:
+    """Test behavior when no daemon is running."""
+
+    def test_missing_socket_not_available(self, socket_path):
+        """Test that a missing socket means no daemon."""
+        assert not DaemonClient(socket_path).is_available()
+
+    def test_stale_socket_not_available(self, socket_path):
+        """Test that a socket file nobody listens on means no daemon."""
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+
+        assert not DaemonClient(socket_path).is_available()
+
+    def test_stale_socket_replaced_on_start(self, fake_marian, socket_path):
+        """Test that a new daemon can start over a stale socket file."""
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+
+        server = TranslationDaemon(LocalTranslationPipeline(verbose=False), socket_path, verbose=False)
+        server.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            assert DaemonClient(socket_path).is_available()
+        finally:
+            server.shutdown()
+            thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])